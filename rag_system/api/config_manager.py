@@ -18,6 +18,8 @@ _BLOCKED_KEY_PATHS: Dict[str, Set[Tuple[str, str]]] = {
         ("data", "index_path"),
         ("data", "hashes_path"),
         ("data", "processed_data_path"),
+        ("data", "embedding_cache_path"),
+        ("data", "ocr_cache_path"),
         ("data", "quality_log_path"),
         ("data", "logs_dir"),
     },
@@ -9,29 +9,34 @@ from fastapi import APIRouter
 from fastapi import HTTPException
 
 from rag_system.api import state
-from rag_system.indexing.data_vectorize import create_embeddings
 from rag_system.query.pipeline import RAGPipeline
 from rag_system.query.query import Query
 from rag_system.shared.index_snapshot import IndexSnapshotStore
+from rag_system.shared.index_snapshot import SnapshotChunks
 from rag_system.shared.temp_storage import temp_index_manager
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Simple path+mtime cache so processed_data.json is not read on every request
+# Simple snapshot+mtime cache so processed data is not read on every request
 _data_cache: Dict[str, Any] = {"path": None, "mtime": None, "data": None}
 
 
-def _load_processed_data(path: str) -> List[Dict[str, Any]]:
-    """Load processed data with an mtime cache."""
+def _load_chunks() -> Optional[SnapshotChunks]:
+    """Load the live chunks of the current snapshot with a snapshot+mtime cache."""
+    snapshot_store = IndexSnapshotStore.from_config(state.query_config)
+    artifacts = snapshot_store.current_artifacts()
     try:
-        mtime = os.path.getmtime(path)
+        mtime = os.path.getmtime(artifacts.processed_data_path)
     except OSError:
-        return []
+        return None
+    path = (artifacts.snapshot_id, artifacts.processed_data_path)
     if _data_cache["path"] == path and _data_cache["mtime"] == mtime:
         return _data_cache["data"]
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = snapshot_store.load_chunks(
+        mmap=bool(getattr(state.query_config, 'mmap_snapshot', False)),
+        artifacts=artifacts,
+    )
     _data_cache["path"] = path
     _data_cache["mtime"] = mtime
     _data_cache["data"] = data
@@ -78,17 +83,12 @@ async def get_documents(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
         raise HTTPException(status_code=503, detail="Indexing service not available.")
 
     try:
-        processed_data_path = IndexSnapshotStore.from_config(state.query_config).current_artifacts().processed_data_path
-
-        if not os.path.exists(processed_data_path):
-            return {"documents": [], "total_chunks": 0}
-
-        data = _load_processed_data(processed_data_path)
+        data = _load_chunks()
         if not data:
             return {"documents": [], "total_chunks": 0}
 
         documents_map: Dict[str, Any] = {}
-        for item in data:
+        for item in data.records():
             source = item.get('source')
             if not source or source == 'unknown':
                 source = 'Untitled (legacy data)'
@@ -155,12 +155,11 @@ async def get_document_content(filename: str, session_id: Optional[str] = None)
                     "is_temporary": True
                 }
 
-        processed_data_path = IndexSnapshotStore.from_config(state.query_config).current_artifacts().processed_data_path
-        if not os.path.exists(processed_data_path):
+        data = _load_chunks()
+        if data is None:
             raise HTTPException(status_code=404, detail="No documents found")
 
-        data = _load_processed_data(processed_data_path)
-        chunks = [item for item in data if item.get('source') == filename]
+        chunks = list(data.records(data.rows_with_value('source', filename)))
 
         if not chunks:
             raise HTTPException(status_code=404, detail="Document not found")
@@ -197,19 +196,15 @@ async def search_documents(query: str = '') -> Dict[str, Any]:
         return {"results": [], "total_results": 0}
 
     try:
-        processed_data_path = IndexSnapshotStore.from_config(state.query_config).current_artifacts().processed_data_path
-        if not os.path.exists(processed_data_path):
-            return {"results": [], "total_results": 0}
-
-        data = _load_processed_data(processed_data_path)
+        data = _load_chunks()
         if not data:
             return {"results": [], "total_results": 0}
 
         query_lower = query.lower()
-        matching_chunks = [
-            item for item in data
-            if query_lower in item.get('text', '').lower()
-        ]
+        matching_chunks = list(data.records(
+            row for row, text in enumerate(data.texts)
+            if query_lower in text.lower()
+        ))
 
         documents_map: Dict[str, Any] = {}
         for item in matching_chunks:
@@ -234,7 +229,7 @@ async def search_documents(query: str = '') -> Dict[str, Any]:
 
 @router.delete('/documents/{filename}')
 async def delete_document(filename: str) -> Dict[str, Any]:
-    """Delete one indexed document and rebuild the remaining index.
+    """Delete one indexed document and rebuild the index from the remaining vectors.
 
     Args:
         filename: Source filename to delete.
@@ -254,39 +249,19 @@ async def delete_document(filename: str) -> Dict[str, Any]:
         raise HTTPException(status_code=503, detail="Database not available.")
 
     try:
-        snapshot_store = IndexSnapshotStore.from_config(state.query_config)
-        processed_data_path = snapshot_store.current_artifacts().processed_data_path
-        if not os.path.exists(processed_data_path):
+        if not IndexSnapshotStore.from_config(state.query_config).current_artifacts().segments:
             raise HTTPException(status_code=404, detail="No documents found")
 
-        data = _load_processed_data(processed_data_path)
-        filtered_data = [item for item in data if item.get('source') != filename]
-        deleted_count = len(data) - len(filtered_data)
+        loop = asyncio.get_running_loop()
+        deleted_count, remaining_count = await loop.run_in_executor(
+            None, indexing_svc.delete_source, filename
+        )
+        _invalidate_cache()
 
         if deleted_count == 0:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        if filtered_data:
-            # Compute embeddings BEFORE writing anything to disk.
-            # Use the same helper as the normal indexing path so model-specific
-            # preprocessing, such as E5 passage prefixes, stays consistent.
-            texts = [item['text'] for item in filtered_data]
-            loop = asyncio.get_running_loop()
-            embeddings = await loop.run_in_executor(
-                None,
-                lambda: create_embeddings(
-                    texts,
-                    indexing_svc.emb_model,
-                    batch_size=indexing_svc.batch_size,
-                    model_name=indexing_svc.emb_model_name,
-                    is_query=False,
-                )
-            )
-
-            new_index = data_base.build_index(embeddings)
-            snapshot_store.publish(filtered_data, embeddings, new_index)
-            data_base.index = new_index
-
+        if remaining_count:
             logger.info(f"Deleted '{filename}' ({deleted_count} chunks), reindexed remaining")
 
             try:
@@ -312,8 +287,6 @@ async def delete_document(filename: str) -> Dict[str, Any]:
                 state.redis_client.flush_cache()
 
         else:
-            snapshot_store.clear()
-            data_base.index = None
             logger.info(f"Deleted last document '{filename}', index cleared")
 
             with state.services_lock:
@@ -326,7 +299,7 @@ async def delete_document(filename: str) -> Dict[str, Any]:
         return {
             "message": "Document deleted successfully",
             "deleted_chunks": deleted_count,
-            "remaining_chunks": len(filtered_data)
+            "remaining_chunks": remaining_count
         }
 
     except HTTPException:
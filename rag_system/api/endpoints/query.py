@@ -40,7 +40,7 @@ async def query_rag(request: QueryRequest):
 
     try:
         if request.session_id and temp_index_manager.has_session(request.session_id):
-            temp_data = temp_index_manager.get_temp_index(request.session_id)
+            temp_data = temp_index_manager.get_session_index(request.session_id)
             if temp_data is None:
                 raise HTTPException(status_code=404, detail="Temporary session not found")
             if indexing_service is None:
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from fastapi import APIRouter
@@ -68,10 +69,17 @@ async def reload_pipeline(service: str):
             new_indexing_service = Indexing(state.shared_config, new_data_loader, new_data_base)
 
             with state.services_lock:
+                old_data_loader, old_indexing_service = state.data_loader, state.indexing_service
                 state.data_loader = new_data_loader
                 state.data_base = new_data_base
                 state.indexing_service = new_indexing_service
 
+            # Release the worker processes of the replaced services.
+            if old_data_loader is not None:
+                await asyncio.to_thread(old_data_loader.close)
+            if old_indexing_service is not None:
+                await asyncio.to_thread(old_indexing_service.close)
+
             logger.info("Indexing service reinitialized successfully.")
             return {"message": "indexing configuration reloaded successfully"}
 
@@ -14,6 +14,7 @@ from fastapi import File
 
 from rag_system.api import state
 from rag_system.api.services import process_file_temp
+from rag_system.api.services import temp_file_key
 from rag_system.api.temp_storage import temp_index_manager
 from rag_system.indexing import Indexing
 from rag_system.query.query import Query
@@ -79,17 +80,26 @@ async def upload_temp_file(
             with open(temp_path, "wb") as f:
                 await loop.run_in_executor(None, lambda: shutil.copyfileobj(file.file, f))
 
-            temp_data = await loop.run_in_executor(
-                None, process_file_temp, temp_path, data_loader, indexing_svc
+            key = await loop.run_in_executor(
+                None, temp_file_key, temp_path, getattr(indexing_svc, 'emb_model_id', None)
             )
-
-            temp_index_manager.add_temp_index(target_session_id, temp_data)
+            processed = await asyncio.to_thread(temp_index_manager.get_processed_file, key)
+            if processed is not None:
+                logger.info(f"Reusing processed temporary file {key[:12]} for {file.filename}")
+                await asyncio.to_thread(temp_index_manager.add_temp_file, target_session_id, processed)
+                chunks_count = len(processed.chunks)
+            else:
+                temp_data = await loop.run_in_executor(
+                    None, process_file_temp, temp_path, data_loader, indexing_svc
+                )
+                await asyncio.to_thread(temp_index_manager.add_temp_index, target_session_id, temp_data, key)
+                chunks_count = len(temp_data['chunks'])
 
             logger.info(f"Temporary file indexed successfully. Session ID: {target_session_id}")
             return {
                 "message": "File processed and temporarily indexed successfully.",
                 "session_id": target_session_id,
-                "chunks_count": len(temp_data['chunks'])
+                "chunks_count": chunks_count
             }
 
     except ValueError as e:
@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 import uvicorn
@@ -14,10 +16,26 @@ from rag_system.api.endpoints import upload
 
 state.initialize_services()
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Run FastAPI lifespan shutdown for the monolith API.
+
+    Args:
+        _app: FastAPI application instance.
+
+    Returns:
+        Async iterator used by FastAPI lifespan management.
+    """
+    yield
+    state.shutdown_services()
+
+
 app = FastAPI(
     title="RAG System API",
     description="Unified API for document indexing and RAG querying",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -3,5 +3,6 @@
 from rag_system.query.combined import CombinedQueryService
 from rag_system.query.combined import create_combined_pipeline
 from rag_system.query.combined import process_file_temp
+from rag_system.query.combined import temp_file_key
 
-__all__ = ["CombinedQueryService", "create_combined_pipeline", "process_file_temp"]
+__all__ = ["CombinedQueryService", "create_combined_pipeline", "process_file_temp", "temp_file_key"]
@@ -3,6 +3,7 @@ import threading
 from typing import Any, Optional
 
 from rag_system.indexing import Indexing
+from rag_system.query.combined import shutdown_search_executor
 from rag_system.query.llm import LLMResponder
 from rag_system.query.pipeline import RAGPipeline
 from rag_system.query.query import Query
@@ -11,6 +12,7 @@ from rag_system.shared.data_base import FaissDB
 from rag_system.shared.data_loader import DataLoader
 from rag_system.shared.logs import setup_logging
 from rag_system.shared.my_config import Config as SharedConfig
+from rag_system.shared.temp_storage import temp_index_manager
 
 _API_DIR = os.path.dirname(os.path.abspath(__file__))
 _RAG_DIR = os.path.dirname(_API_DIR)
@@ -65,6 +67,7 @@ def initialize_services() -> None:
     global data_loader, data_base, indexing_service, query_service, responder, pipeline, redis_client
 
     try:
+        temp_index_manager.configure_from(query_config)
         data_loader = DataLoader(shared_config)
         data_base = FaissDB(shared_config)
         indexing_service = Indexing(shared_config, data_loader, data_base)
@@ -97,3 +100,13 @@ def initialize_services() -> None:
     except Exception as e:
         logger.error(f'Failed to initialize RAG API: {str(e)}')
         logger.warning('Continuing with limited functionality...')
+
+
+def shutdown_services() -> None:
+    """Release worker processes and threads held by monolith API dependencies."""
+    if data_loader is not None:
+        data_loader.close()
+    if indexing_service is not None:
+        indexing_service.close()
+    shutdown_search_executor()
+    logger.info('RAG API dependencies shut down.')
@@ -0,0 +1,114 @@
+import argparse
+import time
+from typing import List
+
+import torch
+
+from rag_system.indexing import Indexing
+from rag_system.indexing.data_vectorize import create_embeddings
+from rag_system.indexing.embedding_pool import EmbeddingPool
+from rag_system.shared.data_base import FaissDB
+from rag_system.shared.data_loader import DataLoader
+from rag_system.shared.my_config import Config
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse CLI arguments for the embedding throughput benchmark.
+
+    Returns:
+        Parsed CLI arguments.
+    """
+    parser = argparse.ArgumentParser(description="Measure embedding throughput for worker/thread configurations.")
+    parser.add_argument("--config", default="rag_system/indexing/config.yaml", help="Indexing config path.")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts to test.")
+    parser.add_argument("--threads", default="0", help="Comma-separated threads per worker (0 = CPUs / workers).")
+    parser.add_argument(
+        "--max-tokens",
+        default="0",
+        help="Comma-separated token budgets per batch (0 = fixed batch size).",
+    )
+    parser.add_argument("--num-texts", type=int, default=2000, help="Number of indexed chunks to embed.")
+    parser.add_argument("--batch-size", type=int, default=None, help="Model batch size (overrides config).")
+    return parser.parse_args()
+
+
+def _parse_list(value: str) -> List[int]:
+    """Parse a comma-separated list of integers."""
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def load_benchmark_texts(indexing: Indexing, limit: int) -> List[str]:
+    """Read chunk texts from the current index snapshot.
+
+    Args:
+        indexing: Indexing service whose snapshot provides the texts.
+        limit: Maximum number of texts.
+
+    Returns:
+        Up to ``limit`` chunk texts.
+
+    Raises:
+        RuntimeError: If no indexed texts are available.
+    """
+    texts: List[str] = []
+    for batch in indexing.snapshot_store.iter_processed_data(1024):
+        texts.extend(str(record.get('text', '')) for record in batch)
+        if len(texts) >= limit:
+            break
+    if not texts:
+        raise RuntimeError("No indexed chunks found. Run indexing first.")
+    return texts[:limit]
+
+
+def main() -> None:
+    """Embed the same chunks with each configuration and print chunks/sec."""
+    args = parse_args()
+
+    config = Config(args.config)
+    setattr(config, "embedding_cache_enabled", False)  # noqa: B010
+    setattr(config, "emb_num_workers", 1)  # noqa: B010
+    batch_size = args.batch_size or config.batch_size
+
+    indexing = Indexing(config, DataLoader(config), FaissDB(config))
+    texts = load_benchmark_texts(indexing, args.num_texts)
+    default_threads = torch.get_num_threads()
+    print(f"Benchmarking {len(texts)} chunks, batch size {batch_size}\n")
+
+    for workers in _parse_list(args.workers):
+        for threads in _parse_list(args.threads):
+            pool = None
+            if workers > 1:
+                setattr(config, "emb_num_workers", workers)  # noqa: B010
+                setattr(config, "emb_threads_per_worker", threads)  # noqa: B010
+                pool = EmbeddingPool.from_config(config)
+                effective_threads = pool.threads_per_worker
+            else:
+                effective_threads = threads or default_threads
+                torch.set_num_threads(effective_threads)
+
+            try:
+                # Warm up so worker start-up and model loading are not timed.
+                warmup = texts[:batch_size * max(workers, 1) + 1]
+                create_embeddings(warmup, indexing.emb_model, batch_size, config.emb_model_name, pool=pool)
+
+                for max_tokens in _parse_list(args.max_tokens):
+                    start = time.perf_counter()
+                    create_embeddings(
+                        texts,
+                        indexing.emb_model,
+                        batch_size,
+                        config.emb_model_name,
+                        pool=pool,
+                        max_tokens_per_batch=max_tokens,
+                    )
+                    elapsed = time.perf_counter() - start
+                    print(
+                        f"workers={workers:<3} threads/worker={effective_threads:<3} max_tokens={max_tokens:<6} "
+                        f"{len(texts) / elapsed:8.1f} chunks/sec ({elapsed:.2f}s)"
+                    )
+            finally:
+                if pool is not None:
+                    pool.close()
+
+if __name__ == "__main__":
+    main()
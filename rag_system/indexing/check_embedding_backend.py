@@ -0,0 +1,143 @@
+import argparse
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from rag_system.indexing.data_vectorize import create_embeddings
+from rag_system.shared.index_snapshot import IndexSnapshotStore
+from rag_system.shared.model_loader import EMBEDDING_BACKENDS
+from rag_system.shared.model_loader import get_hf_cache_model_path
+from rag_system.shared.model_loader import load_sentence_transformer
+from rag_system.shared.my_config import Config
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse CLI arguments for the embedding backend parity check.
+
+    Returns:
+        Parsed CLI arguments.
+    """
+    parser = argparse.ArgumentParser(description="Compare an embedding backend against the fp32 PyTorch model.")
+    parser.add_argument("--config", default="rag_system/indexing/config.yaml", help="Config with model settings.")
+    parser.add_argument("--backend", choices=EMBEDDING_BACKENDS, required=True, help="Backend to check.")
+    parser.add_argument("--onnx-file", default=None, help="ONNX file inside the model directory.")
+    parser.add_argument("--num-texts", type=int, default=500, help="Number of indexed chunks to compare.")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours compared for search overlap.")
+    return parser.parse_args()
+
+
+def cosine_drift(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """Summarize per-row cosine similarity between two sets of normalized vectors.
+
+    Args:
+        reference: Reference vectors, shape ``(n, d)``.
+        candidate: Vectors from the backend under test, same shape.
+
+    Returns:
+        Mean, minimum and 1st-percentile cosine similarity.
+
+    Raises:
+        ValueError: If the shapes differ.
+    """
+    if reference.shape != candidate.shape:
+        raise ValueError(f"Shape mismatch: {reference.shape} vs {candidate.shape}")
+    cosines = np.sum(reference * candidate, axis=1)
+    return {
+        "mean": float(cosines.mean()),
+        "min": float(cosines.min()),
+        "p1": float(np.percentile(cosines, 1)),
+    }
+
+
+def neighbour_overlap(
+    reference_queries: np.ndarray,
+    reference_docs: np.ndarray,
+    candidate_queries: np.ndarray,
+    candidate_docs: np.ndarray,
+    k: int,
+) -> float:
+    """Return the mean overlap of exact top-k neighbours between two embedding sets.
+
+    Args:
+        reference_queries: Reference query vectors.
+        reference_docs: Reference document vectors.
+        candidate_queries: Query vectors from the backend under test.
+        candidate_docs: Document vectors from the backend under test.
+        k: Number of neighbours compared per query.
+
+    Returns:
+        Mean fraction of shared top-k neighbours, from 0.0 to 1.0.
+    """
+    k = min(k, reference_docs.shape[0])
+    reference_top = np.argsort(-(reference_queries @ reference_docs.T), axis=1)[:, :k]
+    candidate_top = np.argsort(-(candidate_queries @ candidate_docs.T), axis=1)[:, :k]
+    overlaps = [len(set(ref) & set(cand)) / k for ref, cand in zip(reference_top, candidate_top, strict=True)]
+    return float(np.mean(overlaps))
+
+
+def _load_texts(config: Any, limit: int) -> List[str]:
+    """Read up to ``limit`` chunk texts from the current index snapshot."""
+    texts: List[str] = []
+    for batch in IndexSnapshotStore.from_config(config).iter_processed_data(1024):
+        texts.extend(str(record.get('text', '')) for record in batch)
+        if len(texts) >= limit:
+            break
+    if not texts:
+        raise RuntimeError("No indexed chunks found. Run indexing first.")
+    return texts[:limit]
+
+
+def _query_latency_ms(model: Any, model_name: str, queries: List[str]) -> float:
+    """Return the median single-query embedding latency in milliseconds."""
+    timings = []
+    for text in queries:
+        start = time.perf_counter()
+        create_embeddings([text], model, batch_size=1, model_name=model_name, is_query=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main() -> None:
+    """Embed indexed chunks with fp32 PyTorch and the chosen backend and report drift."""
+    args = parse_args()
+
+    config = Config(args.config)
+    model_name = config.emb_model_name
+    try:
+        model_source = get_hf_cache_model_path(model_name)
+    except FileNotFoundError:
+        model_source = model_name
+    device = str(getattr(config, 'emb_device', 'cpu'))
+    batch_size = int(getattr(config, 'batch_size', 32))
+
+    texts = _load_texts(config, args.num_texts)
+    # Chunk openings stand in for user questions.
+    queries = [text[:200] for text in texts[:100]]
+
+    results = []
+    for backend, onnx_file in (("torch", None), (args.backend, args.onnx_file)):
+        model = load_sentence_transformer(model_source, device=device, backend=backend, onnx_file=onnx_file)
+        # Warm up so one-time initialization is not timed.
+        create_embeddings(queries[:2], model, batch_size=1, model_name=model_name, is_query=True)
+        docs = create_embeddings(texts, model, batch_size=batch_size, model_name=model_name)
+        query_vectors = create_embeddings(queries, model, batch_size=batch_size, model_name=model_name, is_query=True)
+        latency = _query_latency_ms(model, model_name, queries[:50])
+        results.append((docs, query_vectors, latency))
+
+    reference_docs, reference_queries, reference_latency = results[0]
+    candidate_docs, candidate_queries, candidate_latency = results[1]
+
+    doc_drift = cosine_drift(reference_docs, candidate_docs)
+    query_drift = cosine_drift(reference_queries, candidate_queries)
+    overlap = neighbour_overlap(reference_queries, reference_docs, candidate_queries, candidate_docs, args.k)
+
+    print(f"Model: {model_name}, backend: {args.backend}, {len(texts)} chunks, {len(queries)} queries\n")
+    print(f"Passage cosine vs fp32: mean={doc_drift['mean']:.6f} min={doc_drift['min']:.6f} p1={doc_drift['p1']:.6f}")
+    print(f"Query cosine vs fp32:   mean={query_drift['mean']:.6f} min={query_drift['min']:.6f} p1={query_drift['p1']:.6f}")
+    print(f"Top-{args.k} neighbour overlap: {overlap:.4f}")
+    print(f"Median query latency: fp32 {reference_latency:.1f} ms, {args.backend} {candidate_latency:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import os
+from typing import Callable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from rag_system.shared.data_base import FaissDB
+from rag_system.shared.embedding_storage import StoredEmbeddings
+from rag_system.shared.embedding_storage import open_embeddings
+from rag_system.shared.index_snapshot import IndexSnapshotStore
+from rag_system.shared.index_snapshot import Segment
+from rag_system.shared.index_snapshot import read_chunk_store
+
+
+def plan_compaction(
+    segments: Sequence[Segment],
+    merge_factor: int,
+    small_max_items: int,
+    max_deleted_ratio: float,
+) -> List[Segment]:
+    """Choose the segments to merge under a size-tiered policy.
+
+    Segments whose share of tombstoned rows reaches ``max_deleted_ratio`` are
+    always rewritten. Segments with at most ``small_max_items`` live rows are
+    merged once there are at least ``merge_factor`` of them, so the number of
+    segments a query has to search stays bounded without rewriting large
+    segments on every upload. Legacy artifacts outside a segment directory are
+    left alone.
+
+    Args:
+        segments: Segments of the current snapshot, in search order.
+        merge_factor: Minimum number of small segments worth merging.
+        small_max_items: Live row count up to which a segment counts as small.
+        max_deleted_ratio: Tombstone share that forces a segment rewrite.
+
+    Returns:
+        Segments to merge into one, in search order. Empty if nothing is due.
+    """
+    candidates = [segment for segment in segments if segment.directory is not None and segment.items_count]
+    dirty = {
+        segment.segment_id
+        for segment in candidates
+        if len(segment.deleted) / segment.items_count >= max_deleted_ratio
+    }
+    small = {
+        segment.segment_id
+        for segment in candidates
+        if segment.segment_id not in dirty and segment.live_count <= small_max_items
+    }
+    chosen = dirty | small if len(small) >= max(merge_factor, 2) else dirty
+    return [segment for segment in segments if segment.segment_id in chosen]
+
+
+def merge_segments(
+    store: IndexSnapshotStore,
+    segments: Sequence[Segment],
+    data_base: FaissDB,
+    batch_size: int,
+    embed_texts: Callable[[List[str]], np.ndarray],
+) -> Optional[Segment]:
+    """Write the live rows of several segments into one new segment.
+
+    Stored vectors are copied batch by batch and re-encoded in the store's
+    embedding dtype; texts are re-embedded only when a segment's embeddings
+    file is missing or not row-aligned. The index is built from the staged
+    vectors at the end, so its family is chosen for the merged size.
+
+    Args:
+        store: Snapshot store that owns the segment directory.
+        segments: Segments to merge, in search order.
+        data_base: FaissDB used to build the merged index.
+        batch_size: Number of rows copied per batch.
+        embed_texts: Fallback used to embed texts without stored vectors.
+
+    Returns:
+        The merged segment without tombstones, or None if no live rows remain.
+        The segment is not published.
+
+    Raises:
+        Exception: If a segment cannot be read or the new segment cannot be written.
+    """
+    writer = store.open_segment_writer()
+    try:
+        for segment in segments:
+            chunks = read_chunk_store(segment.processed_data_path)
+            live = segment.live_rows(len(chunks))
+            rows = np.arange(len(chunks), dtype=np.int64) if live is None else live
+
+            embeddings: Optional[Union[np.ndarray, StoredEmbeddings]] = None
+            if os.path.exists(segment.embeddings_path):
+                embeddings = open_embeddings(segment.embeddings_path, mmap=True)
+                if embeddings.shape[0] != len(chunks):
+                    embeddings = None
+
+            for start in range(0, len(rows), batch_size):
+                batch_rows = rows[start:start + batch_size]
+                records = list(chunks.records(batch_rows))
+                if embeddings is not None:
+                    vectors = np.asarray(embeddings[batch_rows], dtype=np.float32)
+                else:
+                    vectors = embed_texts([record['text'] for record in records])
+                writer.write(records, vectors)
+
+        if not writer.items_count:
+            writer.abort()
+            return None
+        # Build once all rows are staged so the index family fits the merged size.
+        index = data_base.build_index_from_rows(writer.staged_embeddings(), batch_size)
+        return writer.finish(index)
+    except Exception:
+        writer.abort()
+        raise
+
+
+def carry_over_tombstones(base: Sequence[Segment], current: Sequence[Segment]) -> List[int]:
+    """Map rows deleted while segments were being merged to rows of the merged segment.
+
+    Args:
+        base: Merged segments as they were when the merge started.
+        current: The same segments in the current snapshot, in the same order.
+
+    Returns:
+        Sorted merged-segment row numbers that must be tombstoned.
+    """
+    rows: List[int] = []
+    offset = 0
+    for before, now in zip(base, current, strict=True):
+        live_before = before.live_rows(before.items_count)
+        if live_before is None:
+            live_before = np.arange(before.items_count or 0, dtype=np.int64)
+        new_deleted = np.array(sorted(set(now.deleted) - set(before.deleted)), dtype=np.int64)
+        rows.extend((offset + np.searchsorted(live_before, new_deleted)).tolist())
+        offset += len(live_before)
+    return sorted(rows)
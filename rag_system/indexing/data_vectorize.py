@@ -1,10 +1,13 @@
 import os
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from rag_system.indexing.embedding_pool import EmbeddingPool
+from rag_system.shared.embedding_cache import EmbeddingCache
+from rag_system.shared.embedding_prefix import embedding_prefix_mode
 from rag_system.shared.embedding_prefix import prepare_embedding_texts
 
 
@@ -14,6 +17,10 @@ def create_embeddings(
     batch_size: int = 32,
     model_name: Optional[str] = None,
     is_query: bool = False,
+    cache: Optional[EmbeddingCache] = None,
+    pool: Optional[EmbeddingPool] = None,
+    max_tokens_per_batch: int = 0,
+    model_id: Optional[str] = None,
 ) -> np.ndarray:
     """Create embeddings for input texts.
 
@@ -23,18 +30,61 @@ def create_embeddings(
         batch_size: Number of texts to process in one batch.
         model_name: Optional embedding model name used for model-specific preprocessing.
         is_query: If True, prepare texts as query embeddings.
+        cache: Optional embedding cache. Cached vectors are reused and only
+            unseen texts are passed to the model.
+        pool: Optional multi-process embedding pool. When given, inputs larger
+            than one batch are encoded by the pool workers instead of ``model``.
+        max_tokens_per_batch: If positive, group texts of similar token length
+            into batches of at most this many padded tokens instead of
+            ``batch_size`` texts. Output order is unchanged.
+        model_id: Identity of the model and backend used in cache keys.
+            Defaults to ``model_name``.
 
     Returns:
         L2-normalized float32 array of embeddings.
     """
     prepared_texts = prepare_embedding_texts(model_name, texts, is_query=is_query)
 
-    embeddings = model.encode(
-        prepared_texts,
-        batch_size=batch_size,
-        show_progress_bar=True,
-        convert_to_numpy=True
-    )
+    if cache is None or not prepared_texts:
+        return _encode_texts(prepared_texts, model, batch_size, pool, max_tokens_per_batch)
+
+    prefix_mode = embedding_prefix_mode(model_name, is_query)
+    keys = [cache.make_key(model_id or model_name, prefix_mode, text) for text in prepared_texts]
+    cached = cache.get_many(keys)
+
+    missing: Dict[str, str] = {}
+    for key, text in zip(keys, prepared_texts, strict=True):
+        if key not in cached and key not in missing:
+            missing[key] = text
+
+    if missing:
+        new_embeddings = _encode_texts(list(missing.values()), model, batch_size, pool, max_tokens_per_batch)
+        computed = dict(zip(missing.keys(), new_embeddings, strict=True))
+        cache.put_many(computed)
+        cached.update(computed)
+
+    return np.vstack([cached[key] for key in keys]).astype(np.float32, copy=False)
+
+
+def _encode_texts(
+    prepared_texts: List[str],
+    model: SentenceTransformer,
+    batch_size: int,
+    pool: Optional[EmbeddingPool] = None,
+    max_tokens_per_batch: int = 0,
+) -> np.ndarray:
+    """Encode prepared texts and L2-normalize the result."""
+    if max_tokens_per_batch > 0 and prepared_texts:
+        embeddings = _encode_token_batches(prepared_texts, model, max_tokens_per_batch, pool)
+    elif pool is not None and len(prepared_texts) > batch_size:
+        embeddings = pool.encode(prepared_texts, batch_size)
+    else:
+        embeddings = model.encode(
+            prepared_texts,
+            batch_size=batch_size,
+            show_progress_bar=True,
+            convert_to_numpy=True
+        )
 
     embeddings = np.array(embeddings, dtype=np.float32)
     faiss.normalize_L2(embeddings)
@@ -42,6 +92,92 @@ def create_embeddings(
     return embeddings
 
 
+def _encode_token_batches(
+    prepared_texts: List[str],
+    model: SentenceTransformer,
+    max_tokens_per_batch: int,
+    pool: Optional[EmbeddingPool] = None,
+) -> np.ndarray:
+    """Encode texts in token-budget batches and restore the input order."""
+    batches = plan_token_batches(count_tokens(prepared_texts, model), max_tokens_per_batch)
+    batch_texts = [[prepared_texts[i] for i in batch] for batch in batches]
+
+    if pool is not None and len(batches) > 1:
+        outputs = pool.encode_batches(batch_texts)
+    else:
+        outputs = [
+            np.asarray(
+                model.encode(texts, batch_size=len(texts), show_progress_bar=False, convert_to_numpy=True),
+                dtype=np.float32,
+            )
+            for texts in batch_texts
+        ]
+
+    embeddings = np.empty((len(prepared_texts), outputs[0].shape[1]), dtype=np.float32)
+    for batch, output in zip(batches, outputs, strict=True):
+        embeddings[batch] = output
+    return embeddings
+
+
+def count_tokens(texts: List[str], model: Any) -> List[int]:
+    """Return the number of tokens the model will see for each text.
+
+    Uses the model tokenizer with the model's truncation length when
+    available, otherwise estimates from the character count.
+
+    Args:
+        texts: Prepared texts.
+        model: Embedding model, optionally exposing ``tokenizer`` and ``max_seq_length``.
+
+    Returns:
+        Token count per text, including special tokens.
+    """
+    max_length = int(getattr(model, 'max_seq_length', 0) or 512)
+    tokenizer = getattr(model, 'tokenizer', None)
+    if tokenizer is None:
+        # Roughly 3-4 characters per subword token for Russian and English text.
+        return [min(len(text) // 3 + 2, max_length) for text in texts]
+
+    encoded = tokenizer(
+        texts,
+        truncation=True,
+        max_length=max_length,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+    )
+    return [len(ids) for ids in encoded['input_ids']]
+
+
+def plan_token_batches(token_counts: List[int], max_tokens_per_batch: int) -> List[List[int]]:
+    """Group text indices into length-sorted batches under a padded-token budget.
+
+    Texts are sorted from longest to shortest, so each batch is padded to
+    the length of its first text and its cost is ``len(batch) * first_length``.
+    A text longer than the budget gets a batch of its own.
+
+    Args:
+        token_counts: Token count per text.
+        max_tokens_per_batch: Maximum padded tokens per batch.
+
+    Returns:
+        Batches of indices into ``token_counts``.
+    """
+    order = sorted(range(len(token_counts)), key=lambda i: token_counts[i], reverse=True)
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    padded_length = 0
+    for index in order:
+        if batch and (len(batch) + 1) * padded_length > max_tokens_per_batch:
+            batches.append(batch)
+            batch = []
+        if not batch:
+            padded_length = max(token_counts[index], 1)
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
 def check_existing_embeddings(embeddings_path: str) -> bool:
     """Check whether an embeddings file exists on disk.
 
@@ -0,0 +1,242 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from rag_system.shared.logs import setup_logging
+from rag_system.shared.model_loader import get_hf_cache_model_path
+from rag_system.shared.model_loader import load_sentence_transformer
+
+# Model loaded once per worker process by _init_worker.
+_worker_model: Any = None
+
+
+def _init_worker(
+    model_source: str,
+    device: str,
+    trust_remote_code: bool,
+    num_threads: int,
+    backend: str,
+    onnx_file: Optional[str],
+) -> None:
+    """Load the embedding model in a pool worker process.
+
+    Args:
+        model_source: Local model path or Hugging Face model name.
+        device: Torch device for the model.
+        trust_remote_code: Whether to trust remote model code.
+        num_threads: Torch intra-op threads for this worker.
+        backend: Embedding inference backend.
+        onnx_file: Optional ONNX file inside the model directory.
+    """
+    global _worker_model
+
+    import torch
+
+    torch.set_num_threads(num_threads)
+    _worker_model = load_sentence_transformer(
+        model_source,
+        device=device,
+        trust_remote_code=trust_remote_code,
+        backend=backend,
+        onnx_file=onnx_file,
+    )
+
+
+def _encode_shard(texts: List[str], batch_size: int) -> np.ndarray:
+    """Encode one shard of prepared texts in a pool worker process."""
+    embeddings = _worker_model.encode(
+        texts,
+        batch_size=batch_size,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+    )
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def _encode_batches(batches: List[List[str]]) -> List[np.ndarray]:
+    """Encode pre-planned batches in a pool worker process."""
+    return [_encode_shard(texts, len(texts)) for texts in batches]
+
+
+def shard_ranges(count: int, num_workers: int, batch_size: int) -> List[Tuple[int, int]]:
+    """Split ``count`` items into contiguous shards for the worker pool.
+
+    Several shards are produced per worker so that workers finishing early
+    pick up more work, but a shard never holds less than one batch.
+
+    Args:
+        count: Number of items.
+        num_workers: Number of worker processes.
+        batch_size: Model batch size.
+
+    Returns:
+        List of ``(start, end)`` index pairs covering ``range(count)`` in order.
+    """
+    shard_size = max(batch_size, math.ceil(count / (num_workers * 4)), 1)
+    return [(start, min(start + shard_size, count)) for start in range(0, count, shard_size)]
+
+
+class EmbeddingPool:
+    """Pool of worker processes that each hold a copy of the embedding model.
+
+    Texts are split into contiguous shards, encoded in parallel, and the
+    vectors are reassembled in input order. Workers are started lazily on
+    the first call so services that never embed large batches do not pay
+    for them.
+    """
+
+    def __init__(
+        self,
+        model_source: str,
+        num_workers: int,
+        threads_per_worker: int = 0,
+        device: str = 'cpu',
+        trust_remote_code: bool = False,
+        logs_dir: str = './logs',
+        backend: str = 'torch',
+        onnx_file: Optional[str] = None,
+    ) -> None:
+        """Initialize the embedding pool.
+
+        Args:
+            model_source: Local model path or Hugging Face model name.
+            num_workers: Number of worker processes.
+            threads_per_worker: Torch threads per worker. ``0`` splits the
+                available CPUs evenly between workers.
+            device: Torch device for the worker models.
+            trust_remote_code: Whether to trust remote model code.
+            logs_dir: Directory for log files.
+            backend: Embedding inference backend for the worker models.
+            onnx_file: Optional ONNX file inside the model directory.
+        """
+        self.model_source = model_source
+        self.num_workers = max(1, int(num_workers))
+        self.threads_per_worker = int(threads_per_worker) or max(1, (os.cpu_count() or 1) // self.num_workers)
+        self.device = device
+        self.trust_remote_code = trust_remote_code
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self.logger = setup_logging(logs_dir, 'EmbeddingPool')
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = Lock()
+
+    @classmethod
+    def from_config(cls, config: Any) -> Optional["EmbeddingPool"]:
+        """Create an embedding pool from a configuration object.
+
+        Args:
+            config: Configuration object with embedding model settings.
+
+        Returns:
+            An embedding pool, or None if ``emb_num_workers`` is below 2.
+        """
+        num_workers = int(getattr(config, 'emb_num_workers', 1) or 1)
+        if num_workers < 2:
+            return None
+
+        model_name = config.emb_model_name
+        try:
+            model_source = get_hf_cache_model_path(model_name)
+        except FileNotFoundError:
+            model_source = model_name
+
+        return cls(
+            model_source,
+            num_workers=num_workers,
+            threads_per_worker=int(getattr(config, 'emb_threads_per_worker', 0) or 0),
+            device=str(getattr(config, 'emb_device', 'cpu')),
+            trust_remote_code=bool(getattr(config, 'emb_trust_remote_code', False)),
+            logs_dir=config.logs_dir,
+            backend=str(getattr(config, 'emb_backend', 'torch') or 'torch'),
+            onnx_file=getattr(config, 'emb_onnx_file', None) or None,
+        )
+
+    def encode(self, prepared_texts: List[str], batch_size: int) -> np.ndarray:
+        """Encode prepared texts across the worker processes.
+
+        Args:
+            prepared_texts: Texts with any model-specific prefixes applied.
+            batch_size: Model batch size inside each worker.
+
+        Returns:
+            Float32 array of raw (not normalized) embeddings in input order.
+
+        Raises:
+            BrokenProcessPool: If a worker process dies.
+        """
+        ranges = shard_ranges(len(prepared_texts), self.num_workers, batch_size)
+        executor = self._get_executor()
+        futures = [
+            executor.submit(_encode_shard, prepared_texts[start:end], batch_size)
+            for start, end in ranges
+        ]
+        try:
+            return np.vstack([future.result() for future in futures])
+        except BrokenProcessPool:
+            # Drop the broken executor so the next call starts fresh workers.
+            self.logger.error("Embedding worker process died, restarting the pool on next use")
+            self.close()
+            raise
+
+    def encode_batches(self, batches: List[List[str]]) -> List[np.ndarray]:
+        """Encode pre-planned batches across the worker processes.
+
+        Consecutive batches are grouped so each worker task holds several
+        of them; every batch is encoded as a single model batch.
+
+        Args:
+            batches: Batches of prepared texts.
+
+        Returns:
+            One float32 array of raw embeddings per input batch, in order.
+
+        Raises:
+            BrokenProcessPool: If a worker process dies.
+        """
+        groups = [batches[start:end] for start, end in shard_ranges(len(batches), self.num_workers, 1)]
+        executor = self._get_executor()
+        futures = [executor.submit(_encode_batches, group) for group in groups]
+        try:
+            return [output for future in futures for output in future.result()]
+        except BrokenProcessPool:
+            self.logger.error("Embedding worker process died, restarting the pool on next use")
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the process pool, starting it on first use."""
+        with self._lock:
+            if self._executor is None:
+                self.logger.info(
+                    f"Starting {self.num_workers} embedding workers "
+                    f"with {self.threads_per_worker} threads each"
+                )
+                # Spawn rather than fork: torch and FAISS threads do not survive fork.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.num_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(
+                        self.model_source,
+                        self.device,
+                        self.trust_remote_code,
+                        self.threads_per_worker,
+                        self.backend,
+                        self.onnx_file,
+                    ),
+                )
+            return self._executor
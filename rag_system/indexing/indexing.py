@@ -1,7 +1,12 @@
 import json
 import os
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import datetime
-from typing import Any, List, Optional
+from threading import Lock
+from threading import RLock
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
 import numpy as np
 import pandas as pd
@@ -9,15 +14,26 @@ import requests
 from sentence_transformers import SentenceTransformer
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from rag_system.indexing.compaction import carry_over_tombstones
+from rag_system.indexing.compaction import merge_segments
+from rag_system.indexing.compaction import plan_compaction
 from rag_system.indexing.data_processing import check_data_quality
 from rag_system.indexing.data_processing import compute_text_hash
 from rag_system.indexing.data_processing import normalize_text
 from rag_system.indexing.data_vectorize import create_embeddings
+from rag_system.indexing.embedding_pool import EmbeddingPool
 from rag_system.shared.data_base import FaissDB
 from rag_system.shared.data_loader import DataLoader
+from rag_system.shared.embedding_cache import EmbeddingCache
+from rag_system.shared.index_snapshot import IndexArtifacts
 from rag_system.shared.index_snapshot import IndexSnapshotStore
+from rag_system.shared.index_snapshot import Segment
+from rag_system.shared.index_snapshot import SegmentWriter
+from rag_system.shared.index_snapshot import read_chunk_store
 from rag_system.shared.logs import setup_logging
+from rag_system.shared.model_loader import embedding_model_id
 from rag_system.shared.model_loader import get_hf_cache_model_path
+from rag_system.shared.model_loader import load_sentence_transformer
 
 
 class Indexing:
@@ -39,19 +55,36 @@ class Indexing:
         self.hashes_path: str = config.hashes_path
         self.processed_data_path: str = config.processed_data_path
         self.batch_size: int = config.batch_size
+        self.emb_max_tokens_per_batch: int = int(getattr(config, 'emb_max_tokens_per_batch', 0) or 0)
         self.quality_log_path: str = config.quality_log_path
         self.emb_model_name: str = config.emb_model_name
         self.emb_trust_remote_code: bool = bool(getattr(config, 'emb_trust_remote_code', False))
         self.emb_device: str = str(getattr(config, 'emb_device', 'cpu'))
+        self.emb_backend: str = str(getattr(config, 'emb_backend', 'torch') or 'torch')
+        self.emb_onnx_file: Optional[str] = getattr(config, 'emb_onnx_file', None) or None
+        self.emb_model_id: str = embedding_model_id(self.emb_model_name, self.emb_backend, self.emb_onnx_file)
         self.incrementation_flag: bool = config.incrementation_flag
         self.delete_data_flag: bool = config.delete_data_flag
+        self.index_append: bool = bool(getattr(config, 'index_append', True))
+        self.streaming_indexing: bool = bool(getattr(config, 'streaming_indexing', False))
+        self.stream_batch_size: int = int(getattr(config, 'stream_batch_size', 1024))
         self.max_texts: Optional[int] = int(getattr(config, 'max_texts', 0)) or None
+        self.segmented_index: bool = bool(getattr(config, 'segmented_index', False))
+        self.segment_merge_factor: int = int(getattr(config, 'segment_merge_factor', 4))
+        self.segment_small_max_items: int = int(getattr(config, 'segment_small_max_items', 20000))
+        self.segment_max_deleted_ratio: float = float(getattr(config, 'segment_max_deleted_ratio', 0.3))
+        self.segment_background_compaction: bool = bool(getattr(config, 'segment_background_compaction', True))
 
         self.data_base = data_base
         self.data_loader = data_loader
         self.snapshot_store = IndexSnapshotStore.from_config(config)
 
         self.existing_hashes: List[str] = []
+        # Serializes read-modify-write of the snapshot manifest; one compaction runs at a time.
+        self._publish_lock = RLock()
+        self._compaction_lock = Lock()
+        self._compaction_executor: Optional[ThreadPoolExecutor] = None
+        self._compaction_future: Optional[Future] = None
         self.embeddings_path: str = os.path.join(config.data_dir, "embeddings.npy")
 
         self.logger = setup_logging(self.logs_dir, 'IndexingService')
@@ -60,6 +93,8 @@ class Indexing:
         os.makedirs(self.data_dir, exist_ok=True)
 
         self.emb_model: SentenceTransformer = self.load_local_embedding_model()
+        self.embedding_cache: Optional[EmbeddingCache] = EmbeddingCache.from_config(config)
+        self.embedding_pool: Optional[EmbeddingPool] = EmbeddingPool.from_config(config)
 
         if self.incrementation_flag:
             self.load_existing_hashes()
@@ -75,11 +110,13 @@ class Indexing:
         """
         try:
             model_path = get_hf_cache_model_path(self.emb_model_name)
-            self.logger.info(f"Loading embedding model from local cache: {model_path}")
-            return SentenceTransformer(
+            self.logger.info(f"Loading embedding model from local cache: {model_path} (backend: {self.emb_backend})")
+            return load_sentence_transformer(
                 model_path,
                 device=self.emb_device,
                 trust_remote_code=self.emb_trust_remote_code,
+                backend=self.emb_backend,
+                onnx_file=self.emb_onnx_file,
             )
         except FileNotFoundError:
             return self.download_embedding_model()
@@ -98,10 +135,12 @@ class Indexing:
         """
         self.logger.info(f"Downloading model {self.emb_model_name}...")
         try:
-            emb_model = SentenceTransformer(
+            emb_model = load_sentence_transformer(
                 self.emb_model_name,
                 device=self.emb_device,
                 trust_remote_code=self.emb_trust_remote_code,
+                backend=self.emb_backend,
+                onnx_file=self.emb_onnx_file,
             )
             self.logger.info(f"Model {self.emb_model_name} loaded successfully")
             return emb_model
@@ -109,6 +148,27 @@ class Indexing:
             self.logger.error(f"Failed to download model {self.emb_model_name}: {e}")
             raise
 
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Create passage embeddings with the indexing model and embedding cache.
+
+        Args:
+            texts: Chunk texts to embed.
+
+        Returns:
+            L2-normalized float32 array of embeddings.
+        """
+        return create_embeddings(
+            texts,
+            self.emb_model,
+            batch_size=self.batch_size,
+            model_name=self.emb_model_name,
+            is_query=False,
+            cache=self.embedding_cache,
+            model_id=self.emb_model_id,
+            pool=self.embedding_pool,
+            max_tokens_per_batch=self.emb_max_tokens_per_batch,
+        )
+
     def download_data(self) -> None:
         """Download source data to the configured local path.
 
@@ -152,10 +212,9 @@ class Indexing:
 
     def load_existing_hashes(self) -> None:
         """Load text hashes from the current processed data snapshot."""
-        processed_data = self.snapshot_store.load_processed_data()
-        if processed_data:
-            df = pd.DataFrame(processed_data)
-            self.existing_hashes = df['hash'].tolist()
+        hashes = self.snapshot_store.load_hashes()
+        if hashes:
+            self.existing_hashes = hashes
             self.logger.info(f"Loaded {len(self.existing_hashes)} existing hashes")
         else:
             self.existing_hashes = []
@@ -256,6 +315,10 @@ class Indexing:
             ValueError: If processed data, embeddings, and index sizes are inconsistent.
             Exception: If loading, embedding, indexing, or snapshot publication fails.
         """
+        if self.streaming_indexing:
+            self.run_streaming_indexing(data)
+            return
+
         try:
             if data is None:
                 if self.data_url:
@@ -295,6 +358,8 @@ class Indexing:
                 df_chunks_new = df_chunks
             else:
                 df_chunks_new = df_chunks[~df_chunks['hash'].isin(self.existing_hashes)]
+                # Keep new rows unique so they stay row-aligned with the appended vectors.
+                df_chunks_new = df_chunks_new.drop_duplicates(subset=['hash'], keep='first')
 
             if df_chunks_new.empty:
                 if not self.incrementation_flag:
@@ -312,15 +377,26 @@ class Indexing:
             )
 
             # Create embeddings in memory first (may fail — no disk writes yet)
-            new_embeddings = create_embeddings(
-                df_chunks_new['text'].tolist(),
-                self.emb_model,
-                batch_size=self.batch_size,
-                model_name=self.emb_model_name,
-                is_query=False,
-            )
+            new_embeddings = self.embed_texts(df_chunks_new['text'].tolist())
+
+            if self.incrementation_flag and self._can_append_segment():
+                index = self.data_base.build_index(new_embeddings)
+                writer = self.snapshot_store.open_segment_writer()
+                try:
+                    writer.write(df_chunks_new.to_dict(orient='records'), new_embeddings)
+                    artifacts = self._publish_new_segment(writer, index)
+                except Exception:
+                    writer.abort()
+                    raise
+                self.existing_hashes = self.existing_hashes + df_chunks_new['hash'].tolist()
+                self.logger.info(
+                    f"Published index snapshot {artifacts.snapshot_id} with a new segment of {len(df_chunks_new)} chunks"
+                )
+                self.schedule_compaction()
+                return
 
             combined_df = self.build_processed_data(df_chunks_new)
+            new_index: Optional[Any] = None
 
             if self.incrementation_flag:
                 existing_embeddings = self.snapshot_store.load_embeddings()
@@ -331,17 +407,13 @@ class Indexing:
                         f"Combined embeddings: existing {existing_embeddings.shape[0]} + "
                         f"new {new_embeddings.shape[0]} = {all_embeddings.shape[0]}"
                     )
+                    if self.index_append and existing_count:
+                        new_index = self.append_to_snapshot_index(new_embeddings, existing_count)
                 elif existing_count:
                     self.logger.warning(
                         "Existing embeddings are missing or inconsistent; rebuilding embeddings for the full snapshot."
                     )
-                    all_embeddings = create_embeddings(
-                        combined_df['text'].tolist(),
-                        self.emb_model,
-                        batch_size=self.batch_size,
-                        model_name=self.emb_model_name,
-                        is_query=False,
-                    )
+                    all_embeddings = self.embed_texts(combined_df['text'].tolist())
                 else:
                     all_embeddings = new_embeddings
                     self.logger.info("Created new embeddings (no existing found)")
@@ -353,12 +425,14 @@ class Indexing:
                     f"Processed data count ({len(combined_df)}) does not match embeddings count ({all_embeddings.shape[0]})"
                 )
 
-            new_index = self.data_base.build_index(all_embeddings)
-            artifacts = self.snapshot_store.publish(
-                combined_df.to_dict(orient='records'),
-                all_embeddings,
-                new_index,
-            )
+            if new_index is None:
+                new_index = self.data_base.build_index(all_embeddings)
+            with self._publish_lock:
+                artifacts = self.snapshot_store.publish(
+                    combined_df.to_dict(orient='records'),
+                    all_embeddings,
+                    new_index,
+                )
             self.data_base.index = new_index
 
             if self.incrementation_flag:
@@ -381,9 +455,444 @@ class Indexing:
                     self.logger.warning("Could not restore index from disk")
             raise
 
+    def run_streaming_indexing(self, data: Optional[Any] = None) -> None:
+        """Build and publish a snapshot by streaming the source in fixed-size batches.
+
+        Each batch goes through quality filtering, chunking, hash de-duplication,
+        embedding, and index insertion before the next batch is read, so peak
+        memory is bounded by ``stream_batch_size`` plus the FAISS index itself.
+        The published snapshot has the same format as ``run_indexing`` output.
+
+        Args:
+            data: Optional data source. If omitted, the configured URL or data path is used.
+
+        Raises:
+            ValueError: If processed data, embeddings, and index sizes are inconsistent.
+            Exception: If loading, embedding, indexing, or snapshot publication fails.
+        """
+        if data is None:
+            if self.data_url:
+                self.download_data()
+            data = self.data_path
+
+        source_file = os.path.basename(data) if isinstance(data, str) and data else 'unknown'
+
+        if self.incrementation_flag:
+            self.load_existing_hashes()
+        else:
+            self.existing_hashes = []
+
+        # New chunks go to their own segment when the current snapshot can reference it.
+        append_segment = self.incrementation_flag and bool(self.existing_hashes) and self._can_append_segment()
+        writer = self.snapshot_store.open_segment_writer() if append_segment else self.snapshot_store.open_writer()
+        try:
+            index: Optional[Any] = None
+            if self.incrementation_flag and self.existing_hashes and not append_segment:
+                index = self._stream_existing_snapshot(writer)
+
+            new_hashes: List[str] = []
+            for df_chunks in self.iter_chunk_batches(data, source_file):
+                embeddings = self.embed_texts(df_chunks['text'].tolist())
+                if index is not None:
+                    self.data_base.append_to_index(index, embeddings)
+                writer.write(df_chunks.to_dict(orient='records'), embeddings)
+                new_hashes.extend(df_chunks['hash'].tolist())
+                self.logger.info(f"Indexed batch of {len(df_chunks)} chunks ({len(new_hashes)} new so far)")
+
+            if not new_hashes:
+                writer.abort()
+                self.logger.info("No new unique chunks to index.")
+                return
+
+            if index is None or not self.data_base.index_fits(index, writer.items_count):
+                # Built from the staged vectors so the index family and its training
+                # sample reflect the whole snapshot rather than the first batch.
+                index = self.data_base.build_index_from_rows(writer.staged_embeddings(), self.stream_batch_size)
+
+            if append_segment:
+                artifacts = self._publish_new_segment(writer, index)
+            else:
+                with self._publish_lock:
+                    artifacts = writer.commit(index)
+                self.data_base.index = index
+            if self.incrementation_flag:
+                self.existing_hashes = self.existing_hashes + new_hashes
+            else:
+                self.existing_hashes = new_hashes
+            self.logger.info(f"Published index snapshot {artifacts.snapshot_id} with {writer.items_count} new chunks")
+            if append_segment:
+                self.schedule_compaction()
+
+        except Exception as e:
+            writer.abort()
+            self.logger.error(f"Streaming indexing error: {e}")
+            raise
+
+    def _can_append_segment(self) -> bool:
+        """Return whether new chunks can be published as a segment next to the current ones."""
+        if not self.segmented_index:
+            return False
+        segments = self.snapshot_store.current_artifacts().segments
+        return bool(segments) and all(
+            segment.directory is not None and segment.items_count is not None for segment in segments
+        )
+
+    def _publish_new_segment(self, writer: SegmentWriter, index: Any) -> IndexArtifacts:
+        """Finish a segment and publish it after the segments of the current snapshot.
+
+        Args:
+            writer: Segment writer holding the new rows.
+            index: FAISS index built from the new rows only.
+
+        Returns:
+            Paths for the newly published snapshot.
+
+        Raises:
+            Exception: If the segment cannot be written or published.
+        """
+        try:
+            segment = writer.finish(index)
+            with self._publish_lock:
+                current = self.snapshot_store.current_artifacts().segments
+                return self.snapshot_store.publish_segments([*current, segment])
+        except Exception:
+            writer.abort()
+            raise
+
+    def schedule_compaction(self) -> None:
+        """Start a background compaction if the size policy asks for one and none is running."""
+        if not (self.segmented_index and self.segment_background_compaction):
+            return
+        if self._compaction_future is not None and not self._compaction_future.done():
+            return
+        if not self._plan_compaction(self.snapshot_store.current_artifacts().segments):
+            return
+        if self._compaction_executor is None:
+            self._compaction_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='segment-compaction')
+        self._compaction_future = self._compaction_executor.submit(self._compact_in_background)
+
+    def _compact_in_background(self) -> None:
+        """Run one compaction and log failures instead of raising them in the worker thread."""
+        try:
+            self.compact_segments()
+        except Exception as e:
+            self.logger.error(f"Background segment compaction failed: {e}")
+
+    def close(self) -> None:
+        """Shut down the embedding worker processes and the compaction thread.
+
+        A running compaction is allowed to finish so it does not leave a
+        half-written segment behind.
+        """
+        if self.embedding_pool is not None:
+            self.embedding_pool.close()
+        if self._compaction_executor is not None:
+            self._compaction_executor.shutdown(wait=True, cancel_futures=True)
+            self._compaction_executor = None
+
+    def _plan_compaction(self, segments: Sequence[Segment]) -> List[Segment]:
+        """Apply the configured size policy to a list of segments."""
+        return plan_compaction(
+            segments,
+            merge_factor=self.segment_merge_factor,
+            small_max_items=self.segment_small_max_items,
+            max_deleted_ratio=self.segment_max_deleted_ratio,
+        )
+
+    def compact_segments(self) -> Optional[IndexArtifacts]:
+        """Merge the segments chosen by the size policy and publish the result.
+
+        The merge runs without holding the publish lock, so uploads and deletes
+        continue meanwhile. Rows deleted during the merge are carried over as
+        tombstones of the merged segment. If a merged segment disappeared from
+        the snapshot in the meantime the result is discarded.
+
+        Returns:
+            Paths for the newly published snapshot, or None if nothing was compacted.
+
+        Raises:
+            Exception: If reading segments, building the index, or publishing fails.
+        """
+        with self._compaction_lock:
+            chosen = self._plan_compaction(self.snapshot_store.current_artifacts().segments)
+            if not chosen:
+                return None
+
+            self.logger.info(f"Compacting {len(chosen)} segment(s) with {sum(s.live_count for s in chosen)} live chunks")
+            merged = merge_segments(
+                self.snapshot_store, chosen, self.data_base, self.stream_batch_size, self.embed_texts
+            )
+
+            with self._publish_lock:
+                current = {segment.segment_id: segment for segment in self.snapshot_store.current_artifacts().segments}
+                if any(segment.segment_id not in current for segment in chosen):
+                    self.logger.warning("Snapshot changed during compaction; discarding the merged segment.")
+                    if merged is not None:
+                        self.snapshot_store.remove_segments([merged])
+                    return None
+
+                chosen_ids = {segment.segment_id for segment in chosen}
+                if merged is not None:
+                    deleted = carry_over_tombstones(chosen, [current[segment.segment_id] for segment in chosen])
+                    merged = replace(merged, deleted=tuple(deleted))
+                segments = []
+                for segment in current.values():
+                    if segment.segment_id not in chosen_ids:
+                        segments.append(segment)
+                    elif segment.segment_id == chosen[0].segment_id and merged is not None and merged.live_count:
+                        segments.append(merged)
+
+                if not segments:
+                    self.clear_existing_data()
+                    return None
+                artifacts = self.snapshot_store.publish_segments(segments)
+
+            self.snapshot_store.retire_segments(chosen)
+            if merged is not None and not merged.live_count:
+                self.snapshot_store.remove_segments([merged])
+            self.logger.info(
+                f"Published compacted snapshot {artifacts.snapshot_id} with {len(segments)} segment(s)"
+            )
+            return artifacts
+
+    def iter_chunk_batches(self, data: Any, source_file: str) -> Iterator[pd.DataFrame]:
+        """Yield batches of new, quality-checked, normalized chunks from a data source.
+
+        Texts and chunks are de-duplicated by hash across batches and against
+        the current snapshot when incrementing.
+
+        Args:
+            data: Data source accepted by ``DataLoader.iter_data``.
+            source_file: Source filename stored with each chunk.
+
+        Returns:
+            An iterator over chunk DataFrames with ``text``, ``source``, ``timestamp`` and ``hash``.
+        """
+        existing: Set[str] = set(self.existing_hashes) if self.incrementation_flag else set()
+        seen_texts: Set[str] = set()
+        seen_chunks: Set[str] = set(existing)
+        quality_log: Dict[str, Any] = {
+            'empty_docs': {'count': 0},
+            'duplicate_texts': {'count': 0},
+            'short_texts': {'count': 0},
+            'remaining_docs': 0,
+            'removed_docs': 0,
+        }
+        remaining_texts = self.max_texts
+
+        for df in self.data_loader.iter_data(data, batch_size=self.stream_batch_size):
+            if remaining_texts is not None:
+                if remaining_texts <= 0:
+                    break
+                df = df.head(remaining_texts)
+                remaining_texts -= len(df)
+
+            batch_log, df_clean = check_data_quality(df, logger=self.logger)
+            for key in ('empty_docs', 'duplicate_texts', 'short_texts'):
+                quality_log[key]['count'] += batch_log[key]['count']
+            quality_log['remaining_docs'] += batch_log['remaining_docs']
+            quality_log['removed_docs'] += batch_log['removed_docs']
+
+            df_clean = df_clean[~df_clean['hash'].isin(seen_texts) & ~df_clean['hash'].isin(existing)]
+            seen_texts.update(df_clean['hash'])
+            if df_clean.empty:
+                continue
+
+            df_chunks = self.split_to_chunks(df_clean, source_file=source_file)
+            df_chunks['hash'] = df_chunks['text'].apply(compute_text_hash)
+            df_chunks = df_chunks[~df_chunks['hash'].isin(seen_chunks)].drop_duplicates(subset=['hash'], keep='first')
+            seen_chunks.update(df_chunks['hash'])
+            if df_chunks.empty:
+                continue
+
+            df_chunks = df_chunks.copy()
+            df_chunks['text'] = df_chunks['text'].apply(normalize_text)
+            yield df_chunks
+
+        # Streaming mode keeps only the counters; per-record details would grow with the corpus.
+        with open(self.quality_log_path, 'w') as f:
+            json.dump(quality_log, f, ensure_ascii=False)
+
+    def _stream_existing_snapshot(self, writer: Any) -> Optional[Any]:
+        """Copy the current snapshot into a writer batch by batch.
+
+        Stored vectors are reused when they are row-aligned with the processed
+        data; otherwise the existing texts are re-embedded.
+
+        Args:
+            writer: Snapshot writer receiving the existing rows.
+
+        Returns:
+            The published FAISS index, ready for new vectors to be appended, or
+            None if it cannot be reused and the caller should build the index
+            from the staged vectors.
+        """
+        existing_count = len(self.existing_hashes)
+        existing_embeddings = self.snapshot_store.load_embeddings(mmap=True)
+        embeddings_aligned = existing_embeddings is not None and existing_embeddings.shape[0] == existing_count
+
+        index: Optional[Any] = None
+        if embeddings_aligned and self.index_append:
+            index = self.data_base.read_index(self.snapshot_store.current_artifacts().index_path)
+            if index is not None and (index.ntotal != existing_count or index.d != existing_embeddings.shape[1]):
+                self.logger.warning("Published index is inconsistent with stored embeddings; rebuilding it.")
+                index = None
+        if not embeddings_aligned:
+            self.logger.warning(
+                "Existing embeddings are missing or inconsistent; rebuilding embeddings for the full snapshot."
+            )
+
+        offset = 0
+        for records in self.snapshot_store.iter_processed_data(self.stream_batch_size):
+            if embeddings_aligned:
+                batch_embeddings = np.asarray(existing_embeddings[offset:offset + len(records)], dtype=np.float32)
+            else:
+                batch_embeddings = self.embed_texts([record['text'] for record in records])
+            writer.write(records, batch_embeddings)
+            offset += len(records)
+
+        self.logger.info(f"Copied {offset} existing chunks into the new snapshot")
+        return index
+
+    def append_to_snapshot_index(self, new_embeddings: np.ndarray, existing_count: int) -> Optional[Any]:
+        """Append new vectors to a copy of the published snapshot index.
+
+        The index is read from the current snapshot rather than taken from
+        ``data_base`` so the appended result always matches the published rows.
+
+        Args:
+            new_embeddings: Embeddings for the chunks appended after existing rows.
+            existing_count: Number of rows already present in the published snapshot.
+
+        Returns:
+            Extended FAISS index, or None if the published index is not reusable
+            and the caller should rebuild the index from all embeddings.
+        """
+        artifacts = self.snapshot_store.current_artifacts()
+        index = self.data_base.read_index(artifacts.index_path)
+        if index is None:
+            self.logger.warning("Published index is unavailable; rebuilding the full index.")
+            return None
+        if index.ntotal != existing_count:
+            self.logger.warning(
+                f"Published index size ({index.ntotal}) does not match existing rows ({existing_count}); "
+                "rebuilding the full index."
+            )
+            return None
+        if index.d != new_embeddings.shape[1]:
+            self.logger.warning(
+                f"Published index dim ({index.d}) does not match embeddings dim ({new_embeddings.shape[1]}); "
+                "rebuilding the full index."
+            )
+            return None
+        if not self.data_base.index_fits(index, existing_count + new_embeddings.shape[0]):
+            self.logger.info("Corpus has outgrown the published index type; rebuilding the full index.")
+            return None
+
+        self.data_base.append_to_index(index, new_embeddings)
+        self.logger.info(f"Appended {new_embeddings.shape[0]} vectors to published index ({existing_count} existing)")
+        return index
+
+    def delete_source(self, source: str) -> Tuple[int, int]:
+        """Remove all chunks of one source file and publish a new snapshot.
+
+        Remaining rows keep their vectors from the snapshot embeddings artifact,
+        so deleting a document only rebuilds the index. Texts are re-embedded
+        only when the stored embeddings are missing or not row-aligned.
+
+        Args:
+            source: Source filename whose chunks should be removed.
+
+        Returns:
+            Tuple of (deleted chunks count, remaining chunks count).
+
+        Raises:
+            Exception: If embeddings, index building, or snapshot publication fails.
+        """
+        if self._can_append_segment():
+            return self._delete_source_with_tombstones(source)
+
+        processed_data = self.snapshot_store.load_processed_data()
+        keep_rows = [i for i, item in enumerate(processed_data) if item.get('source') != source]
+        deleted_count = len(processed_data) - len(keep_rows)
+
+        if deleted_count == 0:
+            return 0, len(processed_data)
+
+        if not keep_rows:
+            self.clear_existing_data()
+            self.logger.info(f"Deleted last source '{source}', index cleared")
+            return deleted_count, 0
+
+        remaining_data = [processed_data[i] for i in keep_rows]
+        existing_embeddings = self.snapshot_store.load_embeddings()
+        if existing_embeddings is not None and existing_embeddings.shape[0] == len(processed_data):
+            remaining_embeddings = np.ascontiguousarray(existing_embeddings[keep_rows], dtype=np.float32)
+        else:
+            self.logger.warning(
+                "Existing embeddings are missing or inconsistent; re-embedding the remaining snapshot."
+            )
+            remaining_embeddings = self.embed_texts([item['text'] for item in remaining_data])
+
+        new_index = self.data_base.build_index(remaining_embeddings)
+        with self._publish_lock:
+            artifacts = self.snapshot_store.publish(remaining_data, remaining_embeddings, new_index)
+        self.data_base.index = new_index
+        self.existing_hashes = [item.get('hash', '') for item in remaining_data]
+
+        self.logger.info(
+            f"Deleted '{source}' ({deleted_count} chunks), published snapshot {artifacts.snapshot_id} "
+            f"with {len(remaining_data)} chunks"
+        )
+        return deleted_count, len(remaining_data)
+
+    def _delete_source_with_tombstones(self, source: str) -> Tuple[int, int]:
+        """Tombstone the chunks of one source file without rewriting any segment.
+
+        Segments left without live rows are dropped from the snapshot.
+
+        Args:
+            source: Source filename whose chunks should be removed.
+
+        Returns:
+            Tuple of (deleted chunks count, remaining chunks count).
+
+        Raises:
+            Exception: If a segment cannot be read or the snapshot cannot be published.
+        """
+        with self._publish_lock:
+            segments = []
+            deleted_count = 0
+            for segment in self.snapshot_store.current_artifacts().segments:
+                rows = read_chunk_store(segment.processed_data_path, mmap=True).rows_with_value('source', source)
+                deleted = set(segment.deleted)
+                new_rows = set(rows.tolist()) - deleted
+                deleted_count += len(new_rows)
+                segments.append(replace(segment, deleted=tuple(sorted(deleted | new_rows))))
+
+            remaining_count = sum(segment.live_count for segment in segments)
+            if deleted_count == 0:
+                return 0, remaining_count
+            if remaining_count == 0:
+                self.clear_existing_data()
+                self.logger.info(f"Deleted last source '{source}', index cleared")
+                return deleted_count, 0
+
+            artifacts = self.snapshot_store.publish_segments([segment for segment in segments if segment.live_count])
+
+        self.snapshot_store.retire_segments([segment for segment in segments if not segment.live_count])
+        self.existing_hashes = self.snapshot_store.load_hashes()
+        self.logger.info(
+            f"Deleted '{source}' ({deleted_count} chunks) with tombstones, published snapshot "
+            f"{artifacts.snapshot_id} with {remaining_count} chunks"
+        )
+        self.schedule_compaction()
+        return deleted_count, remaining_count
+
     def clear_existing_data(self) -> None:
         """Clear existing processed data, embeddings, and FAISS index state."""
-        self.snapshot_store.clear()
+        with self._publish_lock:
+            self.snapshot_store.clear()
         self.data_base.index = None
         self.existing_hashes = []
         self.logger.info("Cleared existing hashes")
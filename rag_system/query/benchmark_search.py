@@ -0,0 +1,116 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from rag_system.query.tune_search import sample_held_out_queries
+from rag_system.shared.data_base import FaissDB
+from rag_system.shared.index_snapshot import IndexSnapshotStore
+from rag_system.shared.my_config import Config
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse CLI arguments for the concurrent search benchmark.
+
+    Returns:
+        Parsed CLI arguments.
+    """
+    parser = argparse.ArgumentParser(description="Measure FAISS search throughput with concurrent callers.")
+    parser.add_argument("--config", default="rag_system/query/config.yaml", help="Query config path.")
+    parser.add_argument("--callers", default="1,2,4,8", help="Comma-separated numbers of concurrent callers.")
+    parser.add_argument("--omp-threads", default="1", help="Comma-separated FAISS OpenMP threads per search.")
+    parser.add_argument(
+        "--ef-values",
+        default="",
+        help="Comma-separated efSearch values cycled across queries (empty = configured or tuned value).",
+    )
+    parser.add_argument("--num-queries", type=int, default=2000, help="Searches per configuration.")
+    parser.add_argument("--k", type=int, default=None, help="Neighbors per search (default: vector_candidate_k).")
+    return parser.parse_args()
+
+
+def _parse_list(value: str) -> List[int]:
+    """Parse a comma-separated list of integers."""
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def run_searches(
+    db: FaissDB,
+    queries: np.ndarray,
+    k: int,
+    callers: int,
+    ef_values: List[Optional[int]],
+) -> Tuple[float, List[float], List[np.ndarray]]:
+    """Run one search per query from ``callers`` threads sharing ``db``.
+
+    Args:
+        db: FaissDB with loaded segments.
+        queries: L2-normalized query matrix.
+        k: Number of neighbors per search.
+        callers: Number of concurrent threads.
+        ef_values: efSearch values assigned to queries in turn.
+
+    Returns:
+        Wall time in seconds, per-search latencies in milliseconds, and the
+        row ids returned for every query.
+    """
+    def search_one(i: int) -> Tuple[float, np.ndarray]:
+        start = time.perf_counter()
+        _, ids, _ = db.search_segments(queries[i:i + 1], k, ef_search=ef_values[i % len(ef_values)])
+        return (time.perf_counter() - start) * 1000, ids
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        results = list(pool.map(search_one, range(len(queries))))
+    elapsed = time.perf_counter() - start
+    return elapsed, [latency for latency, _ in results], [ids for _, ids in results]
+
+
+def main() -> None:
+    """Search the current snapshot with each caller count and print searches/sec.
+
+    Every configuration is checked against a single-threaded run with the
+    same per-query parameters, so a race between concurrent searches shows up
+    as mismatching results.
+    """
+    args = parse_args()
+    config = Config(args.config)
+    k = args.k or int(getattr(config, 'vector_candidate_k', getattr(config, 'k', 10)))
+
+    artifacts = IndexSnapshotStore.from_config(config).current_artifacts()
+    if not artifacts.segments:
+        raise RuntimeError("No published index snapshot found. Run indexing first.")
+    db = FaissDB(config)
+    db.load_segments(
+        artifacts.segments,
+        mmap=bool(getattr(config, 'mmap_snapshot', False)),
+        rescore_mode=str(getattr(config, 'rescore_mode', 'none') or 'none'),
+        rescore_factor=int(getattr(config, 'rescore_factor', 4)),
+        with_vectors=True,
+    )
+    queries, _ = sample_held_out_queries(db, args.num_queries)
+    queries = np.resize(queries, (args.num_queries, queries.shape[1]))
+    ef_values: List[Optional[int]] = list(_parse_list(args.ef_values)) or [None]
+    print(f"Benchmarking {len(queries)} searches, k={k}, efSearch={args.ef_values or 'default'}\n")
+
+    db.configure_search_concurrency(-1, 1)
+    run_searches(db, queries[:100], k, 1, ef_values)  # warm up page cache and allocations
+    _, _, expected = run_searches(db, queries, k, 1, ef_values)
+
+    for omp_threads in _parse_list(args.omp_threads):
+        for callers in _parse_list(args.callers):
+            db.configure_search_concurrency(callers, omp_threads)
+            elapsed, latencies, results = run_searches(db, queries, k, callers, ef_values)
+            mismatches = sum(not np.array_equal(got, want) for got, want in zip(results, expected, strict=True))
+            print(
+                f"callers={callers:<3} omp_threads={faiss.omp_get_max_threads():<3} "
+                f"{len(queries) / elapsed:9.1f} searches/sec p50={np.percentile(latencies, 50):7.2f}ms "
+                f"p99={np.percentile(latencies, 99):7.2f}ms mismatches={mismatches}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,10 @@
 import hashlib
 import logging
 import os
-from typing import Any, Dict, List, Optional, Union
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 import faiss
 import numpy as np
@@ -19,33 +22,34 @@ from rag_system.query.query import Query
 from rag_system.query.redis_client import RedisDB
 from rag_system.shared.data_loader import DataLoader
 from rag_system.shared.embedding_prefix import prepare_embedding_texts
+from rag_system.shared.temp_storage import SessionIndex
+from rag_system.shared.temp_storage import build_session_index
 
 logger = logging.getLogger(__name__)
 
+# Threads running the permanent search of combined queries next to the
+# temporary one; FaissDB bounds how many searches actually execute at once.
+SEARCH_WORKERS = 4
+_search_executor: Optional[ThreadPoolExecutor] = None
+_search_executor_lock = threading.Lock()
 
-def _temp_data_signature(temp_data_list: Union[List[Dict[str, Any]], Dict[str, Any]]) -> str:
-    """Build a deterministic signature for temporary indexed data."""
-    if isinstance(temp_data_list, dict):
-        temp_items = [temp_data_list]
-    else:
-        temp_items = temp_data_list
 
-    digest = hashlib.sha256()
-    for temp_data in temp_items:
-        chunks = temp_data.get('chunks', [])
-        digest.update(str(len(chunks)).encode('utf-8'))
-        for chunk in chunks:
-            if isinstance(chunk, dict):
-                source = str(chunk.get('source', ''))
-                text = str(chunk.get('text', ''))
-            else:
-                source = ''
-                text = str(chunk)
-            digest.update(source.encode('utf-8'))
-            digest.update(b'\0')
-            digest.update(text.encode('utf-8'))
-            digest.update(b'\0')
-    return digest.hexdigest()
+def _get_search_executor() -> ThreadPoolExecutor:
+    """Return the shared permanent search thread pool, creating it on first use."""
+    global _search_executor
+    with _search_executor_lock:
+        if _search_executor is None:
+            _search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="combined-search")
+        return _search_executor
+
+
+def shutdown_search_executor() -> None:
+    """Shut down the shared permanent search thread pool if it was created."""
+    global _search_executor
+    with _search_executor_lock:
+        executor, _search_executor = _search_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
 def _embedding_matrix(embeddings: Any, expected_count: int, label: str) -> np.ndarray:
@@ -70,81 +74,140 @@ def _embedding_matrix(embeddings: Any, expected_count: int, label: str) -> np.nd
 
 
 class CombinedQueryService:
-    """Search both permanent and temporary indexes with optional reranking."""
+    """Search both permanent and temporary indexes with optional reranking.
+
+    The question is embedded once and the permanent search runs on a small
+    process-wide thread pool while the temporary index is searched on the
+    calling thread; FAISS releases the GIL, so both searches overlap.
+    Candidates keep their dense scores through the merge.
+    """
 
     def __init__(
         self,
         permanent_query: Optional[Query],
         temp_index: Any,
-        temp_chunks: List[Any],
+        temp_chunks: Sequence[Any],
         emb_model: Any,
         k: int = 5,
         reranker: Optional[Any] = None,
         rerank_enabled: bool = False,
         rerank_candidate_k: int = 20,
         emb_model_name: Optional[str] = None,
+        emb_model_id: Optional[str] = None,
     ) -> None:
         self.permanent_query = permanent_query
         self.temp_index = temp_index
         self.temp_chunks = temp_chunks
         self.emb_model = emb_model
         self.emb_model_name = emb_model_name
+        self.emb_model_id = emb_model_id or emb_model_name
         self.k = k
         self.reranker = reranker
         self.rerank_enabled = rerank_enabled and reranker is not None
         self.rerank_candidate_k = rerank_candidate_k
 
-    def query(self, question: str) -> List[str]:
-        """Search in both permanent and temporary indexes.
+    def _shares_embedding(self) -> bool:
+        """Return whether the permanent query model can embed questions for the temporary index.
+
+        Model names alone are not enough: the same model run through ONNX or
+        int8 backends produces different vectors, so the full model ids must match.
+        """
+        if self.permanent_query is None or self.emb_model_id is None:
+            return False
+        permanent_id = getattr(self.permanent_query, 'emb_model_id', None)
+        if permanent_id is None:
+            permanent_id = getattr(self.permanent_query, 'emb_model_name', None)
+        return permanent_id == self.emb_model_id
+
+    def _encode_temp(self, question: str) -> np.ndarray:
+        """Embed a question with the temporary index model."""
+        prepared_question = prepare_embedding_texts(self.emb_model_name, [question], is_query=True)
+        query_embedding = self.emb_model.encode(prepared_question, convert_to_numpy=True)
+        query_embedding = _embedding_matrix(query_embedding, expected_count=1, label="Query embedding")
+        faiss.normalize_L2(query_embedding)
+        return query_embedding
+
+    def _search_permanent(self, query_embedding: np.ndarray, limit: Optional[int]) -> List[Tuple[str, float]]:
+        """Return scored candidates of the permanent index, at most ``limit`` if given."""
+        candidates = self.permanent_query.search_candidates(query_embedding)[0]
+        return candidates if limit is None else candidates[:limit]
+
+    def _search_temp(self, query_embedding: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Return scored candidates of the temporary index."""
+        scores, indices = self.temp_index.search(query_embedding, k=min(k, len(self.temp_chunks)))
+        candidates: List[Tuple[str, float]] = []
+        for score, i in zip(scores[0], indices[0], strict=True):
+            if 0 <= i < len(self.temp_chunks):
+                chunk = self.temp_chunks[i]
+                text = chunk.get('text', chunk) if isinstance(chunk, dict) else chunk
+                candidates.append((text, float(score)))
+            else:
+                logger.warning(f"Temporary index returned invalid index {i} (max: {len(self.temp_chunks)-1})")
+        return candidates
+
+    def search_candidates(self, question: str) -> List[Tuple[str, float]]:
+        """Search both indexes and merge their dense candidates.
+
+        When both indexes use the same embedding model and backend, the question is
+        encoded once by the permanent query (sharing its micro-batching) and
+        the merged candidates are ordered by inner product. Otherwise each
+        index embeds the question with its own model, and permanent
+        candidates come first because the scores are not comparable.
 
         Args:
             question: The query question.
 
         Returns:
-            Combined search results from both indexes.
+            Unique candidate texts with the best dense score each was found with.
         """
-        results: List[str] = []
-        skip_rerank = self.rerank_enabled
-
+        temp_k = self.rerank_candidate_k if self.rerank_enabled else self.k
+        permanent_limit = None if self.rerank_enabled else getattr(self.permanent_query, 'k', self.k)
+        shared = self._shares_embedding()
+        permanent: List[Tuple[str, float]] = []
+        temp: List[Tuple[str, float]] = []
+
+        permanent_embedding: Optional[np.ndarray] = None
+        future: Optional[Future] = None
         if self.permanent_query is not None:
             try:
-                permanent_results = self.permanent_query.query(question, skip_rerank=skip_rerank)
-                results.extend(permanent_results)
+                question = self.permanent_query.normalize_text(question)
+                permanent_embedding = self.permanent_query.encode_queries([question])
+                future = _get_search_executor().submit(self._search_permanent, permanent_embedding, permanent_limit)
             except Exception as e:
                 logger.warning(f"Failed to search in permanent index: {e}")
-
-        temp_search_k = self.rerank_candidate_k if self.rerank_enabled else self.k
         try:
-            prepared_question = prepare_embedding_texts(
-                self.emb_model_name,
-                [question],
-                is_query=True,
-            )
-            query_embedding = self.emb_model.encode(prepared_question, convert_to_numpy=True)
-            query_embedding = _embedding_matrix(query_embedding, expected_count=1, label="Query embedding")
-
-            faiss.normalize_L2(query_embedding)
-            _, indices = self.temp_index.search(
-                query_embedding,
-                k=min(temp_search_k, len(self.temp_chunks))
-            )
-
-            temp_results: List[str] = []
-            for i in indices[0]:
-                if i < len(self.temp_chunks):
-                    chunk = self.temp_chunks[i]
-                    if isinstance(chunk, dict):
-                        temp_results.append(chunk.get('text', chunk))
-                    else:
-                        temp_results.append(chunk)
-                else:
-                    logger.warning(f"Temporary index returned invalid index {i} (max: {len(self.temp_chunks)-1})")
-
-            results.extend(temp_results)
+            if shared and permanent_embedding is not None:
+                temp_embedding = permanent_embedding
+            else:
+                temp_embedding = self._encode_temp(question)
+            temp = self._search_temp(temp_embedding, temp_k)
         except Exception as e:
             logger.warning(f"Failed to search in temporary index: {e}")
+        if future is not None:
+            try:
+                permanent = future.result()
+            except Exception as e:
+                logger.warning(f"Failed to search in permanent index: {e}")
+
+        best: Dict[str, float] = {}
+        for text, score in permanent + temp:
+            if text not in best or score > best[text]:
+                best[text] = score
+        merged = list(best.items())
+        if shared:
+            merged.sort(key=lambda candidate: candidate[1], reverse=True)
+        return merged
+
+    def query(self, question: str) -> List[str]:
+        """Search in both permanent and temporary indexes.
 
-        unique_results: List[str] = list(dict.fromkeys(results))
+        Args:
+            question: The query question.
+
+        Returns:
+            Combined search results from both indexes.
+        """
+        unique_results = [text for text, _ in self.search_candidates(question)]
 
         if self.rerank_enabled and self.reranker is not None:
             return self.reranker.rerank(question, unique_results, self.k)
@@ -152,6 +215,32 @@ class CombinedQueryService:
         return unique_results[:self.k * 2]
 
 
+def temp_file_key(file_path: str, emb_model_id: Optional[str] = None) -> str:
+    """Build the content key a processed temporary upload is shared under.
+
+    The filename is part of the key because it selects the loader and
+    becomes the source of every chunk; the embedding model id because it
+    determines the vectors.
+
+    Args:
+        file_path: Path to the uploaded file.
+        emb_model_id: Id of the model and backend embedding the file, see
+            ``rag_system.shared.model_loader.embedding_model_id``.
+
+    Returns:
+        Hex SHA-256 digest over the model id, filename and file content.
+    """
+    digest = hashlib.sha256()
+    digest.update(str(emb_model_id or '').encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(os.path.basename(file_path).encode('utf-8'))
+    digest.update(b'\0')
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 def process_file_temp(
     file_path: str,
     data_loader: DataLoader,
@@ -165,7 +254,7 @@ def process_file_temp(
         indexing_service: Indexing service instance for embedding.
 
     Returns:
-        Dictionary with chunks and embeddings.
+        Dictionary with chunks and an L2-normalized float32 embedding matrix.
 
     Raises:
         ValueError: If no readable chunks can be extracted.
@@ -192,17 +281,7 @@ def process_file_temp(
             raise ValueError("Не удалось извлечь текст из файла. Проверьте, что документ содержит читаемый текст.")
 
         chunk_texts = [chunk['text'] for chunk in chunks]
-        prepared_chunk_texts = prepare_embedding_texts(
-            getattr(indexing_service, 'emb_model_name', None),
-            chunk_texts,
-            is_query=False,
-        )
-        embeddings = indexing_service.emb_model.encode(
-            prepared_chunk_texts,
-            batch_size=indexing_service.batch_size,
-            show_progress_bar=True,
-            convert_to_numpy=True,
-        )
+        embeddings = indexing_service.embed_texts(chunk_texts)
         embeddings = _embedding_matrix(
             embeddings,
             expected_count=len(chunk_texts),
@@ -213,7 +292,7 @@ def process_file_temp(
 
         temp_data: Dict[str, Any] = {
             'chunks': chunks,
-            'embeddings': embeddings.tolist()
+            'embeddings': embeddings
         }
 
         logger.info(f"Temporary indexing completed. Created {len(chunks)} chunks with embeddings.")
@@ -226,7 +305,7 @@ def process_file_temp(
 
 def create_combined_pipeline(
     query_service: Optional[Query],
-    temp_data_list: Union[List[Dict[str, Any]], Dict[str, Any]],
+    temp_data_list: Union[SessionIndex, List[Dict[str, Any]], Dict[str, Any]],
     indexing_service: Indexing,
     query_config: Any,
     responder: LLMResponder,
@@ -237,7 +316,8 @@ def create_combined_pipeline(
 
     Args:
         query_service: Permanent query service instance.
-        temp_data_list: List of temporary data dictionaries, each with chunks and embeddings.
+        temp_data_list: Ready session index from ``TempIndexManager.get_session_index``,
+            or temporary data dictionaries with chunks and embeddings to index now.
         indexing_service: Indexing service instance for embedding.
         query_config: Query configuration.
         responder: LLM responder instance.
@@ -250,38 +330,17 @@ def create_combined_pipeline(
     Raises:
         ValueError: If no permanent or temporary data is available or data shapes differ.
     """
-    if isinstance(temp_data_list, dict):
-        temp_data_list = [temp_data_list]
-
-    all_chunks: List[Any] = []
-    all_embeddings: List[Any] = []
-
-    for temp_data in temp_data_list:
-        if 'chunks' in temp_data and 'embeddings' in temp_data:
-            all_chunks.extend(temp_data['chunks'])
-            all_embeddings.extend(temp_data['embeddings'])
+    if isinstance(temp_data_list, SessionIndex):
+        session_index = temp_data_list
+    else:
+        session_index = build_session_index([temp_data_list] if isinstance(temp_data_list, dict) else temp_data_list)
 
-    if not all_embeddings:
+    if not session_index.ntotal:
         if query_service:
             return RAGPipeline(config=query_config, query=query_service, responder=responder, redis_client=redis_client)
         else:
             raise ValueError("No temporary or permanent data available")
 
-    if len(all_chunks) != len(all_embeddings):
-        raise ValueError(
-            f"Temporary chunks count ({len(all_chunks)}) does not match embeddings count ({len(all_embeddings)})"
-        )
-
-    temp_embeddings = _embedding_matrix(
-        all_embeddings,
-        expected_count=len(all_chunks),
-        label="Temporary index embeddings",
-    )
-
-    faiss.normalize_L2(temp_embeddings)
-    temp_index = faiss.IndexFlatIP(temp_embeddings.shape[1])
-    temp_index.add(temp_embeddings)
-
     reranker = getattr(query_service, 'reranker', None) if query_service else None
     rerank_enabled = bool(getattr(query_config, 'rerank_enabled', False))
     rerank_candidate_k = int(getattr(query_config, 'rerank_candidate_k', 20))
@@ -289,21 +348,22 @@ def create_combined_pipeline(
 
     combined_query_service = CombinedQueryService(
         query_service,
-        temp_index,
-        all_chunks,
+        session_index.index,
+        session_index.texts,
         indexing_service.emb_model,
         k=k,
         reranker=reranker,
         rerank_enabled=rerank_enabled,
         rerank_candidate_k=rerank_candidate_k,
         emb_model_name=getattr(indexing_service, 'emb_model_name', None),
+        emb_model_id=getattr(indexing_service, 'emb_model_id', None),
     )
     cache_namespace = build_cache_namespace(
         query_config,
         prefix="combined",
         extra=[
             f"session={session_id or 'none'}",
-            f"temp={_temp_data_signature(temp_data_list)}",
+            f"temp={session_index.signature}",
         ],
     )
 
@@ -318,4 +378,10 @@ def create_combined_pipeline(
     return combined_pipeline
 
 
-__all__ = ["CombinedQueryService", "create_combined_pipeline", "process_file_temp"]
+__all__ = [
+    "CombinedQueryService",
+    "create_combined_pipeline",
+    "process_file_temp",
+    "shutdown_search_executor",
+    "temp_file_key",
+]
@@ -0,0 +1,156 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class _Request:
+    """Items submitted by one caller and the slot its results are returned in."""
+
+    __slots__ = ("items", "done", "result", "error")
+
+    def __init__(self, items: List[Any]) -> None:
+        self.items = items
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    """Merge concurrent calls of a batch function into one call.
+
+    Callers block in ``submit`` while a worker thread collects requests for up
+    to ``window_ms`` after the first one arrives, or until ``max_batch_size``
+    items are queued, runs ``process`` once on all collected items and hands
+    every caller its slice of the results. Only the worker thread calls
+    ``process``, so a model is never run from several threads at once.
+
+    The worker exits after ``idle_timeout`` seconds without requests and is
+    restarted by the next ``submit``, so a discarded batcher does not keep a
+    thread or its model alive.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[List[Any]], Sequence[Any]],
+        window_ms: float = 2.0,
+        max_batch_size: int = 32,
+        idle_timeout: float = 5.0,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            process: Function mapping a list of items to one result per item,
+                as a list or an array indexed along its first axis.
+            window_ms: How long to wait for more requests after the first one.
+            max_batch_size: Number of items that closes a batch early. A
+                single request larger than this is still processed at once.
+            idle_timeout: Seconds without requests after which the worker exits.
+        """
+        self.process = process
+        self.window: float = max(0.0, float(window_ms)) / 1000
+        self.max_batch_size: int = max(1, int(max_batch_size))
+        self.idle_timeout: float = idle_timeout
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._batches = 0
+        self._requests = 0
+        self._items = 0
+        self._max_batch_items = 0
+        self._max_queue_depth = 0
+
+    def submit(self, items: Sequence[Any]) -> Any:
+        """Process items together with those of concurrent callers.
+
+        Args:
+            items: Items of this caller.
+
+        Returns:
+            The results for ``items``, in order.
+
+        Raises:
+            Exception: Whatever ``process`` raised for the batch.
+        """
+        request = _Request(list(items))
+        if not request.items:
+            return self.process([])
+        with self._lock:
+            self._queue.put(request)
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="MicroBatcher", daemon=True)
+                self._worker.start()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and batch size metrics.
+
+        Returns:
+            Current and maximum queue depth (waiting requests), the number of
+            batches, requests and items processed, and the mean and maximum
+            batch size in items and mean requests per batch.
+        """
+        with self._lock:
+            batches = self._batches
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": batches,
+                "requests": self._requests,
+                "items": self._items,
+                "mean_batch_items": self._items / batches if batches else 0.0,
+                "max_batch_items": self._max_batch_items,
+                "mean_batch_requests": self._requests / batches if batches else 0.0,
+            }
+
+    def _run(self) -> None:
+        """Collect and process batches until the queue stays idle."""
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+            self._process_batch(self._collect(first))
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        """Gather requests arriving within the batching window."""
+        batch = [first]
+        size = len(first.items)
+        deadline = time.monotonic() + self.window
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.items)
+        return batch
+
+    def _process_batch(self, batch: List[_Request]) -> None:
+        """Run ``process`` on all items of a batch and hand out the results."""
+        items = [item for request in batch for item in request.items]
+        try:
+            results = self.process(items)
+            offset = 0
+            for request in batch:
+                request.result = results[offset:offset + len(request.items)]
+                offset += len(request.items)
+        except Exception as e:
+            for request in batch:
+                request.error = e
+        with self._lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._items += len(items)
+            self._max_batch_items = max(self._max_batch_items, len(items))
+        for request in batch:
+            request.done.set()
@@ -1,6 +1,4 @@
-import json
-import os
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import faiss
 import numpy as np
@@ -9,22 +7,28 @@ from sentence_transformers import SentenceTransformer
 from rag_system.shared.data_base import FaissDB
 from rag_system.shared.index_snapshot import IndexArtifacts
 from rag_system.shared.index_snapshot import IndexSnapshotStore
+from rag_system.shared.index_snapshot import SnapshotChunks
 from rag_system.shared.embedding_prefix import prepare_embedding_texts
 from rag_system.shared.embedding_prefix import uses_e5_prefix
 from rag_system.shared.logs import setup_logging
+from rag_system.shared.model_loader import embedding_model_id
 from rag_system.shared.model_loader import get_hf_cache_model_path
+from rag_system.shared.model_loader import load_sentence_transformer
+from rag_system.query.micro_batch import MicroBatcher
 from rag_system.query.reranker import CrossEncoderReranker
 
 
 class Query:
     """Preprocess user questions and run semantic search against a FAISS index."""
 
-    def __init__(self, config: Any, data_base: FaissDB) -> None:
+    def __init__(self, config: Any, data_base: FaissDB, faiss_omp_threads: Optional[int] = None) -> None:
         """Initialize the Query service with configuration parameters.
 
         Args:
             config: configuration object with parameters.
             data_base: FaissDB instance for vector search.
+            faiss_omp_threads: FAISS OpenMP threads per search, overriding the
+                config value; 0 leaves the process-wide OpenMP setting alone.
         """
         self.data_base = data_base
         self.snapshot_store = IndexSnapshotStore.from_config(config)
@@ -32,25 +36,79 @@ class Query:
         self.index_path: str = self.artifacts.index_path
         self.logs_dir: str = config.logs_dir
         self.processed_data_path: str = self.artifacts.processed_data_path
+        self.mmap_snapshot: bool = bool(getattr(config, 'mmap_snapshot', False))
         self.emb_model_name: str = config.emb_model_name
         self.emb_trust_remote_code: bool = bool(getattr(config, 'emb_trust_remote_code', False))
         self.emb_device: str = str(getattr(config, 'emb_device', 'cpu'))
-        self.data: Optional[List[Any]] = None
-        self.texts: Optional[List[str]] = None
+        self.emb_backend: str = str(getattr(config, 'emb_backend', 'torch') or 'torch')
+        self.emb_onnx_file: Optional[str] = getattr(config, 'emb_onnx_file', None) or None
+        self.emb_model_id: str = embedding_model_id(self.emb_model_name, self.emb_backend, self.emb_onnx_file)
+        self.chunks: Optional[SnapshotChunks] = None
+        self.texts: Optional[Sequence[str]] = None
         self.k: int = config.k
         self.rerank_enabled: bool = bool(getattr(config, 'rerank_enabled', False))
         self.rerank_candidate_k: int = int(getattr(config, 'rerank_candidate_k', self.k))
         self.vector_candidate_k: int = int(getattr(config, 'vector_candidate_k', max(self.rerank_candidate_k, self.k * 8)))
+        self.rescore_mode: str = str(getattr(config, 'rescore_mode', 'none') or 'none')
+        self.rescore_factor: int = int(getattr(config, 'rescore_factor', 4))
+        self.rescore_recall_tolerance: float = float(getattr(config, 'rescore_recall_tolerance', 0.02))
+        self.rescore_calibration_queries: int = int(getattr(config, 'rescore_calibration_queries', 0))
+        self.search_concurrency: int = int(getattr(config, 'search_concurrency', 0))
+        self.faiss_omp_threads: int = (
+            int(getattr(config, 'faiss_omp_threads', 0)) if faiss_omp_threads is None else int(faiss_omp_threads)
+        )
+        self.encode_batch_window_ms: float = float(getattr(config, 'encode_batch_window_ms', 0))
+        self.encode_max_batch_size: int = int(getattr(config, 'encode_max_batch_size', 32))
 
         self.logger = setup_logging(self.logs_dir, 'QueryService')
-        self.data_base.load_index(self.index_path)
-        if self.data_base.index is None:
+        if not self.artifacts.segments:
             raise FileNotFoundError(f"Index file not found or failed to load at {self.index_path}")
+        self.data_base.load_segments(
+            self.artifacts.segments,
+            mmap=self.mmap_snapshot,
+            rescore_mode=self.rescore_mode,
+            rescore_factor=self.rescore_factor,
+        )
+        self.data_base.configure_search_concurrency(self.search_concurrency, self.faiss_omp_threads)
         self.load_texts()
+        if self.data_base.rescore_mode != 'none' and self.rescore_calibration_queries > 0:
+            self.calibrate_rescore()
         self.embedding_model: SentenceTransformer = self.load_local_embedding_model()
+        # Merges query encodes of concurrent requests into one forward pass.
+        self.encode_batcher: Optional[MicroBatcher] = None
+        if self.encode_batch_window_ms > 0:
+            self.encode_batcher = MicroBatcher(
+                self._encode_queries,
+                window_ms=self.encode_batch_window_ms,
+                max_batch_size=self.encode_max_batch_size,
+            )
         self.reranker = CrossEncoderReranker(config)
         self.rerank_enabled = self.rerank_enabled and self.reranker.enabled
 
+    def calibrate_rescore(self) -> None:
+        """Calibrate ``rescore_factor`` once per snapshot.
+
+        Calibration scans every segment embedding, so its result is recorded
+        next to the snapshot manifest and reused by later ``Query`` instances
+        over the same snapshot; only a newly published snapshot is scanned again.
+        """
+        key = (
+            f"{self.data_base.rescore_mode}:k={self.search_k()}:tolerance={self.rescore_recall_tolerance}"
+            f":queries={self.rescore_calibration_queries}:start={self.rescore_factor}"
+        )
+        snapshot_id = self.artifacts.snapshot_id
+        recorded = self.snapshot_store.read_rescore_calibration(snapshot_id, key)
+        if recorded is not None:
+            self.data_base.rescore_factor = recorded
+            self.logger.info(f"Using rescore_factor={recorded} calibrated for snapshot {snapshot_id}")
+            return
+        self.data_base.calibrate_rescore(
+            self.search_k(),
+            self.rescore_recall_tolerance,
+            self.rescore_calibration_queries,
+        )
+        self.snapshot_store.record_rescore_calibration(snapshot_id, key, self.data_base.rescore_factor)
+
     def load_local_embedding_model(self) -> SentenceTransformer:
         """Load the embedding model from local Hugging Face cache.
 
@@ -62,11 +120,13 @@ class Query:
         """
         try:
             model_path = get_hf_cache_model_path(self.emb_model_name)
-            self.logger.info(f"Loading embedding model from local cache: {model_path}")
-            return SentenceTransformer(
+            self.logger.info(f"Loading embedding model from local cache: {model_path} (backend: {self.emb_backend})")
+            return load_sentence_transformer(
                 model_path,
                 device=self.emb_device,
                 trust_remote_code=self.emb_trust_remote_code,
+                backend=self.emb_backend,
+                onnx_file=self.emb_onnx_file,
             )
         except FileNotFoundError:
             self.logger.warning(f"Embedding model not found in cache, downloading: {self.emb_model_name}")
@@ -85,42 +145,64 @@ class Query:
             Exception: If the model cannot be downloaded or initialized.
         """
         try:
-            return SentenceTransformer(
+            return load_sentence_transformer(
                 self.emb_model_name,
                 device=self.emb_device,
                 trust_remote_code=self.emb_trust_remote_code,
+                backend=self.emb_backend,
+                onnx_file=self.emb_onnx_file,
             )
         except Exception as e:
             self.logger.error(f'Error downloading embedding model {self.emb_model_name}: {e}')
             raise
 
     def load_texts(self) -> None:
-        """Load processed texts and validate their count against the FAISS index.
+        """Load processed texts and validate their count against each segment index.
 
         Raises:
             FileNotFoundError: If processed data does not exist.
             ValueError: If data shape is invalid or inconsistent with the index.
-            Exception: If the processed data file cannot be read.
+            Exception: If the processed data cannot be read.
         """
-        if not os.path.exists(self.processed_data_path):
-            raise FileNotFoundError(f"Data file not found at {self.processed_data_path}")
-
         try:
-            with open(self.processed_data_path, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
-                if not isinstance(self.data, list):
-                    raise ValueError("Loaded data is not a list")
-
-                self.texts = [item['text'] for item in self.data]
-                self.logger.info(f'Loaded {len(self.texts)} texts from {self.processed_data_path}')
+            self.chunks = self.snapshot_store.load_chunks(mmap=self.mmap_snapshot, artifacts=self.artifacts)
+            if self.chunks is None or len(self.chunks.parts) != len(self.data_base.segments):
+                raise FileNotFoundError(f"Data file not found at {self.processed_data_path}")
+            self.texts = self.chunks.texts
+            self.logger.info(
+                f'Loaded {len(self.texts)} texts from {len(self.chunks.parts)} segment(s) of snapshot '
+                f'{self.artifacts.snapshot_id or "legacy"}'
+            )
 
-                if self.data_base.index is not None and self.data_base.index.ntotal != len(self.texts):
-                    self.logger.error(f"The number of texts ({len(self.texts)}) != the number of vectors ({self.data_base.index.ntotal})")
+            for store, segment in zip(self.chunks.parts, self.data_base.segments, strict=True):
+                if segment.index.ntotal != len(store):
+                    self.logger.error(
+                        f"The number of texts ({len(store)}) != the number of vectors ({segment.index.ntotal})"
+                    )
                     raise ValueError("The number of texts must match the number of vectors in the DB.")
         except Exception as e:
             self.logger.error(f"Failed to load data from {self.processed_data_path}: {str(e)}")
             raise
 
+    def batching_stats(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Return micro-batching metrics of query encoding and reranking.
+
+        Returns:
+            ``MicroBatcher.stats`` for ``encode`` and ``rerank``, or None where
+            batching is disabled.
+        """
+        return {
+            "encode": self.encode_batcher.stats() if self.encode_batcher is not None else None,
+            "rerank": self.reranker.batcher.stats() if self.reranker.batcher is not None else None,
+        }
+
+    def search_k(self) -> int:
+        """Return the number of vector candidates fetched for one query."""
+        search_k = max(self.k, self.vector_candidate_k)
+        if self.rerank_enabled:
+            search_k = max(search_k, self.rerank_candidate_k)
+        return max(search_k, 1)
+
     def normalize_text(self, text: str) -> str:
         """Normalize input text for search.
 
@@ -138,12 +220,53 @@ class Query:
 
         return text.strip()
 
-    def query(self, request: str, skip_rerank: bool = False) -> List[str]:
+    def encode_queries(self, requests: List[str]) -> np.ndarray:
+        """Embed normalized questions in one model call.
+
+        With ``encode_batch_window_ms`` set, questions of concurrent callers
+        are merged into a shared model call.
+
+        Args:
+            requests: Normalized search query strings.
+
+        Returns:
+            L2-normalized float32 query embeddings, one row per request.
+        """
+        if self.encode_batcher is not None:
+            return np.asarray(self.encode_batcher.submit(requests), dtype=np.float32)
+        return self._encode_queries(requests)
+
+    def _encode_queries(self, requests: List[str]) -> np.ndarray:
+        """Run the embedding model on normalized questions."""
+        if uses_e5_prefix(self.emb_model_name):
+            request_embeddings = self.embedding_model.encode(
+                prepare_embedding_texts(self.emb_model_name, requests, is_query=True),
+                convert_to_numpy=True,
+            )
+        else:
+            try:
+                request_embeddings = self.embedding_model.encode(
+                    requests,
+                    prompt_name="query",
+                    convert_to_numpy=True
+                )
+            except (ValueError, TypeError):
+                self.logger.warning("prompt_name='query' not supported by this model, encoding without prompt")
+                request_embeddings = self.embedding_model.encode(
+                    requests,
+                    convert_to_numpy=True
+                )
+        request_embeddings = np.array(request_embeddings, dtype=np.float32).reshape(len(requests), -1)
+        faiss.normalize_L2(request_embeddings)
+        return request_embeddings
+
+    def query(self, request: str, skip_rerank: bool = False, ef_search: Optional[int] = None) -> List[str]:
         """Semantic search query.
 
         Args:
             request: search query string.
             skip_rerank: if True, return full candidate set without reranking or truncation.
+            ef_search: HNSW ``efSearch`` for this request only; None uses the configured or tuned value.
 
         Returns:
             Top-k most similar texts from the dataset.
@@ -155,60 +278,85 @@ class Query:
         """
         if not isinstance(request, str):
             raise ValueError("Request must be a string.")
+        return self.query_batch([request], skip_rerank=skip_rerank, ef_search=ef_search)[0]
 
-        try:
-            res: List[str] = []
-
-            request = self.normalize_text(request)
-            if uses_e5_prefix(self.emb_model_name):
-                request_embedding = self.embedding_model.encode(
-                    prepare_embedding_texts(self.emb_model_name, [request], is_query=True),
-                    convert_to_numpy=True,
-                )
-            else:
-                try:
-                    request_embedding = self.embedding_model.encode(
-                        [request],
-                        prompt_name="query",
-                        convert_to_numpy=True
-                    )
-                except (ValueError, TypeError):
-                    self.logger.warning("prompt_name='query' not supported by this model, encoding without prompt")
-                    request_embedding = self.embedding_model.encode(
-                        [request],
-                        convert_to_numpy=True
-                    )
-            request_embedding = np.array(request_embedding, dtype=np.float32)
-            faiss.normalize_L2(request_embedding)
+    def query_batch(
+        self, requests: List[str], skip_rerank: bool = False, ef_search: Optional[int] = None
+    ) -> List[List[str]]:
+        """Semantic search for several questions at once.
 
-            search_k = max(self.k, self.vector_candidate_k)
-            if self.rerank_enabled:
-                search_k = max(search_k, self.rerank_candidate_k)
-            search_k = max(search_k, 1)
+        All questions are embedded in one model call and searched with one
+        FAISS call per segment, and their candidates are reranked together.
 
-            candidate_ids, vector_scores = self.data_base.search(request_embedding, search_k)
+        Args:
+            requests: search query strings.
+            skip_rerank: if True, return full candidate sets without reranking or truncation.
+            ef_search: HNSW ``efSearch`` for these requests only; None uses the configured or tuned value.
 
-            if self.texts is None:
-                raise RuntimeError("Texts are not loaded")
+        Returns:
+            Top-k most similar texts for every request, in request order.
 
-            if self.data_base.index is not None and self.data_base.index.ntotal != len(self.texts):
-                self.logger.error(f"The number of texts ({len(self.texts)}) != the number of vectors ({self.data_base.index.ntotal})")
-                raise ValueError("The number of texts must match the number of vectors in the DB.")
+        Raises:
+            ValueError: If a request is invalid or the index is inconsistent.
+            RuntimeError: If processed texts are not loaded.
+            Exception: If embedding or FAISS search fails.
+        """
+        if not all(isinstance(request, str) for request in requests):
+            raise ValueError("Every request must be a string.")
+        if not requests:
+            return []
 
-            for i, idx in enumerate(candidate_ids):
-                if idx < len(self.texts):
-                    self.logger.debug(f"Result {i}: dense_score={vector_scores[i]:.4f}, text={self.texts[idx][:80]}...")
-                    res.append(self.texts[idx])
-                else:
-                    self.logger.warning(f"Index {idx} is out of range for texts array (length: {len(self.texts)})")
+        try:
+            requests = [self.normalize_text(request) for request in requests]
+            request_embeddings = self.encode_queries(requests)
+            results = [
+                [text for text, _ in candidates]
+                for candidates in self.search_candidates(request_embeddings, ef_search=ef_search)
+            ]
 
             if skip_rerank:
-                return res
+                return results
 
             if self.rerank_enabled and self.reranker.enabled:
-                return self.reranker.rerank(request, res, self.k)
+                return self.reranker.rerank_batch(requests, results, self.k)
 
-            return res[: self.k]
+            return [res[: self.k] for res in results]
         except Exception as e:
             self.logger.error(f"Query failed: {str(e)}")
             raise
+
+    def search_candidates(
+        self, request_embeddings: np.ndarray, ef_search: Optional[int] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """Search already encoded questions and return dense candidates.
+
+        Args:
+            request_embeddings: L2-normalized query embeddings from ``encode_queries``.
+            ef_search: HNSW ``efSearch`` for these requests only; None uses the configured or tuned value.
+
+        Returns:
+            For every question, ``search_k`` candidate texts with their inner
+            product scores, best first.
+
+        Raises:
+            RuntimeError: If processed texts are not loaded.
+        """
+        hits = self.data_base.search_batch(request_embeddings, self.search_k(), ef_search=ef_search)
+
+        if self.chunks is None:
+            raise RuntimeError("Texts are not loaded")
+
+        results: List[List[Tuple[str, float]]] = []
+        for segment_positions, candidate_ids, vector_scores in hits:
+            res: List[Tuple[str, float]] = []
+            for i, (position, idx) in enumerate(zip(segment_positions, candidate_ids, strict=True)):
+                texts = self.chunks.parts[position].texts
+                if idx < len(texts):
+                    self.logger.debug(f"Result {i}: dense_score={vector_scores[i]:.4f}, text={texts[idx][:80]}...")
+                    res.append((texts[idx], float(vector_scores[i])))
+                else:
+                    self.logger.warning(
+                        f"Index {idx} is out of range for segment {position} texts (length: {len(texts)})"
+                    )
+            results.append(res)
+        return results
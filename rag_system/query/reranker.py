@@ -1,7 +1,8 @@
-from typing import Any, List, Optional, Tuple
+from typing import Any, List, Optional, Sequence, Tuple
 
 from sentence_transformers import CrossEncoder
 
+from rag_system.query.micro_batch import MicroBatcher
 from rag_system.shared.logs import setup_logging
 from rag_system.shared.model_loader import get_hf_cache_model_path
 
@@ -17,7 +18,11 @@ class CrossEncoderReranker:
         self.max_chars: int = int(getattr(config, 'rerank_max_chars', 1000))
         self.score_threshold: float = float(getattr(config, 'rerank_score_threshold', -1e9))
         self.device: str = getattr(config, 'reranker_device', 'cpu')
+        self.batch_window_ms: float = float(getattr(config, 'rerank_batch_window_ms', 0))
+        self.max_batch_pairs: int = int(getattr(config, 'rerank_max_batch_pairs', 256))
         self.model: Optional[CrossEncoder] = None
+        # Merges pair scoring of concurrent requests into shared model calls.
+        self.batcher: Optional[MicroBatcher] = None
 
         if not self.enabled:
             return
@@ -45,6 +50,13 @@ class CrossEncoderReranker:
             self.enabled = False
             self.model = None
 
+        if self.model is not None and self.batch_window_ms > 0:
+            self.batcher = MicroBatcher(
+                self._predict,
+                window_ms=self.batch_window_ms,
+                max_batch_size=self.max_batch_pairs,
+            )
+
     def _truncate(self, text: Any) -> str:
         """Trim text to the configured reranker input length."""
         if not isinstance(text, str):
@@ -64,18 +76,52 @@ class CrossEncoderReranker:
         Returns:
             Reranked texts filtered by score threshold and limited by top_k.
         """
-        if not self.enabled or self.model is None:
-            return texts
+        return self.rerank_batch([query], [texts], top_k)[0]
 
-        if not texts:
-            return texts
+    def rerank_batch(self, queries: List[str], texts: List[List[str]], top_k: Optional[int]) -> List[List[str]]:
+        """Rerank the candidates of several queries with one cross-encoder call.
 
-        if not isinstance(query, str) or not query.strip():
-            return texts
+        Pairs of all queries are scored together in ``batch_size`` batches,
+        so short candidate lists do not leave model batches half empty. With
+        ``rerank_batch_window_ms`` set, pairs of concurrent callers share
+        model calls as well.
 
-        pairs: List[Tuple[str, str]] = [(query, self._truncate(t)) for t in texts]
-        scores = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+        Args:
+            queries: Search queries.
+            texts: Candidate texts of every query.
+            top_k: Maximum number of results to return per query.
 
+        Returns:
+            Reranked texts of every query, filtered by score threshold and limited by top_k.
+        """
+        if not self.enabled or self.model is None:
+            return list(texts)
+
+        pairs: List[Tuple[str, str]] = []
+        ranked_queries = []
+        for i, (query, candidates) in enumerate(zip(queries, texts, strict=True)):
+            if not candidates or not isinstance(query, str) or not query.strip():
+                continue
+            ranked_queries.append(i)
+            pairs.extend((query, self._truncate(t)) for t in candidates)
+        if not pairs:
+            return list(texts)
+
+        scores = self.batcher.submit(pairs) if self.batcher is not None else self._predict(pairs)
+        results = list(texts)
+        offset = 0
+        for i in ranked_queries:
+            count = len(texts[i])
+            results[i] = self._rank(texts[i], scores[offset:offset + count], top_k)
+            offset += count
+        return results
+
+    def _predict(self, pairs: List[Tuple[str, str]]) -> Any:
+        """Score query/document pairs with the cross-encoder."""
+        return self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+
+    def _rank(self, texts: List[str], scores: Sequence[float], top_k: Optional[int]) -> List[str]:
+        """Order texts by reranker score and apply the score threshold and top_k."""
         ranked: List[Tuple[str, float]] = sorted(
             zip(texts, scores, strict=False), key=lambda x: x[1], reverse=True
         )
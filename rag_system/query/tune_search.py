@@ -0,0 +1,330 @@
+import argparse
+import sys
+import time
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import faiss
+import numpy as np
+
+from rag_system.shared.data_base import FaissDB
+from rag_system.shared.data_base import describe_index
+from rag_system.shared.embedding_prefix import prepare_embedding_texts
+from rag_system.shared.index_snapshot import IndexArtifacts
+from rag_system.shared.index_snapshot import IndexSnapshotStore
+from rag_system.shared.model_loader import get_hf_cache_model_path
+from rag_system.shared.model_loader import load_sentence_transformer
+from rag_system.shared.my_config import Config
+
+# Search parameter swept for each approximate index family.
+FAMILY_PARAMS = {"hnsw": "ef_search", "ivf": "nprobe"}
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse CLI arguments for the search parameter tuner.
+
+    Returns:
+        Parsed CLI arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Sweep HNSW efSearch / IVF nprobe and report recall@k against search latency."
+    )
+    parser.add_argument("--config", default="rag_system/query/config.yaml", help="Query config path.")
+    parser.add_argument("--k", type=int, default=None, help="Recall cutoff (default: vector_candidate_k).")
+    parser.add_argument("--target-recall", type=float, default=0.95, help="Recall@k the chosen setting must reach.")
+    parser.add_argument("--num-queries", type=int, default=200, help="Held-out chunk embeddings used as queries.")
+    parser.add_argument("--queries", default=None, help="Text file with one question per line instead of chunks.")
+    parser.add_argument("--ef-values", default="16,32,48,64,96,128,192,256,384,512", help="efSearch values to try.")
+    parser.add_argument("--nprobe-values", default="1,2,4,8,16,32,64,128,256", help="nprobe values to try.")
+    parser.add_argument("--write", action="store_true", help="Record the chosen settings in the snapshot manifest.")
+    return parser.parse_args()
+
+
+def _parse_list(value: str) -> List[int]:
+    """Parse a comma-separated list of integers."""
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def segment_families(db: FaissDB) -> Dict[str, List[int]]:
+    """Group loaded segments by the approximate index family they belong to.
+
+    Args:
+        db: FaissDB with loaded segments.
+
+    Returns:
+        Segment positions per family; flat and binary segments are exact or
+        not tunable and are left out.
+    """
+    families: Dict[str, List[int]] = {}
+    for position, segment in enumerate(db.segments):
+        if isinstance(segment.index, faiss.IndexBinary):
+            continue
+        if hasattr(segment.index, 'hnsw'):
+            families.setdefault("hnsw", []).append(position)
+        elif faiss.try_extract_index_ivf(segment.index) is not None:
+            families.setdefault("ivf", []).append(position)
+    return families
+
+
+def apply_setting(db: FaissDB, family: str, positions: Sequence[int], value: int) -> None:
+    """Set ``efSearch`` or ``nprobe`` on the given segments.
+
+    Args:
+        db: FaissDB with loaded segments.
+        family: ``hnsw`` or ``ivf``.
+        positions: Segment positions to update.
+        value: Parameter value.
+    """
+    for position in positions:
+        segment = db.segments[position]
+        if family == "hnsw":
+            segment.ef_search = value
+        else:
+            segment.nprobe = value
+
+
+def sample_held_out_queries(db: FaissDB, count: int, seed: int = 0) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+    """Sample live chunk embeddings to use as queries.
+
+    Args:
+        db: FaissDB with segments loaded ``with_vectors``.
+        count: Number of queries.
+        seed: Random seed.
+
+    Returns:
+        Query matrix and the (segment position, row) key of every query row,
+        so it can be excluded from its own results.
+    """
+    keys = [
+        (position, int(row))
+        for position, segment in enumerate(db.segments)
+        for row in np.setdiff1d(np.arange(segment.vectors.shape[0]), segment.deleted)
+    ]
+    rng = np.random.default_rng(seed)
+    chosen = sorted(rng.choice(len(keys), size=min(count, len(keys)), replace=False).tolist())
+    keys = [keys[i] for i in chosen]
+    queries = np.vstack([np.asarray(db.segments[p].vectors[[r]], dtype=np.float32) for p, r in keys])
+    faiss.normalize_L2(queries)
+    return queries, keys
+
+
+def embed_query_file(config: Any, path: str) -> np.ndarray:
+    """Embed questions from a text file with the configured embedding model.
+
+    Args:
+        config: Query configuration with embedding model settings.
+        path: File with one question per line.
+
+    Returns:
+        L2-normalized query matrix.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        questions = [line.strip() for line in f if line.strip()]
+    model_name = config.emb_model_name
+    try:
+        model_path = get_hf_cache_model_path(model_name)
+    except FileNotFoundError:
+        model_path = model_name
+    model = load_sentence_transformer(
+        model_path,
+        device=str(getattr(config, 'emb_device', 'cpu')),
+        trust_remote_code=bool(getattr(config, 'emb_trust_remote_code', False)),
+        backend=str(getattr(config, 'emb_backend', 'torch') or 'torch'),
+        onnx_file=getattr(config, 'emb_onnx_file', None) or None,
+    )
+    queries = np.asarray(
+        model.encode(prepare_embedding_texts(model_name, questions, is_query=True), convert_to_numpy=True),
+        dtype=np.float32,
+    )
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def measure(
+    db: FaissDB,
+    queries: np.ndarray,
+    exact: Sequence[Set[Tuple[int, int]]],
+    k: int,
+    exclude: Optional[Sequence[Tuple[int, int]]] = None,
+) -> Tuple[float, float, float]:
+    """Measure recall@k and single-query latency of ``search_segments``.
+
+    Args:
+        db: FaissDB with loaded segments.
+        queries: L2-normalized query matrix.
+        exact: Exact top-k keys per query.
+        k: Recall cutoff.
+        exclude: Key to drop from each query's results (its own row), if any.
+
+    Returns:
+        Tuple of (recall@k, p50 latency ms, p99 latency ms).
+    """
+    extra = 1 if exclude is not None else 0
+    recalls, latencies = [], []
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        positions, ids, _ = db.search_segments(query[None, :], k + extra)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found = [key for key in zip(positions.tolist(), ids.tolist(), strict=True) if exclude is None or key != exclude[i]][:k]
+        if exact[i]:
+            recalls.append(len(set(found) & exact[i]) / len(exact[i]))
+    recall = float(np.mean(recalls)) if recalls else 1.0
+    return recall, float(np.percentile(latencies, 50)), float(np.percentile(latencies, 99))
+
+
+def exact_neighbors(
+    db: FaissDB,
+    queries: np.ndarray,
+    k: int,
+    exclude: Optional[Sequence[Tuple[int, int]]] = None,
+) -> List[Set[Tuple[int, int]]]:
+    """Compute exact top-k keys per query, optionally without the query's own row."""
+    extra = 1 if exclude is not None else 0
+    exact = []
+    for i, keys in enumerate(db.exact_search_segments(queries, k + extra)):
+        pairs = [tuple(key) for key in keys.tolist() if exclude is None or tuple(key) != exclude[i]]
+        exact.append(set(pairs[:k]))
+    return exact
+
+
+def sweep(
+    db: FaissDB,
+    family: str,
+    positions: Sequence[int],
+    values: Sequence[int],
+    queries: np.ndarray,
+    exact: Sequence[Set[Tuple[int, int]]],
+    k: int,
+    target_recall: float,
+    exclude: Optional[Sequence[Tuple[int, int]]] = None,
+) -> Tuple[int, List[Tuple[int, float, float, float]]]:
+    """Sweep one search parameter and pick the smallest value meeting the target recall.
+
+    The chosen value is left applied, so families tuned later are measured with it.
+
+    Args:
+        db: FaissDB with loaded segments.
+        family: ``hnsw`` or ``ivf``.
+        positions: Segment positions of the family.
+        values: Parameter values to try.
+        queries: L2-normalized query matrix.
+        exact: Exact top-k keys per query.
+        k: Recall cutoff.
+        target_recall: Recall@k the chosen value must reach.
+        exclude: Key to drop from each query's results, if queries are held-out rows.
+
+    Returns:
+        The chosen value (the largest tried if none meets the target) and
+        (value, recall, p50 ms, p99 ms) rows.
+    """
+    if family == "ivf":
+        nlist = min(faiss.extract_index_ivf(db.segments[p].index).nlist for p in positions)
+        values = sorted({min(value, nlist) for value in values})
+    rows = []
+    for value in sorted(values):
+        apply_setting(db, family, positions, value)
+        # One untimed query so lazily mapped pages do not count against the first setting.
+        db.search_segments(queries[:1], k)
+        rows.append((value,) + measure(db, queries, exact, k, exclude))
+
+    passing = [row[0] for row in rows if row[1] >= target_recall]
+    chosen = passing[0] if passing else rows[-1][0]
+    apply_setting(db, family, positions, chosen)
+    return chosen, rows
+
+
+def write_manifest(
+    store: IndexSnapshotStore,
+    artifacts: IndexArtifacts,
+    db: FaissDB,
+    settings: Dict[str, int],
+    families: Dict[str, List[int]],
+) -> IndexArtifacts:
+    """Publish the tuned snapshot with the chosen settings in its segment index specs.
+
+    Args:
+        store: Snapshot store of the tuned snapshot.
+        artifacts: Snapshot the settings were tuned on.
+        db: FaissDB whose loaded segments match ``artifacts.segments``.
+        settings: Chosen value per family.
+        families: Segment positions per family.
+
+    Returns:
+        The newly published snapshot.
+
+    Raises:
+        RuntimeError: If another snapshot was published while tuning, or the
+            snapshot has legacy artifacts that a manifest cannot reference.
+    """
+    current = store.current_artifacts()
+    if current.snapshot_id != artifacts.snapshot_id:
+        raise RuntimeError("A new snapshot was published while tuning; run the tuner again.")
+    if any(segment.directory is None for segment in artifacts.segments):
+        raise RuntimeError("Legacy snapshots have no segment manifest; set hnsw_ef_search / ivf_nprobe in the config.")
+
+    segments = list(artifacts.segments)
+    for family, value in settings.items():
+        for position in families[family]:
+            segment = segments[position]
+            spec = dict(segment.index_spec or describe_index(db.segments[position].index))
+            spec[FAMILY_PARAMS[family]] = value
+            segments[position] = replace(segment, index_spec=spec)
+    return store.publish_segments(segments)
+
+
+def main() -> None:
+    """Tune search parameters of the current snapshot and print the recall/latency table."""
+    args = parse_args()
+    config = Config(args.config)
+    k = args.k or int(getattr(config, 'vector_candidate_k', getattr(config, 'k', 10)))
+
+    store = IndexSnapshotStore.from_config(config)
+    artifacts = store.current_artifacts()
+    if not artifacts.segments:
+        raise RuntimeError("No published index snapshot found. Run indexing first.")
+
+    db = FaissDB(config)
+    db.load_segments(
+        artifacts.segments,
+        rescore_mode=str(getattr(config, 'rescore_mode', 'none') or 'none'),
+        with_vectors=True,
+    )
+    families = segment_families(db)
+    if not families:
+        print("All segments use exact or binary search; there is nothing to tune.")
+        return
+
+    if args.queries:
+        queries, exclude = embed_query_file(config, args.queries), None
+    else:
+        queries, exclude = sample_held_out_queries(db, args.num_queries)
+    exact = exact_neighbors(db, queries, k, exclude)
+    print(f"Tuning snapshot {artifacts.snapshot_id or 'legacy'}: {len(queries)} queries, recall@{k}, "
+          f"target {args.target_recall:.3f}\n")
+
+    settings: Dict[str, int] = {}
+    for family, positions in families.items():
+        param = FAMILY_PARAMS[family]
+        values = _parse_list(args.ef_values if family == "hnsw" else args.nprobe_values)
+        chosen, rows = sweep(db, family, positions, values, queries, exact, k, args.target_recall, exclude)
+        for value, recall, p50, p99 in rows:
+            mark = " <- chosen" if value == chosen else ""
+            print(f"{family:<5} {param}={value:<5} recall@{k}={recall:.3f} p50={p50:7.2f}ms p99={p99:7.2f}ms{mark}")
+        if not any(row[0] == chosen and row[1] >= args.target_recall for row in rows):
+            print(f"{family}: no {param} value reached the target recall; using the largest tried")
+        settings[family] = chosen
+        print()
+
+    if args.write:
+        published = write_manifest(store, artifacts, db, settings, families)
+        print(f"Published snapshot {published.snapshot_id} with {settings}")
+    else:
+        print(f"Chosen settings: {settings} (use --write to record them in the snapshot manifest)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -16,7 +16,7 @@ from rag_system.services.indexing.app.routers import upload
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
-    """Run FastAPI lifespan startup for the indexing service.
+    """Run FastAPI lifespan startup and shutdown for the indexing service.
 
     Args:
         _app: FastAPI application instance.
@@ -26,6 +26,7 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
     """
     await state.start_background_initialization()
     yield
+    state.shutdown_services()
 
 
 app = FastAPI(
@@ -2,14 +2,12 @@
 
 import asyncio
 import os
-import json
 import logging
 import requests
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import HTTPException
 
-from rag_system.indexing.data_vectorize import create_embeddings
 from rag_system.indexing.indexing import Indexing
 from rag_system.services.indexing.app import state
 from rag_system.shared.index_snapshot import IndexSnapshotStore
@@ -34,20 +32,14 @@ async def get_documents():
         HTTPException: If document metadata cannot be loaded.
     """
     try:
-        processed_data_path = _get_snapshot_store().current_artifacts().processed_data_path
-
-        if not os.path.exists(processed_data_path):
-            return {"documents": [], "total_chunks": 0}
-
-        with open(processed_data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _get_snapshot_store().load_chunks()
 
         if not data:
             return {"documents": [], "total_chunks": 0}
 
         # Group chunks by source file
         documents_map = {}
-        for item in data:
+        for item in data.records():
             source = item.get('source', 'unknown')
             if source == 'unknown':
                 source = 'Untitled (legacy data)'
@@ -93,16 +85,13 @@ async def get_document_content(filename: str):
         HTTPException: If the document is missing or cannot be loaded.
     """
     try:
-        processed_data_path = _get_snapshot_store().current_artifacts().processed_data_path
+        data = _get_snapshot_store().load_chunks()
 
-        if not os.path.exists(processed_data_path):
+        if data is None:
             raise HTTPException(status_code=404, detail="No documents found")
 
-        with open(processed_data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
         # Filter chunks for this document
-        chunks = [item for item in data if item.get('source') == filename]
+        chunks = list(data.records(data.rows_with_value('source', filename)))
 
         if not chunks:
             raise HTTPException(status_code=404, detail=f"Document '{filename}' not found")
@@ -142,44 +131,18 @@ async def delete_document(
         raise HTTPException(status_code=503, detail="Database not available")
 
     try:
-        snapshot_store = IndexSnapshotStore.from_config(state.shared_config)
-        processed_data_path = snapshot_store.current_artifacts().processed_data_path
-
-        if not os.path.exists(processed_data_path):
+        if not _get_snapshot_store().current_artifacts().segments:
             raise HTTPException(status_code=404, detail="No documents found")
 
-        with open(processed_data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        # Filter out chunks from this document
-        original_count = len(data)
-        filtered_data = [item for item in data if item.get('source') != filename]
-        deleted_count = original_count - len(filtered_data)
+        loop = asyncio.get_running_loop()
+        deleted_count, remaining_count = await loop.run_in_executor(
+            None, indexing_service.delete_source, filename
+        )
 
         if deleted_count == 0:
             raise HTTPException(status_code=404, detail=f"Document '{filename}' not found")
 
-        # Reindex if there's remaining data
-        if filtered_data:
-            # Use the same helper as the normal indexing path so model-specific
-            # preprocessing, such as E5 passage prefixes, stays consistent.
-            texts = [item['text'] for item in filtered_data]
-            loop = asyncio.get_running_loop()
-            embeddings = await loop.run_in_executor(
-                None,
-                lambda: create_embeddings(
-                    texts,
-                    indexing_service.emb_model,
-                    batch_size=indexing_service.batch_size,
-                    model_name=indexing_service.emb_model_name,
-                    is_query=False,
-                )
-            )
-
-            new_index = data_base.build_index(embeddings)
-            snapshot_store.publish(filtered_data, embeddings, new_index)
-            data_base.index = new_index
-
+        if remaining_count:
             logger.info(f"Deleted '{filename}' ({deleted_count} chunks), reindexed remaining")
 
             # Notify query service
@@ -189,10 +152,6 @@ async def delete_document(
             except Exception as e:
                 logger.warning(f"Failed to notify query service: {str(e)}")
         else:
-            # No data left, clear everything
-            snapshot_store.clear()
-            data_base.index = None
-
             logger.info(f"Deleted last document '{filename}', index cleared")
 
             # Notify query service to reset
@@ -205,7 +164,7 @@ async def delete_document(
         return {
             "message": f"Document '{filename}' deleted successfully",
             "deleted_chunks": deleted_count,
-            "remaining_chunks": len(filtered_data)
+            "remaining_chunks": remaining_count
         }
 
     except HTTPException:
@@ -232,24 +191,18 @@ async def search_documents(query: str = ''):
         return {"results": [], "total_results": 0}
 
     try:
-        processed_data_path = _get_snapshot_store().current_artifacts().processed_data_path
-
-        if not os.path.exists(processed_data_path):
-            return {"results": [], "total_results": 0}
-
-        with open(processed_data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _get_snapshot_store().load_chunks()
 
         if not data:
             return {"results": [], "total_results": 0}
 
-        # Simple text search
+        # Simple text search over the text column; only matches are decoded
         query_lower = query.lower()
         matching_chunks = []
 
-        for item in data:
-            text = item.get('text', '')
+        for row, text in enumerate(data.texts):
             if query_lower in text.lower():
+                item = data.record(row)
                 source = item.get('source', 'unknown')
                 matching_chunks.append({
                     'filename': source,
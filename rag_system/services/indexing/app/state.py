@@ -51,6 +51,15 @@ def initialize_services() -> None:
         raise
 
 
+def shutdown_services() -> None:
+    """Release worker processes held by indexing dependencies."""
+    if data_loader is not None:
+        data_loader.close()
+    if indexing_service is not None:
+        indexing_service.close()
+    logger.info('Indexing service dependencies shut down.')
+
+
 async def _initialize_services_on_startup() -> None:
     """Initialize services from the startup background task."""
     try:
@@ -10,6 +10,8 @@ Responsibilities:
 """
 
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 import uvicorn
@@ -29,10 +31,26 @@ from rag_system.services.query.app.routers import sessions
 
 state.initialize_services()
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Run FastAPI lifespan shutdown for the query service.
+
+    Args:
+        _app: FastAPI application instance.
+
+    Returns:
+        Async iterator used by FastAPI lifespan management.
+    """
+    yield
+    state.shutdown_services()
+
+
 app = FastAPI(
     title="RAG Query Service",
     description="Microservice for RAG queries and semantic search",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -105,7 +123,7 @@ async def reload_index():
 
         state.data_base.load_index(artifacts.index_path)
 
-        state.query_service = Query(state.query_config, state.data_base)
+        state.query_service = Query(state.query_config, state.data_base, state.search_omp_threads(state.query_config))
         state.pipeline = RAGPipeline(
             config=state.query_config,
             query=state.query_service,
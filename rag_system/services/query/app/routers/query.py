@@ -1,5 +1,6 @@
 """Query endpoints for RAG search and question answering."""
 
+import asyncio
 import logging
 from fastapi import APIRouter
 from fastapi import HTTPException
@@ -41,10 +42,33 @@ class QueryResponse(BaseModel):
     highlights: list = []
 
 
+class RetrieveBatchRequest(BaseModel):
+    """Request model for batched retrieval.
+
+    Attributes:
+        questions: Questions to retrieve context for.
+        skip_rerank: If True, return the full candidate sets without reranking.
+    """
+    questions: List[str]
+    skip_rerank: bool = False
+
+
+class RetrieveBatchResponse(BaseModel):
+    """Response model for batched retrieval.
+
+    Attributes:
+        results: Retrieved context chunks for every question, in request order.
+    """
+    results: List[List[str]]
+
+
 @router.post('/ask', response_model=QueryResponse)
 async def query_rag(request: QueryRequest):
     """Handle RAG query request.
 
+    Retrieval and generation run in a worker thread, so concurrent requests
+    do not block the event loop and can search in parallel.
+
     Args:
         request: Query request with question and optional session_id.
 
@@ -64,7 +88,7 @@ async def query_rag(request: QueryRequest):
         # Check if session has temporary data
         if request.session_id and temp_index_manager.has_session(request.session_id):
             session_id = request.session_id
-            temp_data = temp_index_manager.get_temp_index(session_id)
+            temp_data = temp_index_manager.get_session_index(session_id)
             if temp_data is None:
                 raise HTTPException(status_code=404, detail="Temporary session not found")
 
@@ -88,7 +112,7 @@ async def query_rag(request: QueryRequest):
                 session_id=session_id,
             )
 
-            result = combined_pipeline.answer(request.question)
+            result = await asyncio.to_thread(combined_pipeline.answer, request.question)
 
             logger.info(f"Combined query processed for session {session_id}")
             return QueryResponse(answer=result['answer'], texts=result['texts'], highlights=result.get('highlights', []))
@@ -114,9 +138,9 @@ async def query_rag(request: QueryRequest):
                     redis_client=redis_client,
                     cache_namespace=build_chat_cache_namespace(query_config, request.session_id),
                 )
-                result = session_pipeline.answer(request.question)
+                result = await asyncio.to_thread(session_pipeline.answer, request.question)
             else:
-                result = pipeline.answer(request.question)
+                result = await asyncio.to_thread(pipeline.answer, request.question)
 
             logger.info("Query processed successfully")
             return QueryResponse(answer=result['answer'], texts=result['texts'], highlights=result.get('highlights', []))
@@ -124,3 +148,58 @@ async def query_rag(request: QueryRequest):
     except Exception as e:
         logger.error(f"Query failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post('/retrieve-batch', response_model=RetrieveBatchResponse)
+async def retrieve_batch(request: RetrieveBatchRequest):
+    """Retrieve context chunks for several questions without generating answers.
+
+    The questions are embedded, searched and reranked together, which is
+    cheaper than one request per question for evaluation and cache warming.
+
+    Args:
+        request: Questions and the rerank flag.
+
+    Returns:
+        Retrieved chunks for every question.
+
+    Raises:
+        HTTPException: If the query service is unavailable, the batch is too
+            large, or retrieval fails.
+    """
+    query_service = state.query_service
+    if query_service is None:
+        raise HTTPException(status_code=503, detail="Query service not available")
+
+    max_questions = int(getattr(state.query_config, 'retrieve_batch_max_questions', 256))
+    if len(request.questions) > max_questions:
+        raise HTTPException(status_code=413, detail=f"At most {max_questions} questions per batch")
+
+    try:
+        results = await asyncio.to_thread(
+            query_service.query_batch,
+            request.questions,
+            skip_rerank=request.skip_rerank,
+        )
+        logger.info(f"Batch retrieval processed for {len(request.questions)} questions")
+        return RetrieveBatchResponse(results=results)
+    except Exception as e:
+        logger.error(f"Batch retrieval failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get('/batching-stats')
+async def batching_stats():
+    """Return micro-batching metrics of query encoding and reranking.
+
+    Returns:
+        Queue depth and batch size metrics per batched model, or None where
+        batching is disabled.
+
+    Raises:
+        HTTPException: If the query service is unavailable.
+    """
+    query_service = state.query_service
+    if query_service is None:
+        raise HTTPException(status_code=503, detail="Query service not available")
+    return query_service.batching_stats()
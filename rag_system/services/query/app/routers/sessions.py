@@ -15,7 +15,9 @@ from fastapi import HTTPException
 from fastapi import UploadFile
 
 from rag_system.query.combined import process_file_temp
+from rag_system.query.combined import temp_file_key
 from rag_system.services.query.app import state
+from rag_system.shared.model_loader import embedding_model_id
 from rag_system.shared.temp_storage import temp_index_manager
 
 logger = logging.getLogger(__name__)
@@ -47,11 +49,6 @@ async def upload_temp_file(
     Raises:
         HTTPException: If temporary indexing fails.
     """
-    indexing_service = state.temp_indexing_service
-    if indexing_service is None:
-        indexing_service = await asyncio.to_thread(state.get_temp_indexing_service)
-    data_loader = indexing_service.data_loader
-
     try:
         target_session_id = session_id or temp_index_manager.generate_session_id()
 
@@ -64,18 +61,37 @@ async def upload_temp_file(
             with open(temp_path, "wb") as f:
                 await loop.run_in_executor(None, lambda: shutil.copyfileobj(file.file, f))
 
-            temp_data = await loop.run_in_executor(
-                None, process_file_temp, temp_path, data_loader, indexing_service
+            indexing_config = state.indexing_config
+            emb_model_id = embedding_model_id(
+                indexing_config.emb_model_name,
+                str(getattr(indexing_config, 'emb_backend', 'torch') or 'torch'),
+                getattr(indexing_config, 'emb_onnx_file', None) or None,
             )
-            temp_index_manager.add_temp_index(target_session_id, temp_data)
+            key = await loop.run_in_executor(None, temp_file_key, temp_path, emb_model_id)
+            processed = await asyncio.to_thread(temp_index_manager.get_processed_file, key)
+            if processed is not None:
+                logger.info(f"Reusing processed temporary file {key[:12]} for {file.filename}")
+                await asyncio.to_thread(temp_index_manager.add_temp_file, target_session_id, processed)
+                chunks_count = len(processed.chunks)
+            else:
+                indexing_service = state.temp_indexing_service
+                if indexing_service is None:
+                    indexing_service = await asyncio.to_thread(state.get_temp_indexing_service)
+                temp_data = await loop.run_in_executor(
+                    None, process_file_temp, temp_path, indexing_service.data_loader, indexing_service
+                )
+                await asyncio.to_thread(temp_index_manager.add_temp_index, target_session_id, temp_data, key)
+                chunks_count = len(temp_data['chunks'])
 
             logger.info(f"Temporary file indexed. Session ID: {target_session_id}")
             return {
                 "message": "File processed and temporarily indexed",
                 "session_id": target_session_id,
-                "chunks_count": len(temp_data['chunks'])
+                "chunks_count": chunks_count
             }
 
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.warning(f"Temporary indexing rejected: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -84,6 +100,16 @@ async def upload_temp_file(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get('/sessions/usage')
+async def get_sessions_usage() -> Dict[str, Any]:
+    """Get memory usage of temporary sessions.
+
+    Returns:
+        Session, file and chunk counts, used bytes, and the byte budget.
+    """
+    return temp_index_manager.usage()
+
+
 @router.delete('/sessions/{session_id}')
 async def clear_session(session_id: str) -> Dict[str, Any]:
     """Clear temporary session data.
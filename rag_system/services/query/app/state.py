@@ -5,6 +5,7 @@ from typing import Any, Optional
 from fastapi import HTTPException
 
 from rag_system.indexing import Indexing
+from rag_system.query.combined import shutdown_search_executor
 from rag_system.query.llm import LLMResponder
 from rag_system.query.pipeline import RAGPipeline
 from rag_system.query.query import Query
@@ -14,6 +15,7 @@ from rag_system.shared.data_loader import DataLoader
 from rag_system.shared.index_snapshot import IndexSnapshotStore
 from rag_system.shared.logs import setup_logging
 from rag_system.shared.my_config import Config as SharedConfig
+from rag_system.shared.temp_storage import temp_index_manager
 
 _APP_DIR = os.path.dirname(os.path.abspath(__file__))
 _RAG_DIR = os.path.dirname(os.path.dirname(os.path.dirname(_APP_DIR)))
@@ -31,6 +33,28 @@ temp_indexing_service: Optional[Indexing] = None
 temp_indexing_lock = threading.Lock()
 
 
+def search_omp_threads(config: Any) -> int:
+    """Return the FAISS OpenMP thread count this standalone service runs with.
+
+    ``Query`` passes the value to ``faiss.omp_set_num_threads``, which applies
+    to the whole process. With ``faiss_omp_threads: 0`` the service pins
+    OpenMP to one thread: concurrent ``/ask`` requests each search the
+    permanent index with a single query, and request-level parallelism
+    uses the cores better than OpenMP inside each search. The price is that
+    multi-query work in this process also runs single-threaded: the
+    ``search_batch`` calls of ``/retrieve-batch``, the rescore calibration
+    scan and building session indexes. Set an explicit value to trade
+    single-query throughput for faster batch retrieval.
+
+    Args:
+        config: Query configuration object.
+
+    Returns:
+        OpenMP threads to use for each search.
+    """
+    return int(getattr(config, 'faiss_omp_threads', 0)) or 1
+
+
 def initialize_temp_indexing_service() -> Indexing:
     """Initialize temporary indexing dependencies on demand.
 
@@ -83,6 +107,8 @@ def initialize_services() -> None:
     global data_base, query_service, responder, pipeline, redis_client, temp_indexing_service
 
     try:
+        temp_index_manager.configure_from(query_config)
+
         redis_host = os.getenv('REDIS_HOST', 'localhost')
         redis_port = int(os.getenv('REDIS_PORT', 6379))
         redis_client = RedisDB(host=redis_host, port=redis_port)
@@ -96,7 +122,7 @@ def initialize_services() -> None:
 
             artifacts = IndexSnapshotStore.from_config(query_config).current_artifacts()
             if os.path.exists(artifacts.index_path):
-                query_service = Query(query_config, data_base)
+                query_service = Query(query_config, data_base, search_omp_threads(query_config))
                 pipeline = RAGPipeline(
                     config=query_config,
                     query=query_service,
@@ -122,6 +148,15 @@ def initialize_services() -> None:
         raise
 
 
+def shutdown_services() -> None:
+    """Release worker processes and threads held by session query dependencies."""
+    if temp_indexing_service is not None:
+        temp_indexing_service.data_loader.close()
+        temp_indexing_service.close()
+        logger.info('Temp indexing service shut down.')
+    shutdown_search_executor()
+
+
 def get_pipeline() -> RAGPipeline:
     """Return the initialized RAG pipeline.
 
@@ -0,0 +1,422 @@
+import io
+import json
+import mmap as mmap_module
+import os
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+CHUNK_STORE_VERSION = 1
+META_FILENAME = "columns.json"
+TEXTS_FILENAME = "texts.bin"
+OFFSETS_FILENAME = "text_offsets.npy"
+HASHES_FILENAME = "hashes.npy"
+TIMESTAMPS_FILENAME = "timestamps.npy"
+
+# Marks a missing value in integer-encoded columns.
+MISSING_ID = -1
+MISSING_TIMESTAMP = np.iinfo(np.int64).min
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _timestamp_to_micros(value: Any) -> Optional[int]:
+    """Encode a naive ISO timestamp as microseconds if it round-trips exactly."""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None or parsed.isoformat() != value:
+        return None
+    delta = parsed - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _micros_to_timestamp(micros: int) -> str:
+    """Decode microseconds since the epoch into a naive ISO timestamp."""
+    days, rest = divmod(int(micros), 86_400_000_000)
+    seconds, microseconds = divmod(rest, 1_000_000)
+    return datetime.fromordinal(_EPOCH.toordinal() + days).replace(
+        hour=seconds // 3600, minute=seconds // 60 % 60, second=seconds % 60, microsecond=microseconds
+    ).isoformat()
+
+
+class ChunkEncoder:
+    """Encode chunk records into columns batch by batch.
+
+    Column layout:
+
+    * ``text``: UTF-8 bytes concatenated into one blob plus ``count + 1`` offsets.
+    * ``hash``: fixed-width byte strings.
+    * ``timestamp``: int64 microseconds for naive ISO timestamps; other
+      values are kept as exceptions in the metadata.
+    * any other field (such as ``source``): dictionary-encoded, one int32 id
+      per row into a list of distinct JSON values.
+
+    Missing fields stay missing when records are decoded.
+    """
+
+    def __init__(self, text_file: BinaryIO) -> None:
+        """Initialize the encoder.
+
+        Args:
+            text_file: Binary stream that receives the text blob.
+        """
+        self.text_file = text_file
+        self.count = 0
+        self.field_order: List[str] = []
+        self.offsets = array('q', [0])
+        self.hashes: List[bytes] = []
+        self.timestamps = array('q')
+        self.timestamp_exceptions: Dict[str, Any] = {}
+        self.dict_ids: Dict[str, array] = {}
+        self.dict_values: Dict[str, Dict[str, int]] = {}
+
+    def add(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Append records to the columns.
+
+        Args:
+            records: Chunk records with at least a ``text`` field.
+
+        Raises:
+            KeyError: If a record has no ``text`` field.
+        """
+        for record in records:
+            for name in record:
+                if name not in self.field_order:
+                    self.field_order.append(name)
+                    if name not in ('text', 'hash', 'timestamp'):
+                        self.dict_ids[name] = array('i', [MISSING_ID]) * self.count
+                        self.dict_values[name] = {}
+
+            text_bytes = str(record['text']).encode('utf-8')
+            self.text_file.write(text_bytes)
+            self.offsets.append(self.offsets[-1] + len(text_bytes))
+
+            value = record.get('hash')
+            self.hashes.append(b'' if value is None else str(value).encode('ascii'))
+
+            value = record.get('timestamp', None)
+            micros = _timestamp_to_micros(value)
+            if micros is None:
+                self.timestamps.append(MISSING_TIMESTAMP)
+                if 'timestamp' in record:
+                    self.timestamp_exceptions[str(self.count)] = value
+            else:
+                self.timestamps.append(micros)
+
+            for name, ids in self.dict_ids.items():
+                if name not in record:
+                    ids.append(MISSING_ID)
+                    continue
+                key = json.dumps(record[name], ensure_ascii=False, sort_keys=True)
+                values = self.dict_values[name]
+                if key not in values:
+                    values[key] = len(values)
+                ids.append(values[key])
+
+            self.count += 1
+
+    def finish(self) -> Dict[str, Any]:
+        """Return the encoded columns.
+
+        Returns:
+            Metadata dict plus numpy arrays for offsets, hashes, timestamps and dictionary ids.
+        """
+        width = max((len(value) for value in self.hashes), default=0) or 1
+        return {
+            "meta": {
+                "version": CHUNK_STORE_VERSION,
+                "count": self.count,
+                "fields": self.field_order,
+                "hash_width": width,
+                "timestamp_exceptions": self.timestamp_exceptions,
+                "dictionaries": {
+                    name: [json.loads(key) for key in values]
+                    for name, values in self.dict_values.items()
+                },
+            },
+            "offsets": np.frombuffer(self.offsets, dtype=np.int64),
+            "hashes": np.array(self.hashes, dtype=f"S{width}"),
+            "timestamps": np.frombuffer(self.timestamps, dtype=np.int64),
+            "ids": {name: np.frombuffer(ids, dtype=np.int32) for name, ids in self.dict_ids.items()},
+        }
+
+
+class ChunkStoreWriter:
+    """Write a columnar chunk store to a directory in batches."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Create the store directory and open the text blob for writing.
+
+        Args:
+            path: Directory to create.
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._text_file = open(self.path / TEXTS_FILENAME, "wb")
+        self.encoder = ChunkEncoder(self._text_file)
+
+    @property
+    def count(self) -> int:
+        """Number of records written so far."""
+        return self.encoder.count
+
+    def write(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Append records.
+
+        Args:
+            records: Chunk records with at least a ``text`` field.
+        """
+        self.encoder.add(records)
+
+    def close(self) -> None:
+        """Write the remaining columns and metadata."""
+        if self._text_file.closed:
+            return
+        self._text_file.close()
+        columns = self.encoder.finish()
+        np.save(self.path / OFFSETS_FILENAME, columns["offsets"])
+        np.save(self.path / HASHES_FILENAME, columns["hashes"])
+        np.save(self.path / TIMESTAMPS_FILENAME, columns["timestamps"])
+        for name, ids in columns["ids"].items():
+            np.save(self.path / _ids_filename(name), ids)
+        with open(self.path / META_FILENAME, "w", encoding="utf-8") as f:
+            json.dump(columns["meta"], f, ensure_ascii=False)
+
+    def abort(self) -> None:
+        """Close open files without finishing the store."""
+        if not self._text_file.closed:
+            self._text_file.close()
+
+
+def _ids_filename(field: str) -> str:
+    """Return the file name of a dictionary-encoded column."""
+    return f"{field}_ids.npy"
+
+
+class TextColumn(Sequence[str]):
+    """Read-only sequence view over the text column of a chunk store."""
+
+    def __init__(self, blob: Any, offsets: np.ndarray) -> None:
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the text blob in bytes."""
+        return len(self._blob)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("text index out of range")
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return bytes(self._blob[start:end]).decode('utf-8')
+
+
+class ChunkStore:
+    """Columnar chunk records of one snapshot.
+
+    Individual columns can be read without decoding the others: the hash
+    column is a fixed-width array, sources are small integer ids into a
+    dictionary, and any text can be sliced out of the blob by its offsets.
+    """
+
+    def __init__(self, columns: Dict[str, Any], text_blob: Any) -> None:
+        """Initialize the store from encoded columns.
+
+        Args:
+            columns: Output of ``ChunkEncoder.finish`` or the loaded equivalent.
+            text_blob: Bytes-like object holding all texts.
+        """
+        meta = columns["meta"]
+        self.fields: List[str] = list(meta["fields"])
+        self.dictionaries: Dict[str, List[Any]] = meta["dictionaries"]
+        self.timestamp_exceptions: Dict[str, Any] = meta.get("timestamp_exceptions", {})
+        self.offsets: np.ndarray = columns["offsets"]
+        self.hashes: np.ndarray = columns["hashes"]
+        self.timestamps: np.ndarray = columns["timestamps"]
+        self.ids: Dict[str, np.ndarray] = columns["ids"]
+        self.texts = TextColumn(text_blob, self.offsets)
+
+    @classmethod
+    def open(cls, path: Union[str, Path], mmap: bool = False) -> "ChunkStore":
+        """Open a chunk store directory.
+
+        Args:
+            path: Directory written by ``ChunkStoreWriter``.
+            mmap: If True, memory-map the columns read-only instead of reading
+                them into RAM, so processes opening the same snapshot share
+                the page cache and texts are paged in only when accessed.
+
+        Returns:
+            The loaded chunk store.
+
+        Raises:
+            FileNotFoundError: If a column file is missing.
+            ValueError: If the store version is unsupported.
+        """
+        path = Path(path)
+        with open(path / META_FILENAME, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != CHUNK_STORE_VERSION:
+            raise ValueError(f"Unsupported chunk store version: {meta.get('version')}")
+
+        mmap_mode = 'r' if mmap else None
+        with open(path / TEXTS_FILENAME, "rb") as f:
+            if not mmap:
+                text_blob: Any = f.read()
+            elif os.fstat(f.fileno()).st_size == 0:
+                # Empty files cannot be mapped.
+                text_blob = b''
+            else:
+                text_blob = mmap_module.mmap(f.fileno(), 0, access=mmap_module.ACCESS_READ)
+        columns = {
+            "meta": meta,
+            "offsets": np.load(path / OFFSETS_FILENAME, mmap_mode=mmap_mode),
+            "hashes": np.load(path / HASHES_FILENAME, mmap_mode=mmap_mode),
+            "timestamps": np.load(path / TIMESTAMPS_FILENAME, mmap_mode=mmap_mode),
+            "ids": {
+                name: np.load(path / _ids_filename(name), mmap_mode=mmap_mode)
+                for name in meta["dictionaries"]
+            },
+        }
+        return cls(columns, text_blob)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "ChunkStore":
+        """Build an in-memory chunk store from records, e.g. a legacy JSON snapshot.
+
+        Args:
+            records: Chunk records with at least a ``text`` field.
+
+        Returns:
+            An in-memory chunk store.
+        """
+        buffer = io.BytesIO()
+        encoder = ChunkEncoder(buffer)
+        encoder.add(records)
+        return cls(encoder.finish(), buffer.getvalue())
+
+    @staticmethod
+    def open_hashes(path: Union[str, Path]) -> List[str]:
+        """Read only the hash column of a chunk store directory.
+
+        Args:
+            path: Directory written by ``ChunkStoreWriter``.
+
+        Returns:
+            Hash strings in row order.
+        """
+        return [value.decode('ascii') for value in np.load(Path(path) / HASHES_FILENAME).tolist()]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of all columns and the text blob in bytes."""
+        columns = [self.offsets, self.hashes, self.timestamps, *self.ids.values()]
+        return self.texts.nbytes + sum(column.nbytes for column in columns)
+
+    def hash_list(self) -> List[str]:
+        """Return all chunk hashes in row order.
+
+        Returns:
+            Hash strings. Rows without a hash give an empty string.
+        """
+        return [value.decode('ascii') for value in self.hashes.tolist()]
+
+    def value_ids(self, field: str) -> Optional[np.ndarray]:
+        """Return the dictionary ids of a field, or None if the field is not dictionary-encoded."""
+        return self.ids.get(field)
+
+    def rows_with_value(self, field: str, value: Any) -> np.ndarray:
+        """Return the row numbers whose dictionary-encoded field equals a value.
+
+        Args:
+            field: Field name, e.g. ``source``.
+            value: Value to match.
+
+        Returns:
+            Sorted row numbers.
+        """
+        ids = self.ids.get(field)
+        values = self.dictionaries.get(field, [])
+        if ids is None or value not in values:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(ids == values.index(value))
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Decode one record.
+
+        Args:
+            row: Row number.
+
+        Returns:
+            The record with its original fields.
+        """
+        record: Dict[str, Any] = {}
+        for name in self.fields:
+            if name == 'text':
+                record[name] = self.texts[row]
+            elif name == 'hash':
+                record[name] = self.hashes[row].decode('ascii')
+            elif name == 'timestamp':
+                micros = int(self.timestamps[row])
+                if micros != MISSING_TIMESTAMP:
+                    record[name] = _micros_to_timestamp(micros)
+                elif str(row) in self.timestamp_exceptions:
+                    record[name] = self.timestamp_exceptions[str(row)]
+            else:
+                value_id = int(self.ids[name][row])
+                if value_id != MISSING_ID:
+                    record[name] = self.dictionaries[name][value_id]
+        return record
+
+    def records(self, rows: Optional[Iterable[int]] = None) -> Iterator[Dict[str, Any]]:
+        """Decode records in row order.
+
+        Args:
+            rows: Optional row numbers to decode instead of all rows.
+
+        Returns:
+            An iterator over records.
+        """
+        for row in range(len(self)) if rows is None else rows:
+            yield self.record(int(row))
+
+    def iter_batches(self, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Decode records in fixed-size lists.
+
+        Args:
+            batch_size: Maximum number of records per batch.
+
+        Returns:
+            An iterator over record batches.
+        """
+        for start in range(0, len(self), batch_size):
+            yield list(self.records(range(start, min(start + batch_size, len(self)))))
+
+
+def is_chunk_store(path: Union[str, Path]) -> bool:
+    """Return whether a path is a chunk store directory.
+
+    Args:
+        path: Path to check.
+
+    Returns:
+        True if the path contains chunk store metadata.
+    """
+    return os.path.isfile(os.path.join(str(path), META_FILENAME))
@@ -1,23 +1,132 @@
+import math
 import os
-from typing import Any, Optional, Tuple
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import faiss
 import numpy as np
 
+from rag_system.shared.embedding_storage import open_embeddings
 from rag_system.shared.logs import setup_logging
 
+INDEX_TYPES = ("auto", "flat", "hnsw", "hnsw_sq8", "ivf_pq")
+RESCORE_MODES = ("none", "index", "binary")
+# Training vectors per IVF centroid or PQ codeword below which FAISS warns about k-means quality.
+MIN_POINTS_PER_CENTROID = 39
+
+
+def describe_index(index: Any) -> Dict[str, Any]:
+    """Describe the family and structural parameters of a FAISS index.
+
+    Args:
+        index: FAISS index.
+
+    Returns:
+        Dictionary with a ``type`` key (one of ``INDEX_TYPES`` except ``auto``,
+        or the FAISS class name for other indexes) and the parameters needed
+        to search it, suitable for a snapshot manifest.
+    """
+    if isinstance(index, faiss.IndexBinary):
+        return {"type": "binary"}
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexFlat):
+        return {"type": "flat"}
+    if isinstance(index, faiss.IndexHNSWFlat):
+        return {"type": "hnsw", "m": int(index.hnsw.nb_neighbors(1))}
+    if isinstance(index, faiss.IndexHNSWSQ):
+        return {"type": "hnsw_sq8", "m": int(index.hnsw.nb_neighbors(1))}
+    if isinstance(index, faiss.IndexIVFPQ):
+        return {
+            "type": "ivf_pq",
+            "nlist": int(index.nlist),
+            "m": int(index.pq.M),
+            "nbits": int(index.pq.nbits),
+            "nprobe": int(index.nprobe),
+        }
+    return {"type": type(index).__name__}
+
+
+def binary_codes(embeddings: np.ndarray) -> np.ndarray:
+    """Pack the signs of embedding components into binary codes for Hamming search."""
+    return np.packbits(np.asarray(embeddings) > 0, axis=1)
+
+
+@dataclass
+class LoadedSegment:
+    """A snapshot segment loaded for search.
+
+    Attributes:
+        index: FAISS index searched in the first stage.
+        selector: Selector rejecting tombstoned rows together with the inner
+            selector it references, or None if nothing is deleted.
+        deleted: Tombstoned row numbers.
+        vectors: Memory-mapped embeddings used for exact rescoring and exact
+            search, or None if they were not loaded.
+        ef_search: HNSW ``efSearch`` recorded in the manifest, or None to use
+            the configured ``hnsw_ef_search``.
+        nprobe: IVF ``nprobe`` recorded in the manifest, or None to use the
+            value stored in the index.
+    """
+
+    index: Any
+    selector: Optional[Tuple[Any, Any]] = None
+    deleted: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    vectors: Optional[Any] = None
+    ef_search: Optional[int] = None
+    nprobe: Optional[int] = None
+
 
 class FaissDB:
-    """Manage FAISS index creation, persistence, loading, and search."""
+    """Manage FAISS index creation, persistence, loading, and search.
+
+    The index family is chosen by ``index_type``: exact ``flat`` search,
+    ``hnsw``, ``hnsw_sq8`` with 8-bit scalar-quantized vectors, or ``ivf_pq``
+    with product-quantized codes. ``auto`` picks flat search for small
+    corpora and otherwise the most accurate family that fits
+    ``index_memory_budget_mb``. Trained families learn their codebooks from
+    a random sample of the indexed vectors.
+
+    Segments can be searched in two stages (``rescore_mode``): a compressed
+    first pass over-fetches ``rescore_factor`` times the requested candidates,
+    either from the segment's own quantized index (``index``) or from sign
+    bits compared by Hamming distance (``binary``), and the candidates are
+    rescored exactly against the snapshot embeddings, memory-mapped from
+    ``embeddings.npy``. In ``binary`` mode the float index is not loaded.
+
+    Searches never modify a loaded index: ``efSearch``, ``nprobe`` and the
+    tombstone selector are passed per call as FAISS ``SearchParameters``, so
+    one instance can serve concurrent requests from several threads, each
+    with its own search parameters. ``configure_search_concurrency`` bounds
+    the number of concurrent searches and the OpenMP threads of each one.
+    """
 
     def __init__(self, config: Any, k: int = 5) -> None:
         self.index_path: str = config.index_path
         self.logs_dir: str = config.logs_dir
         self.index: Optional[Any] = None
+        # Searchable snapshot segments, filled by load_segments.
+        self.segments: List[LoadedSegment] = []
         self.k: int = k
         self.hnsw_m: int = int(getattr(config, 'hnsw_m', 32))
         self.hnsw_ef_construction: int = int(getattr(config, 'hnsw_ef_construction', 200))
         self.hnsw_ef_search: int = int(getattr(config, 'hnsw_ef_search', 64))
+        self.mmap_index: bool = bool(getattr(config, 'mmap_snapshot', False))
+        self.index_type: str = str(getattr(config, 'index_type', 'hnsw')).strip().lower()
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"Unsupported index_type '{self.index_type}', expected one of {INDEX_TYPES}")
+        self.flat_max_items: int = int(getattr(config, 'flat_max_items', 10000))
+        self.index_memory_budget_mb: float = float(getattr(config, 'index_memory_budget_mb', 0) or 0)
+        self.ivf_nlist: int = int(getattr(config, 'ivf_nlist', 0) or 0)
+        self.ivf_nprobe: int = int(getattr(config, 'ivf_nprobe', 16))
+        self.pq_m: int = int(getattr(config, 'pq_m', 0) or 0)
+        self.pq_nbits: int = int(getattr(config, 'pq_nbits', 8))
+        self.index_train_sample: int = int(getattr(config, 'index_train_sample', 65536))
+        self.rescore_mode: str = self._check_rescore_mode(getattr(config, 'rescore_mode', 'none'))
+        self.rescore_factor: int = max(1, int(getattr(config, 'rescore_factor', 4)))
+        # Limits concurrent searches, set by configure_search_concurrency.
+        self._search_slots: Optional[threading.BoundedSemaphore] = None
         self.logger = setup_logging(self.logs_dir, 'FaissDB')
 
     def create_index(self, embeddings: np.ndarray, replace: bool = False) -> None:
@@ -36,10 +145,7 @@ class FaissDB:
                     self.logger.info("Replacing existing FAISS index.")
 
                 self.index = self.build_index(embeddings, add_embeddings=False)
-                self.logger.info(
-                    f"Created FAISS HNSW index: dim={embeddings.shape[1]}, M={self.hnsw_m}, "
-                    f"efConstruction={self.hnsw_ef_construction}."
-                )
+                self.logger.info(f"Created FAISS index {describe_index(self.index)}: dim={embeddings.shape[1]}.")
 
             assert self.index is not None
             self.index.add(np.array(embeddings, dtype=np.float32))
@@ -51,7 +157,10 @@ class FaissDB:
             raise
 
     def build_index(self, embeddings: np.ndarray, add_embeddings: bool = True) -> Any:
-        """Build a FAISS HNSW index in memory.
+        """Build a FAISS index in memory.
+
+        The index family is chosen for the number of embeddings given, and
+        trained on a sample of them when the family needs training.
 
         Args:
             embeddings: Embedding matrix used to infer index dimensionality.
@@ -60,13 +169,186 @@ class FaissDB:
         Returns:
             A FAISS index instance.
         """
-        dim = embeddings.shape[1]
-        index = faiss.IndexHNSWFlat(dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
-        index.hnsw.efConstruction = self.hnsw_ef_construction
+        embeddings = np.array(embeddings, dtype=np.float32)
+        index = self.new_index(embeddings.shape[0], embeddings.shape[1])
+        self.train_index(index, embeddings)
         if add_embeddings:
-            index.add(np.array(embeddings, dtype=np.float32))
+            index.add(embeddings)
+        return index
+
+    def build_index_from_rows(self, vectors: Any, batch_size: int) -> Any:
+        """Build a FAISS index from a row-addressable matrix batch by batch.
+
+        Works with memory-mapped arrays, so only the training sample and one
+        batch are held in RAM besides the index itself.
+
+        Args:
+            vectors: Matrix of L2-normalized embeddings supporting ``shape`` and row slicing.
+            batch_size: Number of rows added per batch.
+
+        Returns:
+            A FAISS index containing every row.
+        """
+        count, dim = vectors.shape
+        index = self.new_index(count, dim)
+        self.train_index(index, vectors)
+        for start in range(0, count, batch_size):
+            index.add(np.ascontiguousarray(vectors[start:start + batch_size], dtype=np.float32))
         return index
 
+    def choose_index_spec(self, count: int, dim: int) -> Dict[str, Any]:
+        """Choose the index family and parameters for a corpus.
+
+        With ``index_type: auto`` corpora of at most ``flat_max_items`` vectors
+        use exact flat search. Larger ones use HNSW, falling back to HNSW with
+        SQ8 codes and then IVF-PQ when the estimated index size exceeds
+        ``index_memory_budget_mb`` (0 means no limit). IVF-PQ falls back to
+        flat search when there are too few vectors to train its codebooks.
+
+        Args:
+            count: Number of vectors the index will hold.
+            dim: Embedding dimensionality.
+
+        Returns:
+            Dictionary in the format of ``describe_index``.
+        """
+        index_type = self.index_type
+        if index_type == "auto":
+            index_type = self._auto_index_type(count, dim)
+
+        if index_type == "flat":
+            return {"type": "flat"}
+        if index_type in ("hnsw", "hnsw_sq8"):
+            return {"type": index_type, "m": self.hnsw_m}
+
+        train_count = min(count, self.index_train_sample)
+        nbits = self.pq_nbits
+        if train_count < MIN_POINTS_PER_CENTROID * (1 << nbits):
+            self.logger.warning(
+                f"{count} vectors are too few to train IVF-PQ codebooks with {nbits} bits; using flat search"
+            )
+            return {"type": "flat"}
+        nlist = self.ivf_nlist or int(4 * math.sqrt(count))
+        nlist = max(1, min(nlist, train_count // MIN_POINTS_PER_CENTROID))
+        return {
+            "type": "ivf_pq",
+            "nlist": nlist,
+            "m": self.pq_m or self._default_pq_m(dim),
+            "nbits": nbits,
+            "nprobe": min(self.ivf_nprobe, nlist),
+        }
+
+    def new_index(self, count: int, dim: int) -> Any:
+        """Create an empty, possibly untrained, index for a corpus.
+
+        Args:
+            count: Number of vectors the index will hold.
+            dim: Embedding dimensionality.
+
+        Returns:
+            A FAISS index using inner-product similarity.
+        """
+        spec = self.choose_index_spec(count, dim)
+        if spec["type"] == "flat":
+            return faiss.IndexFlatIP(dim)
+        if spec["type"] == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, spec["m"], faiss.METRIC_INNER_PRODUCT)
+        elif spec["type"] == "hnsw_sq8":
+            index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, spec["m"], faiss.METRIC_INNER_PRODUCT)
+        else:
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFPQ(quantizer, dim, spec["nlist"], spec["m"], spec["nbits"], faiss.METRIC_INNER_PRODUCT)
+            index.nprobe = spec["nprobe"]
+            return index
+        index.hnsw.efConstruction = self.hnsw_ef_construction
+        return index
+
+    def train_index(self, index: Any, vectors: Any) -> None:
+        """Train an index on a random sample of vectors if it needs training.
+
+        Args:
+            index: FAISS index to train.
+            vectors: Matrix of embeddings supporting ``shape`` and row indexing.
+        """
+        if index.is_trained:
+            return
+        count = vectors.shape[0]
+        sample_size = min(count, self.index_train_sample)
+        rows = np.sort(np.random.default_rng(0).choice(count, size=sample_size, replace=False))
+        index.train(np.ascontiguousarray(vectors[rows], dtype=np.float32))
+        self.logger.info(f"Trained {describe_index(index)['type']} index on {sample_size} of {count} vectors")
+
+    def index_fits(self, index: Any, count: int) -> bool:
+        """Return whether an existing index has the family chosen for ``count`` vectors.
+
+        Callers that append to a published index use this to rebuild once the
+        corpus outgrows the family, for example flat search past ``flat_max_items``.
+        """
+        return describe_index(index)["type"] == self.choose_index_spec(count, index.d)["type"]
+
+    def _auto_index_type(self, count: int, dim: int) -> str:
+        """Pick an index family from the corpus size and memory budget."""
+        if count <= self.flat_max_items:
+            return "flat"
+        budget = self.index_memory_budget_mb * 1024 * 1024
+        if not budget:
+            return "hnsw"
+        # Level-0 HNSW links (2 * M int32 per vector) dominate the graph size.
+        graph_bytes = 2 * self.hnsw_m * 4
+        for index_type, bytes_per_vector in (("hnsw", 4 * dim + graph_bytes), ("hnsw_sq8", dim + graph_bytes)):
+            if count * bytes_per_vector <= budget:
+                return index_type
+        return "ivf_pq"
+
+    @staticmethod
+    def _default_pq_m(dim: int) -> int:
+        """Return the number of PQ sub-quantizers: about one per 8 dimensions, dividing ``dim``."""
+        target = max(1, dim // 8)
+        return next(m for m in range(target, 0, -1) if dim % m == 0)
+
+    def append_to_index(self, index: Any, embeddings: np.ndarray) -> Any:
+        """Add new embeddings to an existing FAISS index in place.
+
+        Every supported family supports incremental insertion, so appending
+        costs time proportional to the number of new vectors rather than the
+        index size. Trained families keep their existing codebooks.
+
+        Args:
+            index: FAISS index to extend.
+            embeddings: L2-normalized embeddings to add.
+
+        Returns:
+            The same FAISS index instance with the new vectors appended.
+
+        Raises:
+            ValueError: If the embeddings dimensionality does not match the index.
+        """
+        embeddings = np.array(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[1] != index.d:
+            raise ValueError(f"Cannot append embeddings of shape {embeddings.shape} to index with dim={index.d}")
+        if embeddings.shape[0]:
+            index.add(embeddings)
+        return index
+
+    def read_index(self, index_path: str, mmap: Optional[bool] = None) -> Optional[Any]:
+        """Read a FAISS index from file without replacing the in-memory index.
+
+        Args:
+            index_path: Path to the index file.
+            mmap: Override for the configured ``mmap_index`` mode.
+
+        Returns:
+            The loaded FAISS index, or None if the file is missing or unreadable.
+        """
+        if not os.path.exists(index_path):
+            self.logger.info(f"Index file not found at {index_path}")
+            return None
+        try:
+            return self._read_index_file(index_path, mmap)
+        except Exception as e:
+            self.logger.error(f"Failed to read FAISS index from {index_path}: {str(e)}")
+            return None
+
     def load_index(self, index_path: Optional[str] = None) -> None:
         """Load the FAISS index from file.
 
@@ -75,23 +357,451 @@ class FaissDB:
         """
         if index_path is None:
             index_path = self.index_path
+        self.segments = []
         if not os.path.exists(index_path):
             self.logger.info(f"Index file not found at {index_path}")
             self.index = None
             return
         try:
-            self.index = faiss.read_index(index_path)
-            self.logger.info(f'Index loaded from {index_path}')
+            self.index = self._read_index_file(index_path)
+            self.logger.info(f"Index loaded from {index_path}{' (memory-mapped)' if self.mmap_index else ''}")
         except Exception as e:
             self.logger.error(f"Failed to load FAISS index from {index_path}: {str(e)}")
             self.index = None
 
-    def search(self, request_embedding: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    def load_segments(
+        self,
+        segments: Sequence[Any],
+        mmap: Optional[bool] = None,
+        rescore_mode: Optional[str] = None,
+        rescore_factor: Optional[int] = None,
+        with_vectors: bool = False,
+    ) -> None:
+        """Load the FAISS index of every snapshot segment for ``search_segments``.
+
+        Tombstoned rows are excluded at search time with an ID selector, so
+        segment indexes are never modified. Search parameters recorded in a
+        segment's ``index_spec`` (HNSW ``ef_search``, IVF ``nprobe``) are used
+        for its index. With a single segment ``index`` is set to its index as well.
+
+        Args:
+            segments: Snapshot segments with ``index_path``, ``embeddings_path``,
+                ``deleted`` rows and an optional ``index_spec`` from the snapshot manifest.
+            mmap: Override for the configured ``mmap_index`` mode.
+            rescore_mode: Override for the configured ``rescore_mode``.
+            rescore_factor: Override for the configured ``rescore_factor``.
+            with_vectors: If True, map segment embeddings even without rescoring,
+                for ``exact_search_segments``.
+
+        Raises:
+            FileNotFoundError: If a segment index, or the embeddings needed for
+                rescoring, is missing or cannot be read.
+            ValueError: If the rescore mode is not supported.
+        """
+        if rescore_mode is not None:
+            self.rescore_mode = self._check_rescore_mode(rescore_mode)
+        if rescore_factor is not None:
+            self.rescore_factor = max(1, int(rescore_factor))
+
+        loaded = []
+        for segment in segments:
+            vectors = None
+            ef_search, nprobe = None, None
+            if self.rescore_mode != "none" or with_vectors:
+                if not os.path.exists(segment.embeddings_path):
+                    raise FileNotFoundError(f"Embeddings for rescoring not found at {segment.embeddings_path}")
+                vectors = open_embeddings(segment.embeddings_path, mmap=True)
+
+            if self.rescore_mode == "binary":
+                index = self.build_binary_index(vectors)
+            else:
+                index = self.read_index(segment.index_path, mmap=mmap)
+                if index is None:
+                    raise FileNotFoundError(f"Index file not found or failed to load at {segment.index_path}")
+                ef_search, nprobe = self._index_spec_params(
+                    index, getattr(segment, 'index_spec', None), segment.index_path
+                )
+
+            loaded.append(LoadedSegment(
+                index=index,
+                selector=self._exclusion_selector(segment.deleted),
+                deleted=np.asarray(segment.deleted, dtype=np.int64),
+                vectors=vectors,
+                ef_search=ef_search,
+                nprobe=nprobe,
+            ))
+        self.segments = loaded
+        self.index = loaded[0].index if len(loaded) == 1 else None
+        types = sorted({describe_index(segment.index)['type'] for segment in loaded})
+        rescoring = f", rescoring x{self.rescore_factor} ({self.rescore_mode})" if self.rescore_mode != "none" else ""
+        self.logger.info(f"Loaded {len(loaded)} index segment(s): {', '.join(types)}{rescoring}")
+
+    def build_binary_index(self, vectors: Any, batch_size: int = 65536) -> Any:
+        """Build a Hamming-distance index over the sign bits of embeddings.
+
+        The codes take one bit per dimension, 32 times less than float32
+        vectors, and serve as a first pass whose candidates are rescored.
+
+        Args:
+            vectors: Matrix of embeddings supporting ``shape`` and row slicing.
+            batch_size: Number of rows encoded per batch.
+
+        Returns:
+            A FAISS binary flat index with one code per row.
+        """
+        count, dim = vectors.shape
+        index = faiss.IndexBinaryFlat(((dim + 7) // 8) * 8)
+        for start in range(0, count, batch_size):
+            index.add(binary_codes(vectors[start:start + batch_size]))
+        return index
+
+    def configure_search_concurrency(self, max_concurrency: int = 0, omp_threads: int = 0) -> None:
+        """Coordinate concurrent searches with FAISS OpenMP threads.
+
+        Every search holds one of ``max_concurrency`` slots, so threads beyond
+        that wait instead of oversubscribing the CPUs. Request-level
+        parallelism scales better than OpenMP for single-query searches, so
+        services usually run one OpenMP thread per search and one slot per CPU.
+        The OpenMP setting is process-wide and also affects index building.
+
+        Args:
+            max_concurrency: Maximum number of concurrent searches; 0 uses the
+                CPU count divided by ``omp_threads``, negative disables the limit.
+            omp_threads: FAISS OpenMP threads; 0 leaves the process-wide OpenMP
+                setting untouched.
+        """
+        if omp_threads > 0:
+            faiss.omp_set_num_threads(omp_threads)
+        threads = max(1, faiss.omp_get_max_threads())
+        if max_concurrency == 0:
+            max_concurrency = max(1, (os.cpu_count() or 1) // threads)
+        self._search_slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        limit = max_concurrency if max_concurrency > 0 else "unlimited"
+        self.logger.info(f"Search concurrency: {limit} concurrent search(es), {threads} OpenMP thread(s) each")
+
+    @contextmanager
+    def _search_slot(self) -> Iterator[None]:
+        """Hold a concurrent search slot if concurrency is limited."""
+        if self._search_slots is None:
+            yield
+            return
+        with self._search_slots:
+            yield
+
+    def search_segments(
+        self,
+        request_embedding: np.ndarray,
+        k: int,
+        ef_search: Optional[int] = None,
+        nprobe: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Search every loaded segment and merge the results into one top-k list.
+
+        Falls back to ``index`` when no segments are loaded. Per-call
+        ``ef_search`` and ``nprobe`` take precedence over the values recorded
+        for each segment and leave the loaded indexes unchanged.
+
+        Args:
+            request_embedding: L2-normalized query embedding vector.
+            k: Number of nearest neighbors to return.
+            ef_search: HNSW ``efSearch`` for this call only.
+            nprobe: IVF ``nprobe`` for this call only.
+
+        Returns:
+            Tuple of (segment positions, row ids inside each segment, scores),
+            ordered by descending cosine similarity.
+        """
+        return self.search_batch(request_embedding[:1], k, ef_search=ef_search, nprobe=nprobe)[0]
+
+    def search_batch(
+        self,
+        request_embeddings: np.ndarray,
+        k: int,
+        ef_search: Optional[int] = None,
+        nprobe: Optional[int] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Search many queries with one FAISS call per segment.
+
+        FAISS parallelizes a multi-query search internally, and rescoring
+        decodes every candidate row once even if several queries share it.
+
+        Args:
+            request_embeddings: L2-normalized query embedding matrix.
+            k: Number of nearest neighbors to return per query.
+            ef_search: HNSW ``efSearch`` for this call only.
+            nprobe: IVF ``nprobe`` for this call only.
+
+        Returns:
+            One tuple of (segment positions, row ids inside each segment,
+            scores) per query, ordered by descending cosine similarity.
+        """
+        request_embeddings = np.ascontiguousarray(request_embeddings, dtype=np.float32)
+        count = len(request_embeddings)
+        if not count:
+            return []
+        segments = self.segments or ([LoadedSegment(self.index)] if self.index is not None else [])
+        positions: List[List[np.ndarray]] = [[] for _ in range(count)]
+        ids: List[List[np.ndarray]] = [[] for _ in range(count)]
+        scores: List[List[np.ndarray]] = [[] for _ in range(count)]
+        searched = False
+        for position, segment in enumerate(segments):
+            index = segment.index
+            if index.ntotal == 0:
+                continue
+            searched = True
+            rescore = self.rescore_mode != "none" and segment.vectors is not None
+            fetch_k = k * self.rescore_factor if rescore else k
+            query = binary_codes(request_embeddings) if isinstance(index, faiss.IndexBinary) else request_embeddings
+            with self._search_slot():
+                segment_scores, segment_ids = self._search_index(
+                    index,
+                    segment.selector,
+                    query,
+                    min(fetch_k, index.ntotal),
+                    ef_search or segment.ef_search,
+                    nprobe or segment.nprobe,
+                )
+            valid = segment_ids != -1
+            if rescore:
+                # Decode each candidate row once for all queries that share it.
+                unique, inverse = np.unique(segment_ids[valid], return_inverse=True)
+                decoded = np.asarray(segment.vectors[unique], dtype=np.float32)
+                rows = np.split(inverse, np.cumsum(valid.sum(axis=1))[:-1])
+            for query_id in range(count):
+                row_ids = segment_ids[query_id][valid[query_id]]
+                if rescore:
+                    row_scores = decoded[rows[query_id]] @ request_embeddings[query_id]
+                else:
+                    row_scores = segment_scores[query_id][valid[query_id]]
+                positions[query_id].append(np.full(len(row_ids), position, dtype=np.int64))
+                ids[query_id].append(row_ids)
+                scores[query_id].append(row_scores)
+
+        if not searched:
+            self.logger.warning("Index is not loaded or empty. Returning empty result.")
+            empty = (np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=np.float32))
+            return [empty for _ in range(count)]
+
+        results = []
+        for query_positions, query_ids, query_scores in zip(positions, ids, scores, strict=True):
+            all_positions = np.concatenate(query_positions)
+            all_ids = np.concatenate(query_ids)
+            all_scores = np.concatenate(query_scores)
+            order = np.argsort(-all_scores, kind='stable')[:k]
+            results.append((all_positions[order], all_ids[order], all_scores[order]))
+        return results
+
+    def exact_search_segments(self, queries: np.ndarray, k: int, batch_size: int = 65536) -> List[np.ndarray]:
+        """Find the exact top-k live rows for each query by brute force over the embeddings.
+
+        Requires segments loaded with rescoring or ``with_vectors``, so their
+        embeddings are mapped.
+
+        Args:
+            queries: L2-normalized query matrix.
+            k: Number of nearest neighbors per query.
+            batch_size: Number of embedding rows scored per batch.
+
+        Returns:
+            One ``(k, 2)`` array of (segment position, row id) pairs per query,
+            ordered by descending similarity.
+
+        Raises:
+            RuntimeError: If segment embeddings are not loaded.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_keys = np.empty((len(queries), 0, 2), dtype=np.int64)
+        for position, segment in enumerate(self.segments):
+            if segment.vectors is None:
+                raise RuntimeError("Exact search needs segments loaded with their embeddings")
+            for start in range(0, segment.vectors.shape[0], batch_size):
+                block = np.asarray(segment.vectors[start:start + batch_size], dtype=np.float32) @ queries.T
+                rows = np.arange(start, start + block.shape[0], dtype=np.int64)
+                block[np.isin(rows, segment.deleted)] = -np.inf
+                keys = np.stack([np.full_like(rows, position), rows], axis=1)
+                best_scores = np.concatenate([best_scores, block.T], axis=1)
+                best_keys = np.concatenate([best_keys, np.broadcast_to(keys, (len(queries),) + keys.shape)], axis=1)
+                if best_scores.shape[1] > k:
+                    top = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                    best_scores = np.take_along_axis(best_scores, top, axis=1)
+                    best_keys = np.take_along_axis(best_keys, top[:, :, None], axis=1)
+
+        results = []
+        for scores, keys in zip(best_scores, best_keys, strict=True):
+            live = np.isfinite(scores)
+            order = np.argsort(-scores[live], kind='stable')
+            results.append(keys[live][order])
+        return results
+
+    def rescore_recall(self, queries: np.ndarray, k: int) -> float:
+        """Measure recall@k of ``search_segments`` against exact search.
+
+        Args:
+            queries: L2-normalized query matrix.
+            k: Number of nearest neighbors per query.
+
+        Returns:
+            Mean share of the exact top-k rows found by ``search_segments``.
+        """
+        recalls = []
+        for query, exact in zip(queries, self.exact_search_segments(queries, k), strict=True):
+            if not len(exact):
+                continue
+            positions, ids, _ = self.search_segments(query[None, :], k)
+            found = set(zip(positions.tolist(), ids.tolist(), strict=True))
+            recalls.append(len(found & set(map(tuple, exact.tolist()))) / len(exact))
+        return float(np.mean(recalls)) if recalls else 1.0
+
+    def calibrate_rescore(self, k: int, tolerance: float, sample_size: int, max_factor: int = 64) -> float:
+        """Raise ``rescore_factor`` until two-stage recall@k is within ``tolerance`` of exact search.
+
+        Held-out rows of the loaded segments serve as queries, and the exact
+        ground truth comes from brute force over the memory-mapped embeddings.
+
+        Args:
+            k: Number of candidates the caller requests from ``search_segments``.
+            tolerance: Largest acceptable recall loss, e.g. 0.02 for recall of at least 0.98.
+            sample_size: Number of sampled query rows.
+            max_factor: Upper bound for ``rescore_factor``.
+
+        Returns:
+            Recall@k measured with the final ``rescore_factor``.
+        """
+        rng = np.random.default_rng(0)
+        queries = []
+        for segment in self.segments:
+            if segment.vectors is None or not segment.vectors.shape[0]:
+                continue
+            live = np.setdiff1d(np.arange(segment.vectors.shape[0]), segment.deleted)
+            share = max(1, sample_size // len(self.segments))
+            rows = np.sort(rng.choice(live, size=min(share, len(live)), replace=False))
+            queries.append(np.asarray(segment.vectors[rows], dtype=np.float32))
+        if not queries:
+            return 1.0
+        queries = np.vstack(queries)
+        faiss.normalize_L2(queries)
+
+        recall = self.rescore_recall(queries, k)
+        while recall < 1.0 - tolerance and self.rescore_factor < max_factor:
+            self.rescore_factor = min(max_factor, self.rescore_factor * 2)
+            recall = self.rescore_recall(queries, k)
+        self.logger.info(
+            f"Two-stage search recall@{k} = {recall:.3f} with rescore_factor={self.rescore_factor} "
+            f"on {len(queries)} sampled queries"
+        )
+        if recall < 1.0 - tolerance:
+            self.logger.warning(f"Recall stays below {1.0 - tolerance:.3f} at the maximum rescore_factor={max_factor}")
+        return recall
+
+    def _search_index(
+        self,
+        index: Any,
+        selector: Optional[Any],
+        request_embedding: np.ndarray,
+        k: int,
+        ef_search: Optional[int] = None,
+        nprobe: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Search one index with per-call parameters, skipping ids rejected by a selector.
+
+        The index itself is never modified, so concurrent calls with
+        different parameters do not interfere.
+        """
+        params = self._search_params(index, selector, ef_search, nprobe)
+        if params is None:
+            return index.search(request_embedding, k)
+        return index.search(request_embedding, k, params=params)
+
+    def _search_params(
+        self,
+        index: Any,
+        selector: Optional[Any] = None,
+        ef_search: Optional[int] = None,
+        nprobe: Optional[int] = None,
+    ) -> Optional[Any]:
+        """Build FAISS search parameters for one call.
+
+        Returns:
+            ``SearchParametersHNSW`` or ``SearchParametersIVF`` for approximate
+            indexes, ``SearchParameters`` carrying the selector for exact ones,
+            or None if an exact index is searched without a selector.
+        """
+        sel = selector[0] if selector is not None else None
+        if isinstance(index, faiss.IndexBinary):
+            return faiss.SearchParameters(sel=sel) if sel is not None else None
+        if hasattr(index, 'hnsw'):
+            params = faiss.SearchParametersHNSW(efSearch=int(ef_search or self.hnsw_ef_search))
+        else:
+            ivf = faiss.try_extract_index_ivf(index)
+            if ivf is not None:
+                params = faiss.SearchParametersIVF(nprobe=int(nprobe or ivf.nprobe))
+            elif sel is not None:
+                params = faiss.SearchParameters()
+            else:
+                return None
+        if sel is not None:
+            params.sel = sel
+        return params
+
+    def _index_spec_params(
+        self, index: Any, spec: Optional[Dict[str, Any]], index_path: str
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """Read the search parameters recorded in a manifest for a loaded index.
+
+        Returns:
+            The recorded HNSW ``ef_search`` and IVF ``nprobe``; each is None if
+            not recorded or if the manifest does not describe this index.
+        """
+        if not spec:
+            return None, None
+        actual = describe_index(index)
+        if spec.get("type") != actual["type"]:
+            self.logger.warning(f"Index at {index_path} is {actual['type']}, but the manifest records {spec.get('type')}")
+            return None, None
+        ef_search = int(spec["ef_search"]) if spec.get("ef_search") else None
+        nprobe = int(spec["nprobe"]) if spec.get("nprobe") and faiss.try_extract_index_ivf(index) is not None else None
+        return ef_search, nprobe
+
+    @staticmethod
+    def _check_rescore_mode(mode: Any) -> str:
+        """Validate a rescore mode name."""
+        mode = str(mode or 'none').strip().lower()
+        if mode not in RESCORE_MODES:
+            raise ValueError(f"Unsupported rescore_mode '{mode}', expected one of {RESCORE_MODES}")
+        return mode
+
+    @staticmethod
+    def _exclusion_selector(deleted: Sequence[int]) -> Optional[Any]:
+        """Return a selector rejecting deleted ids, with the inner selector kept alive."""
+        if not deleted:
+            return None
+        batch = faiss.IDSelectorBatch(np.asarray(deleted, dtype=np.int64))
+        return faiss.IDSelectorNot(batch), batch
+
+    def _read_index_file(self, index_path: str, mmap: Optional[bool] = None) -> Any:
+        """Read an index file, memory-mapping it read-only when ``mmap_index`` is set.
+
+        ``IO_FLAG_MMAP_IFC`` maps the vector and code storage of flat, HNSW
+        and IVF indexes; older FAISS builds without it fall back to
+        ``IO_FLAG_MMAP``. The two flags are not combined because FAISS then
+        rejects IVF indexes with in-memory inverted lists. A mapped index must
+        not be modified, so only read-only services should enable the mode.
+        """
+        if not (self.mmap_index if mmap is None else mmap):
+            return faiss.read_index(index_path)
+        flags = faiss.IO_FLAG_READ_ONLY | getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP)
+        return faiss.read_index(index_path, flags)
+
+    def search(
+        self, request_embedding: np.ndarray, k: int, ef_search: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """Nearest-neighbor search in FAISS.
 
         Args:
             request_embedding: L2-normalized query embedding vector.
             k: Number of nearest neighbors to return.
+            ef_search: HNSW ``efSearch`` for this call only, instead of ``hnsw_ef_search``.
 
         Returns:
             Tuple of (indices, scores) arrays for the k nearest neighbors.
@@ -107,10 +817,8 @@ class FaissDB:
 
         actual_k = min(k, self.index.ntotal)
 
-        if hasattr(self.index, 'hnsw'):
-            self.index.hnsw.efSearch = self.hnsw_ef_search
-
-        scores, ids = self.index.search(request_embedding, actual_k)
+        with self._search_slot():
+            scores, ids = self._search_index(self.index, None, request_embedding, actual_k, ef_search)
 
         valid_mask = ids[0] != -1
         valid_ids = ids[0][valid_mask]
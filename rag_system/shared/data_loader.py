@@ -3,10 +3,12 @@ import os
 import zipfile
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Any, List, Union
+from typing import Any, Iterator, List, Union
 
 import pandas as pd
 
+from rag_system.shared.json_stream import is_json_array
+from rag_system.shared.json_stream import iter_json_array_batches
 from rag_system.shared.logs import setup_logging
 from rag_system.shared.ocr import OCR
 
@@ -267,3 +269,63 @@ class DataLoader:
         except Exception as e:
             self.logger.error(f'Error loading data: {e}')
             raise
+
+    def iter_json(self, path: str, batch_size: int, column_name: str = 'text') -> Iterator[pd.DataFrame]:
+        """Stream records from a JSON array file in fixed-size DataFrames.
+
+        Files that are not a top-level array are loaded with ``from_json`` and sliced.
+
+        Args:
+            path: Path to the JSON file.
+            batch_size: Maximum number of records per batch.
+            column_name: Required text column name.
+
+        Returns:
+            An iterator over DataFrames with at most ``batch_size`` rows.
+
+        Raises:
+            FileNotFoundError: If the JSON file does not exist.
+            ValueError: If the required text column is missing.
+        """
+        if not is_json_array(path):
+            df = self.from_json(path, column_name=column_name)
+            for start in range(0, len(df), batch_size):
+                yield df.iloc[start:start + batch_size]
+            return
+
+        total = 0
+        for records in iter_json_array_batches(path, batch_size):
+            df = pd.DataFrame(records)
+            if column_name not in df.columns:
+                raise ValueError(f'Column "{column_name}" not found in file {path}')
+            total += len(df)
+            yield df
+        self.logger.info(f'Streamed {total} records from {path}')
+
+    def iter_data(self, data: Union[str, List[str]], batch_size: int) -> Iterator[pd.DataFrame]:
+        """Yield data from a source in fixed-size batches.
+
+        JSON array files are streamed record by record; other sources are
+        loaded with ``load_data`` and then sliced.
+
+        Args:
+            data: Data source accepted by ``load_data``.
+            batch_size: Maximum number of records per batch.
+
+        Returns:
+            An iterator over DataFrames with a ``text`` column.
+
+        Raises:
+            Exception: If the source cannot be loaded.
+        """
+        if isinstance(data, str) and os.path.isfile(data) and Path(data).suffix.lower() == '.json':
+            yield from self.iter_json(data, batch_size)
+            return
+
+        df = self.load_data(data)
+        for start in range(0, len(df), batch_size):
+            yield df.iloc[start:start + batch_size]
+
+    def close(self) -> None:
+        """Shut down the OCR worker processes, if any were started."""
+        self.ocr.close()
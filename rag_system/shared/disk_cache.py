@@ -0,0 +1,174 @@
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Dict, Iterable, Optional
+
+
+class DiskCache:
+    """Persistent key-value blob cache in SQLite with LRU eviction by total size."""
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        """Open or create the cache database.
+
+        Args:
+            path: Path to the SQLite database file.
+            max_bytes: Maximum total size of stored values. Least recently used
+                entries are evicted when the limit is exceeded.
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened or initialized.
+        """
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)")
+        self._conn.commit()
+        self._total_bytes = self._stored_bytes()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return one cached value.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Cached bytes, or None on a miss.
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Return cached values for several keys and refresh their LRU position.
+
+        Args:
+            keys: Cache keys to look up.
+
+        Returns:
+            Mapping of found keys to cached bytes. Missing keys are omitted.
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, bytes] = {}
+        if not unique_keys:
+            return found
+
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update((key, bytes(value)) for key, value in rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(unique_keys) - len(found)
+        return found
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store one value.
+
+        Args:
+            key: Cache key.
+            value: Bytes to store.
+        """
+        self.put_many({key: value})
+
+    def put_many(self, items: Dict[str, bytes]) -> None:
+        """Store several values and evict least recently used entries if needed.
+
+        Args:
+            items: Mapping of cache keys to bytes.
+        """
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                [(key, sqlite3.Binary(value), len(value), now) for key, value in items.items()],
+            )
+            self._conn.commit()
+            self._total_bytes += sum(len(value) for value in items.values())
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def clear(self) -> None:
+        """Remove all cached entries and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache usage counters.
+
+        Returns:
+            Entry count, stored bytes, size limit, and hit/miss counters.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {
+                "entries": int(entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _stored_bytes(self) -> int:
+        """Return the total size of stored values."""
+        return int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0])
+
+    def _evict(self) -> None:
+        """Evict least recently used entries down to 90% of the limit while the lock is held."""
+        # Other processes may share the file, so re-read the real size first.
+        self._total_bytes = self._stored_bytes()
+        excess = self._total_bytes - int(self.max_bytes * 0.9)
+        if excess <= 0:
+            return
+
+        evicted_keys = []
+        freed = 0
+        cursor = self._conn.execute("SELECT key, size FROM entries ORDER BY last_used")
+        while freed < excess:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            for key, size in rows:
+                evicted_keys.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+        cursor.close()
+
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted_keys)
+        self._conn.commit()
+        self._total_bytes -= freed
@@ -0,0 +1,105 @@
+import hashlib
+import os
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+from rag_system.shared.disk_cache import DiskCache
+from rag_system.shared.logs import setup_logging
+
+
+class EmbeddingCache:
+    """Content-addressed on-disk cache of normalized embedding vectors.
+
+    Entries are keyed by model identity, prefix mode, and the SHA-256 of the
+    exact text passed to the model, so re-indexing text that was already
+    embedded skips model inference.
+    """
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        """Open the embedding cache.
+
+        Args:
+            path: Path to the SQLite cache file.
+            max_bytes: Maximum total size of stored vectors.
+
+        Raises:
+            sqlite3.Error: If the cache file cannot be opened.
+        """
+        self.path = path
+        self.store = DiskCache(path, max_bytes=max_bytes)
+
+    @classmethod
+    def from_config(cls, config: Any) -> Optional["EmbeddingCache"]:
+        """Create an embedding cache from a configuration object.
+
+        Args:
+            config: Configuration object with data and cache settings.
+
+        Returns:
+            An embedding cache, or None if caching is disabled or the cache
+            file cannot be opened (for example on a read-only volume).
+        """
+        if not bool(getattr(config, 'embedding_cache_enabled', False)):
+            return None
+
+        logger = setup_logging(config.logs_dir, 'EmbeddingCache')
+        data_dir = str(getattr(config, 'data_dir', '') or '.')
+        path = str(getattr(config, 'embedding_cache_path', '') or os.path.join(data_dir, 'embedding_cache.sqlite3'))
+        max_bytes = int(float(getattr(config, 'embedding_cache_max_mb', 1024)) * 1024 * 1024)
+        try:
+            cache = cls(path, max_bytes=max_bytes)
+            logger.info(f"Embedding cache opened at {path} (limit {max_bytes // (1024 * 1024)} MB)")
+            return cache
+        except Exception as e:
+            logger.warning(f"Embedding cache unavailable at {path}, continuing without it: {e}")
+            return None
+
+    @staticmethod
+    def make_key(model_id: Optional[str], prefix_mode: str, text: str) -> str:
+        """Build a cache key for one text.
+
+        Args:
+            model_id: Embedding model identity, including anything that changes its vectors.
+            prefix_mode: Embedding prefix mode (``query``, ``passage`` or ``none``).
+            text: Exact text passed to the model.
+
+        Returns:
+            A fixed-length hexadecimal cache key.
+        """
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        key_input = f"{model_id or ''}\0{prefix_mode}\0{text_hash}"
+        return hashlib.sha256(key_input.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the given keys.
+
+        Args:
+            keys: Cache keys to look up.
+
+        Returns:
+            Mapping of found keys to float32 vectors.
+        """
+        return {
+            key: np.frombuffer(value, dtype=np.float32)
+            for key, value in self.store.get_many(keys).items()
+        }
+
+    def put_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Store vectors in the cache.
+
+        Args:
+            vectors: Mapping of cache keys to embedding vectors.
+        """
+        self.store.put_many({
+            key: np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+            for key, vector in vectors.items()
+        })
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache usage counters.
+
+        Returns:
+            Entry count, stored bytes, size limit, and hit/miss counters.
+        """
+        return self.store.stats()
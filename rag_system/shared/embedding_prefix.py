@@ -13,6 +13,21 @@ def uses_e5_prefix(model_name: Optional[str]) -> bool:
     return bool(model_name and "e5" in model_name.lower())
 
 
+def embedding_prefix_mode(model_name: Optional[str], is_query: bool) -> str:
+    """Return the prefix mode applied to texts for an embedding model.
+
+    Args:
+        model_name: Optional embedding model name.
+        is_query: If True, describe query embeddings; otherwise passage embeddings.
+
+    Returns:
+        ``query`` or ``passage`` for E5 models, otherwise ``none``.
+    """
+    if not uses_e5_prefix(model_name):
+        return "none"
+    return "query" if is_query else "passage"
+
+
 def prepare_embedding_texts(
     model_name: Optional[str],
     texts: Iterable[str],
@@ -0,0 +1,189 @@
+import os
+import shutil
+from typing import Any, Optional, Tuple, Union
+
+import numpy as np
+
+EMBEDDING_DTYPES = ("float32", "float16", "int8")
+SCALE_SUFFIX = "_scale.npy"
+INT8_MAX = 127
+
+
+def check_embedding_dtype(name: str) -> str:
+    """Validate an embedding storage dtype name.
+
+    Args:
+        name: Storage dtype name from the configuration.
+
+    Returns:
+        The normalized dtype name.
+
+    Raises:
+        ValueError: If the dtype is not supported.
+    """
+    normalized = str(name).strip().lower()
+    if normalized not in EMBEDDING_DTYPES:
+        raise ValueError(f"Unsupported embedding storage dtype '{name}', expected one of {EMBEDDING_DTYPES}")
+    return normalized
+
+
+def scale_path(embeddings_path: str) -> str:
+    """Return the path of the per-dimension scale file stored next to int8 embeddings."""
+    base, _ = os.path.splitext(str(embeddings_path))
+    return base + SCALE_SUFFIX
+
+
+def int8_scales(max_abs: np.ndarray) -> np.ndarray:
+    """Compute symmetric per-dimension int8 scales from column maxima.
+
+    Args:
+        max_abs: Maximum absolute value of every dimension.
+
+    Returns:
+        Float32 scales; dimensions that are always zero get a scale of 1.
+    """
+    scales = np.asarray(max_abs, dtype=np.float32) / INT8_MAX
+    scales[scales == 0] = 1.0
+    return scales
+
+
+def encode_rows(rows: np.ndarray, dtype: str, scales: Optional[np.ndarray] = None) -> np.ndarray:
+    """Convert float32 rows to the storage dtype.
+
+    Args:
+        rows: Float32 embedding rows.
+        dtype: Storage dtype name.
+        scales: Per-dimension scales, required for int8.
+
+    Returns:
+        Rows in the storage dtype.
+    """
+    if dtype == "int8":
+        quantized = np.rint(rows / scales)
+        return np.clip(quantized, -INT8_MAX, INT8_MAX).astype(np.int8)
+    return np.asarray(rows, dtype=np.dtype(dtype))
+
+
+class StoredEmbeddings:
+    """Read-only view of reduced-precision embeddings that upcasts on access.
+
+    Indexing rows returns a float32 array, and converting the whole view with
+    ``np.asarray`` decodes every row, so callers that feed vectors to FAISS
+    never see the storage dtype. With a memory-mapped file only the selected
+    rows are read and decoded.
+    """
+
+    dtype = np.dtype(np.float32)
+
+    def __init__(self, stored: np.ndarray, scales: Optional[np.ndarray] = None) -> None:
+        self.stored = stored
+        self.scales = scales
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Shape of the embedding matrix."""
+        return self.stored.shape
+
+    @property
+    def ndim(self) -> int:
+        """Number of dimensions of the embedding matrix."""
+        return self.stored.ndim
+
+    @property
+    def storage_dtype(self) -> np.dtype:
+        """Dtype the vectors are stored in."""
+        return self.stored.dtype
+
+    def __len__(self) -> int:
+        return self.stored.shape[0]
+
+    def __getitem__(self, rows: Any) -> np.ndarray:
+        """Decode the selected rows to float32.
+
+        Args:
+            rows: Row index, slice, or array of row numbers.
+
+        Returns:
+            Float32 rows.
+        """
+        decoded = np.asarray(self.stored[rows], dtype=np.float32)
+        if self.scales is not None:
+            decoded *= self.scales
+        return decoded
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        decoded = self[:]
+        return decoded if dtype is None else decoded.astype(dtype, copy=False)
+
+
+def open_embeddings(path: str, mmap: bool = False) -> Union[np.ndarray, StoredEmbeddings]:
+    """Open an embeddings NPY file in any storage dtype.
+
+    Args:
+        path: Path to the embeddings NPY file.
+        mmap: If True, memory-map the file read-only instead of reading it into RAM.
+
+    Returns:
+        The float32 array itself, or a view that upcasts float16 and int8 rows.
+
+    Raises:
+        FileNotFoundError: If int8 embeddings have no scale file.
+        ValueError: If the file uses an unsupported dtype.
+    """
+    stored = np.load(path, mmap_mode='r' if mmap else None)
+    if stored.dtype == np.float32:
+        return stored
+    if stored.dtype == np.float16:
+        return StoredEmbeddings(stored)
+    if stored.dtype == np.int8:
+        return StoredEmbeddings(stored, np.load(scale_path(path)))
+    raise ValueError(f"Unsupported embeddings dtype {stored.dtype} in {path}")
+
+
+def write_embeddings(
+    raw_path: str,
+    out_path: str,
+    shape: Tuple[int, int],
+    dtype: str = "float32",
+    batch_rows: int = 65536,
+) -> None:
+    """Convert a raw float32 row file into an NPY file in the storage dtype.
+
+    Rows are converted in batches, so memory does not depend on the number of
+    rows. Int8 storage takes one extra pass to find per-dimension maxima and
+    writes the scales to a file next to ``out_path``.
+
+    Args:
+        raw_path: File with float32 rows in C order and no header.
+        out_path: Destination NPY path.
+        shape: Number of rows and embedding dimension.
+        dtype: Storage dtype name.
+        batch_rows: Number of rows converted per batch.
+
+    Raises:
+        ValueError: If the dtype is not supported.
+    """
+    dtype = check_embedding_dtype(dtype)
+    header = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": shape}
+    if dtype == "float32" or shape[0] == 0:
+        with open(out_path, "wb") as out, open(raw_path, "rb") as raw:
+            np.lib.format.write_array_header_1_0(out, header)
+            shutil.copyfileobj(raw, out, length=1 << 22)
+        if dtype == "int8":
+            np.save(scale_path(out_path), np.ones(shape[1], dtype=np.float32))
+        return
+
+    raw = np.memmap(raw_path, dtype=np.float32, mode="r", shape=shape)
+    scales: Optional[np.ndarray] = None
+    if dtype == "int8":
+        max_abs = np.zeros(shape[1], dtype=np.float32)
+        for start in range(0, shape[0], batch_rows):
+            np.maximum(max_abs, np.abs(raw[start:start + batch_rows]).max(axis=0), out=max_abs)
+        scales = int8_scales(max_abs)
+        np.save(scale_path(out_path), scales)
+
+    with open(out_path, "wb") as out:
+        np.lib.format.write_array_header_1_0(out, header)
+        for start in range(0, shape[0], batch_rows):
+            out.write(encode_rows(np.asarray(raw[start:start + batch_rows]), dtype, scales).tobytes())
+    del raw
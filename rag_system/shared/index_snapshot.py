@@ -1,38 +1,332 @@
 import json
 import os
 import shutil
+import time
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import faiss
 import numpy as np
 
+from rag_system.shared.chunk_store import ChunkStore
+from rag_system.shared.chunk_store import ChunkStoreWriter
+from rag_system.shared.chunk_store import is_chunk_store
+from rag_system.shared.data_base import describe_index
+from rag_system.shared.embedding_storage import StoredEmbeddings
+from rag_system.shared.embedding_storage import check_embedding_dtype
+from rag_system.shared.embedding_storage import open_embeddings
+from rag_system.shared.embedding_storage import write_embeddings
+from rag_system.shared.json_stream import iter_json_array_batches
+
+SNAPSHOT_VERSION = 3
+SEGMENT_VERSION = 2
+MANIFEST_FILENAME = "manifest.json"
+RETIRED_FILENAME = "retired"
+RESCORE_CALIBRATION_FILENAME = "rescore_calibration.json"
+CHUNKS_DIRNAME = "chunks"
+LEGACY_DATA_FILENAME = "processed_data.json"
+
+
+def read_chunk_store(path: str, mmap: bool = False) -> ChunkStore:
+    """Open processed data in either snapshot format.
+
+    Args:
+        path: Chunk store directory, or a legacy processed data JSON file.
+        mmap: If True, memory-map chunk store columns. Legacy JSON is always read into RAM.
+
+    Returns:
+        A chunk store. Legacy JSON is decoded once into an in-memory store.
+
+    Raises:
+        ValueError: If a legacy file does not contain a list.
+        json.JSONDecodeError: If a legacy file contains invalid JSON.
+    """
+    if is_chunk_store(path):
+        return ChunkStore.open(path, mmap=mmap)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError("Processed data must be a list")
+    return ChunkStore.from_records(data)
+
+
+def _new_id() -> str:
+    """Return a sortable unique identifier for snapshots and segments."""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ") + "-" + uuid.uuid4().hex
+
+
+@dataclass(frozen=True)
+class Segment:
+    """One immutable part of a snapshot: chunk records, embeddings and a FAISS index.
+
+    Segments are never modified after they are written. Deleting chunks adds
+    their row numbers to ``deleted`` in the next snapshot manifest instead.
+
+    Attributes:
+        segment_id: Segment identifier.
+        processed_data_path: Path to the chunk store directory or legacy JSON file.
+        embeddings_path: Path to the embeddings NPY file.
+        index_path: Path to the FAISS index file.
+        items_count: Number of rows in the segment, or None if unknown.
+        deleted: Sorted row numbers removed by tombstones.
+        directory: Segment directory, or None for legacy artifacts at configured paths.
+        index_spec: Index family and search parameters (see ``describe_index``),
+            or None if the manifest does not record them.
+    """
+
+    segment_id: str
+    processed_data_path: str
+    embeddings_path: str
+    index_path: str
+    items_count: Optional[int] = None
+    deleted: Tuple[int, ...] = ()
+    directory: Optional[str] = None
+    index_spec: Optional[Dict[str, Any]] = field(default=None, compare=False)
+
+    @classmethod
+    def in_directory(
+        cls,
+        segment_id: str,
+        directory: Path,
+        items_count: Optional[int] = None,
+        deleted: Iterable[int] = (),
+        index_spec: Optional[Dict[str, Any]] = None,
+    ) -> "Segment":
+        """Describe a segment stored in its own directory.
+
+        Args:
+            segment_id: Segment identifier.
+            directory: Segment directory.
+            items_count: Number of rows in the segment, if known.
+            deleted: Row numbers removed by tombstones.
+            index_spec: Index family and search parameters, if recorded.
+
+        Returns:
+            The segment description.
+        """
+        processed_data_path = directory / CHUNKS_DIRNAME
+        if not processed_data_path.is_dir():
+            processed_data_path = directory / LEGACY_DATA_FILENAME
+        return cls(
+            segment_id=segment_id,
+            processed_data_path=str(processed_data_path),
+            embeddings_path=str(directory / "embeddings.npy"),
+            index_path=str(directory / "index.index"),
+            items_count=items_count,
+            deleted=tuple(sorted(set(int(row) for row in deleted))),
+            directory=str(directory),
+            index_spec=index_spec,
+        )
+
+    @property
+    def live_count(self) -> int:
+        """Number of rows not removed by tombstones."""
+        return (self.items_count or 0) - len(self.deleted)
+
+    def live_rows(self, items_count: Optional[int] = None) -> Optional[np.ndarray]:
+        """Return the row numbers not removed by tombstones.
+
+        Args:
+            items_count: Number of rows, if ``items_count`` is not recorded.
+
+        Returns:
+            Sorted live row numbers, or None when no row is deleted.
+        """
+        if not self.deleted:
+            return None
+        count = self.items_count if self.items_count is not None else items_count
+        return np.setdiff1d(np.arange(count or 0, dtype=np.int64), np.array(self.deleted, dtype=np.int64))
+
 
 @dataclass(frozen=True)
 class IndexArtifacts:
     """Paths that make up one consistent index snapshot.
 
     Attributes:
-        processed_data_path: Path to the processed data JSON file.
+        processed_data_path: Path to the chunk store directory, or the
+            processed data JSON file for legacy snapshots. For snapshots with
+            several segments this and the other paths point at the first segment.
         embeddings_path: Path to the embeddings NPY file.
         index_path: Path to the FAISS index file.
         snapshot_id: Optional snapshot identifier for published snapshots.
+        segments: Segments of the snapshot in search order.
     """
 
     processed_data_path: str
     embeddings_path: str
     index_path: str
     snapshot_id: Optional[str] = None
+    segments: Tuple[Segment, ...] = field(default=())
+
+    @property
+    def live_count(self) -> int:
+        """Number of live chunks across all segments."""
+        return sum(segment.live_count for segment in self.segments)
+
+
+class _LiveTexts(Sequence[str]):
+    """Read-only sequence of live texts across the parts of ``SnapshotChunks``."""
+
+    def __init__(self, chunks: "SnapshotChunks") -> None:
+        self._chunks = chunks
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        part, row = self._chunks.locate(index)
+        return self._chunks.parts[part].texts[row]
+
+    def __iter__(self) -> Iterator[str]:
+        for store, rows in zip(self._chunks.parts, self._chunks.live_rows, strict=True):
+            if rows is None:
+                yield from store.texts
+            else:
+                for row in rows:
+                    yield store.texts[int(row)]
+
+
+class SnapshotChunks:
+    """Live chunk records of a snapshot, numbered across its segments.
+
+    Row ``i`` is the ``i``-th chunk that is not removed by a tombstone, in
+    segment order. The interface follows ``ChunkStore`` so readers do not
+    need to know how many segments a snapshot has.
+    """
+
+    def __init__(self, parts: Sequence[ChunkStore], live_rows: Sequence[Optional[np.ndarray]]) -> None:
+        """Initialize the view.
+
+        Args:
+            parts: Chunk store of every segment.
+            live_rows: Live row numbers per segment, or None where nothing is deleted.
+        """
+        self.parts = list(parts)
+        self.live_rows = list(live_rows)
+        sizes = [len(store) if rows is None else len(rows) for store, rows in zip(self.parts, self.live_rows, strict=True)]
+        self.starts = np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)]).astype(np.int64)
+        self.texts = _LiveTexts(self)
+
+    def __len__(self) -> int:
+        return int(self.starts[-1])
+
+    def locate(self, row: int) -> Tuple[int, int]:
+        """Map a live row number to a segment position and a row inside that segment.
+
+        Args:
+            row: Live row number.
+
+        Returns:
+            Tuple of (segment position, segment row).
+
+        Raises:
+            IndexError: If the row is out of range.
+        """
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("chunk index out of range")
+        part = int(np.searchsorted(self.starts, row, side="right")) - 1
+        local = row - int(self.starts[part])
+        rows = self.live_rows[part]
+        return part, local if rows is None else int(rows[local])
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Decode one live record.
+
+        Args:
+            row: Live row number.
+
+        Returns:
+            The record with its original fields.
+        """
+        part, local = self.locate(row)
+        return self.parts[part].record(local)
+
+    def records(self, rows: Optional[Iterable[int]] = None) -> Iterator[Dict[str, Any]]:
+        """Decode live records in row order.
+
+        Args:
+            rows: Optional live row numbers to decode instead of all rows.
+
+        Returns:
+            An iterator over records.
+        """
+        if rows is not None:
+            for row in rows:
+                yield self.record(int(row))
+            return
+        for store, live in zip(self.parts, self.live_rows, strict=True):
+            yield from store.records(live)
+
+    def rows_with_value(self, field_name: str, value: Any) -> np.ndarray:
+        """Return the live row numbers whose dictionary-encoded field equals a value.
+
+        Args:
+            field_name: Field name, e.g. ``source``.
+            value: Value to match.
+
+        Returns:
+            Sorted live row numbers.
+        """
+        matches = []
+        for part, (store, live) in enumerate(zip(self.parts, self.live_rows, strict=True)):
+            rows = store.rows_with_value(field_name, value)
+            if live is not None:
+                positions = np.searchsorted(live, rows)
+                found = positions < len(live)
+                found[found] = live[positions[found]] == rows[found]
+                rows = positions[found]
+            matches.append(rows.astype(np.int64) + self.starts[part])
+        return np.concatenate(matches) if matches else np.empty(0, dtype=np.int64)
+
+    def iter_batches(self, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Decode live records in fixed-size lists.
+
+        Args:
+            batch_size: Maximum number of records per batch.
+
+        Returns:
+            An iterator over record batches.
+        """
+        for start in range(0, len(self), batch_size):
+            yield list(self.records(range(start, min(start + batch_size, len(self)))))
+
+    def hash_list(self) -> List[str]:
+        """Return live chunk hashes in row order."""
+        hashes: List[str] = []
+        for store, live in zip(self.parts, self.live_rows, strict=True):
+            segment_hashes = store.hash_list()
+            hashes.extend(segment_hashes if live is None else [segment_hashes[int(row)] for row in live])
+        return hashes
 
 
 class IndexSnapshotStore:
-    """Publish and resolve index snapshots through an atomic current pointer."""
+    """Publish and resolve index snapshots through an atomic current pointer.
+
+    A snapshot is a manifest listing immutable segments and their tombstones.
+    Adding chunks writes one new segment, and deleting chunks records
+    tombstones, so each publish costs time proportional to the change. Older
+    snapshots that hold their files directly are read as a single segment.
+
+    New segments store embeddings in ``embedding_dtype`` (float32, float16, or
+    int8 with per-dimension scales); readers upcast to float32 regardless of
+    the dtype a segment was written with.
+
+    Segments dropped from the current snapshot are retired rather than deleted:
+    readers in other processes may still hold or be about to open them, so
+    their directories are removed by a later publish once
+    ``segment_retention_seconds`` have passed.
+    """
 
     pointer_filename = "current_index.json"
     snapshots_dirname = "index_snapshots"
+    segments_dirname = "index_segments"
 
     def __init__(
         self,
@@ -40,9 +334,14 @@ class IndexSnapshotStore:
         processed_data_path: str,
         embeddings_path: str,
         index_path: str,
+        embedding_dtype: str = "float32",
+        segment_retention_seconds: float = 600.0,
     ) -> None:
         self.data_dir = Path(data_dir)
+        self.embedding_dtype = check_embedding_dtype(embedding_dtype)
+        self.segment_retention_seconds = max(0.0, float(segment_retention_seconds))
         self.snapshot_dir = self.data_dir / self.snapshots_dirname
+        self.segment_dir = self.data_dir / self.segments_dirname
         self.pointer_path = self.data_dir / self.pointer_filename
         self.legacy_artifacts = IndexArtifacts(
             processed_data_path=str(Path(processed_data_path)),
@@ -59,6 +358,9 @@ class IndexSnapshotStore:
 
         Returns:
             An initialized snapshot store.
+
+        Raises:
+            ValueError: If the embedding storage dtype is not supported.
         """
         processed_data_path = str(config.processed_data_path)
         index_path = str(config.index_path)
@@ -69,6 +371,8 @@ class IndexSnapshotStore:
             processed_data_path=processed_data_path,
             embeddings_path=embeddings_path,
             index_path=index_path,
+            embedding_dtype=str(getattr(config, "embedding_storage_dtype", "float32") or "float32"),
+            segment_retention_seconds=float(getattr(config, "segment_retention_seconds", 600.0)),
         )
 
     def current_artifacts(self) -> IndexArtifacts:
@@ -79,52 +383,170 @@ class IndexSnapshotStore:
 
         Raises:
             KeyError: If the pointer file does not contain a snapshot identifier.
-            json.JSONDecodeError: If the pointer file contains invalid JSON.
+            json.JSONDecodeError: If the pointer or manifest file contains invalid JSON.
         """
         if not self.pointer_path.exists():
-            return self.legacy_artifacts
+            legacy = self.legacy_artifacts
+            if not os.path.exists(legacy.processed_data_path):
+                return legacy
+            segment = Segment(
+                segment_id="legacy",
+                processed_data_path=legacy.processed_data_path,
+                embeddings_path=legacy.embeddings_path,
+                index_path=legacy.index_path,
+            )
+            return replace(legacy, segments=(segment,))
 
         with open(self.pointer_path, "r", encoding="utf-8") as f:
             pointer = json.load(f)
 
         snapshot_id = pointer["snapshot"]
         snapshot_path = self.snapshot_dir / snapshot_id
+        manifest = self._read_manifest(snapshot_path)
+        if "segments" in manifest:
+            segments = tuple(
+                Segment.in_directory(
+                    item["id"],
+                    self.data_dir / item["path"],
+                    items_count=item.get("items_count"),
+                    deleted=item.get("deleted", ()),
+                    index_spec=item.get("index"),
+                )
+                for item in manifest["segments"]
+            )
+        else:
+            # Snapshots written before segments hold their files directly.
+            items_count = manifest.get("items_count", pointer.get("items_count"))
+            segments = (Segment.in_directory(snapshot_id, snapshot_path, items_count=items_count),)
+
+        first = segments[0] if segments else Segment.in_directory(snapshot_id, snapshot_path)
         return IndexArtifacts(
-            processed_data_path=str(snapshot_path / "processed_data.json"),
-            embeddings_path=str(snapshot_path / "embeddings.npy"),
-            index_path=str(snapshot_path / "index.index"),
+            processed_data_path=first.processed_data_path,
+            embeddings_path=first.embeddings_path,
+            index_path=first.index_path,
             snapshot_id=snapshot_id,
+            segments=segments,
         )
 
+    def load_chunks(self, mmap: bool = False, artifacts: Optional[IndexArtifacts] = None) -> Optional[SnapshotChunks]:
+        """Open the live chunk records of the current snapshot.
+
+        Args:
+            mmap: If True, memory-map the chunk store columns read-only.
+            artifacts: Snapshot to open instead of resolving the current pointer.
+
+        Returns:
+            Live chunk records, or None if no data exists.
+
+        Raises:
+            ValueError: If legacy processed data does not contain a list.
+            json.JSONDecodeError: If legacy processed data contains invalid JSON.
+        """
+        if artifacts is None:
+            artifacts = self.current_artifacts()
+        segments = [segment for segment in artifacts.segments if os.path.exists(segment.processed_data_path)]
+        if not segments:
+            return None
+        parts = [read_chunk_store(segment.processed_data_path, mmap=mmap) for segment in segments]
+        live_rows = [segment.live_rows(len(store)) for segment, store in zip(segments, parts, strict=True)]
+        return SnapshotChunks(parts, live_rows)
+
     def load_processed_data(self) -> List[Dict[str, Any]]:
-        """Load processed data from the current snapshot.
+        """Load live processed data from the current snapshot.
 
         Returns:
-            Processed data records, or an empty list if no data file exists.
+            Processed data records, or an empty list if no data exists.
 
         Raises:
-            ValueError: If the processed data file does not contain a list.
-            json.JSONDecodeError: If the processed data file contains invalid JSON.
+            ValueError: If legacy processed data does not contain a list.
+            json.JSONDecodeError: If legacy processed data contains invalid JSON.
         """
-        artifacts = self.current_artifacts()
-        if not os.path.exists(artifacts.processed_data_path):
-            return []
-        with open(artifacts.processed_data_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, list):
-            raise ValueError("Processed data must be a list")
-        return data
+        chunks = self.load_chunks()
+        return [] if chunks is None else list(chunks.records())
 
-    def load_embeddings(self) -> Optional[np.ndarray]:
-        """Load embeddings from the current snapshot.
+    def load_hashes(self) -> List[str]:
+        """Load live chunk hashes from the current snapshot without decoding texts.
 
         Returns:
-            Embedding matrix if the file exists, otherwise None.
+            Hashes in row order, or an empty list if no data exists.
+        """
+        hashes: List[str] = []
+        for segment in self.current_artifacts().segments:
+            if not os.path.exists(segment.processed_data_path):
+                continue
+            if is_chunk_store(segment.processed_data_path):
+                segment_hashes = ChunkStore.open_hashes(segment.processed_data_path)
+            else:
+                segment_hashes = read_chunk_store(segment.processed_data_path).hash_list()
+            live = segment.live_rows(len(segment_hashes))
+            hashes.extend(segment_hashes if live is None else [segment_hashes[int(row)] for row in live])
+        return hashes
+
+    def iter_processed_data(self, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Yield live processed data from the current snapshot in fixed-size batches.
+
+        Args:
+            batch_size: Maximum number of records per batch.
+
+        Returns:
+            An iterator over record batches. Nothing is yielded if no data exists.
+
+        Raises:
+            ValueError: If legacy processed data is not a JSON array.
         """
         artifacts = self.current_artifacts()
-        if not os.path.exists(artifacts.embeddings_path):
+        segments = artifacts.segments
+        if len(segments) == 1 and not segments[0].deleted and os.path.exists(segments[0].processed_data_path):
+            path = segments[0].processed_data_path
+            if not is_chunk_store(path):
+                # Stream legacy JSON without decoding the whole file at once.
+                yield from iter_json_array_batches(path, batch_size)
+                return
+        chunks = self.load_chunks(artifacts=artifacts)
+        if chunks is not None:
+            yield from chunks.iter_batches(batch_size)
+
+    def load_embeddings(self, mmap: bool = False) -> Optional[Union[np.ndarray, StoredEmbeddings]]:
+        """Load live embeddings from the current snapshot.
+
+        Args:
+            mmap: If True, memory-map the file read-only instead of reading it
+                into RAM. Only possible for a single segment without tombstones;
+                otherwise live rows are copied into one float32 array.
+
+        Returns:
+            Embedding matrix row-aligned with ``load_processed_data``, or None
+            if any segment has no embeddings file. Reduced-precision segments
+            are returned as a ``StoredEmbeddings`` view that yields float32 rows.
+        """
+        segments = self.current_artifacts().segments
+        if not segments or not all(os.path.exists(segment.embeddings_path) for segment in segments):
             return None
-        return np.load(artifacts.embeddings_path)
+        if len(segments) == 1 and not segments[0].deleted:
+            return open_embeddings(segments[0].embeddings_path, mmap=mmap)
+
+        parts = []
+        for segment in segments:
+            embeddings = open_embeddings(segment.embeddings_path, mmap=True)
+            live = segment.live_rows(embeddings.shape[0])
+            parts.append(np.asarray(embeddings if live is None else embeddings[live], dtype=np.float32))
+        return np.vstack(parts)
+
+    def open_writer(self) -> "SnapshotWriter":
+        """Start writing a new snapshot that replaces all current data.
+
+        Returns:
+            A writer that accepts records and embeddings in batches.
+        """
+        return SnapshotWriter(self)
+
+    def open_segment_writer(self) -> "SegmentWriter":
+        """Start writing a new segment in a staging directory.
+
+        Returns:
+            A writer that accepts records and embeddings in batches.
+        """
+        return SegmentWriter(self)
 
     def publish(
         self,
@@ -149,55 +571,130 @@ class IndexSnapshotStore:
         embeddings = np.array(embeddings, dtype=np.float32)
         self._validate_snapshot(processed_data, embeddings, index)
 
-        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
-        snapshot_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ") + "-" + uuid.uuid4().hex
+        writer = self.open_writer()
+        try:
+            writer.write(processed_data, embeddings)
+            return writer.commit(index)
+        except Exception:
+            writer.abort()
+            raise
+
+    def publish_segments(self, segments: Sequence[Segment]) -> IndexArtifacts:
+        """Atomically publish a snapshot made of existing segments.
+
+        Only a small manifest is written; segment files are referenced, not copied.
+
+        Args:
+            segments: Segments with their tombstones, in search order.
+
+        Returns:
+            Paths for the newly published snapshot.
+
+        Raises:
+            ValueError: If no segments are given.
+            Exception: If the manifest or pointer cannot be written.
+        """
+        if not segments:
+            raise ValueError("A snapshot needs at least one segment")
+
+        snapshot_id = _new_id()
         staging_path = self.snapshot_dir / f".{snapshot_id}.tmp"
         final_path = self.snapshot_dir / snapshot_id
+        items_count = sum(segment.live_count for segment in segments)
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "snapshot": snapshot_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "items_count": items_count,
+            "segments": [self._segment_entry(segment) for segment in segments],
+        }
 
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        staging_path.mkdir()
         try:
-            staging_path.mkdir()
-            processed_data_path = staging_path / "processed_data.json"
-            embeddings_path = staging_path / "embeddings.npy"
-            index_path = staging_path / "index.index"
-
-            with open(processed_data_path, "w", encoding="utf-8") as f:
-                json.dump(processed_data, f, ensure_ascii=False, indent=2)
-            with open(embeddings_path, "wb") as f:
-                np.save(f, embeddings)
-            faiss.write_index(index, str(index_path))
-
-            manifest = {
-                "version": 1,
-                "snapshot": snapshot_id,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "items_count": len(processed_data),
-                "embedding_shape": list(embeddings.shape),
-            }
-            with open(staging_path / "manifest.json", "w", encoding="utf-8") as f:
+            with open(staging_path / MANIFEST_FILENAME, "w", encoding="utf-8") as f:
                 json.dump(manifest, f, ensure_ascii=False, indent=2)
-
             os.replace(staging_path, final_path)
-            self._replace_pointer(snapshot_id, len(processed_data))
-
-            return IndexArtifacts(
-                processed_data_path=str(final_path / "processed_data.json"),
-                embeddings_path=str(final_path / "embeddings.npy"),
-                index_path=str(final_path / "index.index"),
-                snapshot_id=snapshot_id,
-            )
+            self._replace_pointer(snapshot_id, items_count)
         except Exception:
-            if staging_path.exists():
-                shutil.rmtree(staging_path)
-            if final_path.exists() and not self._pointer_references(snapshot_id):
-                shutil.rmtree(final_path)
+            for path in (staging_path, final_path):
+                if path.exists() and not self._pointer_references(snapshot_id):
+                    shutil.rmtree(path)
             raise
 
+        self.collect_retired_segments()
+        return IndexArtifacts(
+            processed_data_path=segments[0].processed_data_path,
+            embeddings_path=segments[0].embeddings_path,
+            index_path=segments[0].index_path,
+            snapshot_id=snapshot_id,
+            segments=tuple(segments),
+        )
+
+    def remove_segments(self, segments: Iterable[Segment]) -> None:
+        """Delete segment directories that the current snapshot no longer references.
+
+        Only use this for segments that were never published; superseded
+        segments may still be open in other processes and must be retired.
+        Legacy artifacts at configured paths are never removed here.
+
+        Args:
+            segments: Segments to remove if unreferenced.
+        """
+        referenced = {segment.segment_id for segment in self.current_artifacts().segments}
+        for segment in segments:
+            if segment.directory and segment.segment_id not in referenced and os.path.isdir(segment.directory):
+                shutil.rmtree(segment.directory)
+
+    def retire_segments(self, segments: Iterable[Segment]) -> None:
+        """Mark superseded segments for deletion after the retention period.
+
+        Segments the current snapshot still references are left untouched.
+
+        Args:
+            segments: Segments dropped from the current snapshot.
+        """
+        referenced = {segment.segment_id for segment in self.current_artifacts().segments}
+        for segment in segments:
+            if segment.directory and segment.segment_id not in referenced and os.path.isdir(segment.directory):
+                marker = Path(segment.directory) / RETIRED_FILENAME
+                if not marker.exists():
+                    marker.write_text(datetime.now(timezone.utc).isoformat(), encoding="utf-8")
+
+    def collect_retired_segments(self, now: Optional[float] = None) -> int:
+        """Delete retired segments whose retention period has passed.
+
+        Args:
+            now: Current time in seconds since the epoch; defaults to ``time.time()``.
+
+        Returns:
+            Number of segment directories removed.
+        """
+        if not self.segment_dir.is_dir():
+            return 0
+        now = time.time() if now is None else now
+        referenced = {segment.segment_id for segment in self.current_artifacts().segments}
+        removed = 0
+        for path in self.segment_dir.iterdir():
+            marker = path / RETIRED_FILENAME
+            try:
+                retired_at = marker.stat().st_mtime
+            except OSError:
+                continue
+            if path.name in referenced:
+                marker.unlink(missing_ok=True)
+            elif now - retired_at >= self.segment_retention_seconds:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
     def clear(self) -> None:
-        """Remove all published snapshots, the pointer, and legacy artifacts."""
+        """Remove all published snapshots, segments, the pointer, and legacy artifacts."""
         if self.pointer_path.exists():
             os.remove(self.pointer_path)
-        if self.snapshot_dir.exists():
-            shutil.rmtree(self.snapshot_dir)
+        for path in (self.snapshot_dir, self.segment_dir):
+            if path.exists():
+                shutil.rmtree(path)
 
         for path in (
             self.legacy_artifacts.processed_data_path,
@@ -207,6 +704,74 @@ class IndexSnapshotStore:
             if os.path.exists(path):
                 os.remove(path)
 
+    def read_rescore_calibration(self, snapshot_id: Optional[str], key: str) -> Optional[int]:
+        """Return the ``rescore_factor`` calibrated for a snapshot, if recorded.
+
+        Args:
+            snapshot_id: Snapshot the factor was calibrated on; None for legacy artifacts.
+            key: Calibration settings the factor was measured with.
+
+        Returns:
+            The recorded factor, or None if the snapshot has none for ``key``.
+        """
+        if snapshot_id is None:
+            return None
+        path = self.snapshot_dir / snapshot_id / RESCORE_CALIBRATION_FILENAME
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                factor = json.load(f).get(key)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return None if factor is None else int(factor)
+
+    def record_rescore_calibration(self, snapshot_id: Optional[str], key: str, rescore_factor: int) -> None:
+        """Record the ``rescore_factor`` calibrated for a snapshot next to its manifest.
+
+        The manifest itself is never rewritten; the calibration lives in a
+        sidecar file of the snapshot directory, replaced atomically, so it is
+        dropped together with the snapshot.
+
+        Args:
+            snapshot_id: Snapshot the factor was calibrated on; None records nothing.
+            key: Calibration settings the factor was measured with.
+            rescore_factor: Calibrated factor.
+        """
+        snapshot_path = self.snapshot_dir / snapshot_id if snapshot_id is not None else None
+        if snapshot_path is None or not snapshot_path.is_dir():
+            return
+        path = snapshot_path / RESCORE_CALIBRATION_FILENAME
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                calibrations = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            calibrations = {}
+        calibrations[key] = int(rescore_factor)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(calibrations, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def _segment_entry(self, segment: Segment) -> Dict[str, Any]:
+        """Return the manifest entry for a segment stored under the data directory."""
+        if segment.directory is None:
+            raise ValueError(f"Segment {segment.segment_id} has no directory and cannot be referenced")
+        return {
+            "id": segment.segment_id,
+            "path": os.path.relpath(segment.directory, self.data_dir),
+            "items_count": segment.items_count,
+            "deleted": list(segment.deleted),
+            "index": segment.index_spec,
+        }
+
+    @staticmethod
+    def _read_manifest(path: Path) -> Dict[str, Any]:
+        """Read a snapshot or segment manifest, or return an empty dict if it is missing."""
+        manifest_path = path / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            return {}
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
     def _replace_pointer(self, snapshot_id: str, items_count: int) -> None:
         """Atomically replace the current snapshot pointer."""
         self.data_dir.mkdir(parents=True, exist_ok=True)
@@ -231,6 +796,13 @@ class IndexSnapshotStore:
         except Exception:
             return False
 
+    def _segment_referenced(self, segment_id: str) -> bool:
+        """Return whether the current snapshot references a segment."""
+        try:
+            return any(segment.segment_id == segment_id for segment in self.current_artifacts().segments)
+        except Exception:
+            return False
+
     @staticmethod
     def _validate_snapshot(
         processed_data: List[Dict[str, Any]],
@@ -246,3 +818,161 @@ class IndexSnapshotStore:
             )
         if index.ntotal != len(processed_data):
             raise ValueError(f"FAISS index size ({index.ntotal}) must match processed data count ({len(processed_data)})")
+
+
+class SegmentWriter:
+    """Write one immutable segment incrementally.
+
+    Records and embeddings are appended to files in a staging directory, so
+    peak memory depends on the batch size rather than the segment size.
+    Records go to a columnar chunk store (see ``ChunkStore``); only the small
+    per-column index arrays are held until the segment is finished. Vectors
+    are staged as float32 and converted to the store's embedding dtype when
+    the segment is finished.
+    """
+
+    def __init__(self, store: IndexSnapshotStore) -> None:
+        self.store = store
+        self.segment_id = _new_id()
+        self.staging_path = store.segment_dir / f".{self.segment_id}.tmp"
+        self.final_path = store.segment_dir / self.segment_id
+        self.items_count = 0
+        self.embedding_dim: Optional[int] = None
+        self.embedding_dtype = store.embedding_dtype
+
+        store.segment_dir.mkdir(parents=True, exist_ok=True)
+        self.staging_path.mkdir()
+        self._chunks = ChunkStoreWriter(self.staging_path / CHUNKS_DIRNAME)
+        self._vectors_path = self.staging_path / "embeddings.f32"
+        self._vectors_file = open(self._vectors_path, "wb")
+
+    def write(self, records: List[Dict[str, Any]], embeddings: np.ndarray) -> None:
+        """Append a batch of records and their embeddings.
+
+        Args:
+            records: Processed text records.
+            embeddings: Embedding matrix row-aligned with ``records``.
+
+        Raises:
+            ValueError: If the batch shape is invalid or inconsistent with earlier batches.
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if not records and embeddings.size == 0:
+            return
+        if embeddings.ndim != 2:
+            raise ValueError("Embeddings must be a 2D array")
+        if len(records) != embeddings.shape[0]:
+            raise ValueError(
+                f"Processed data count ({len(records)}) must match embeddings count ({embeddings.shape[0]})"
+            )
+        if self.embedding_dim is None:
+            self.embedding_dim = int(embeddings.shape[1])
+        elif embeddings.shape[1] != self.embedding_dim:
+            raise ValueError(f"Embedding dim {embeddings.shape[1]} does not match snapshot dim {self.embedding_dim}")
+
+        self._chunks.write(records)
+        self.items_count = self._chunks.count
+        self._vectors_file.write(embeddings.tobytes())
+
+    def staged_embeddings(self) -> np.ndarray:
+        """Return a read-only memory map of the vectors written so far.
+
+        Lets callers build the index once every row is known, for example to
+        choose the index family for the final size and train it on a sample
+        of the whole segment.
+
+        Returns:
+            Float32 matrix of shape ``(items_count, embedding_dim)``.
+        """
+        self._vectors_file.flush()
+        if not self.items_count:
+            return np.empty((0, self.embedding_dim or 0), dtype=np.float32)
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(self.items_count, self.embedding_dim))
+
+    def finish(self, index: Any) -> Segment:
+        """Finish the staged files and move them into the final segment directory.
+
+        The segment is not visible to readers until a snapshot references it.
+
+        Args:
+            index: FAISS index built from all written embeddings.
+
+        Returns:
+            The finished segment.
+
+        Raises:
+            ValueError: If the index size does not match the written records.
+            Exception: If any segment file cannot be written.
+        """
+        if index.ntotal != self.items_count:
+            raise ValueError(f"FAISS index size ({index.ntotal}) must match processed data count ({self.items_count})")
+
+        self._chunks.close()
+        self._vectors_file.close()
+
+        embedding_shape = (self.items_count, self.embedding_dim if self.embedding_dim is not None else index.d)
+        write_embeddings(
+            str(self._vectors_path),
+            str(self.staging_path / "embeddings.npy"),
+            embedding_shape,
+            dtype=self.embedding_dtype,
+        )
+        os.remove(self._vectors_path)
+
+        faiss.write_index(index, str(self.staging_path / "index.index"))
+        index_spec = describe_index(index)
+
+        manifest = {
+            "version": SEGMENT_VERSION,
+            "segment": self.segment_id,
+            "data_format": "columnar",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "items_count": self.items_count,
+            "embedding_shape": list(embedding_shape),
+            "embedding_dtype": self.embedding_dtype,
+            "index": index_spec,
+        }
+        with open(self.staging_path / MANIFEST_FILENAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        os.replace(self.staging_path, self.final_path)
+        return Segment.in_directory(
+            self.segment_id,
+            self.final_path,
+            items_count=self.items_count,
+            index_spec=index_spec,
+        )
+
+    def abort(self) -> None:
+        """Discard the staged segment unless the current snapshot references it."""
+        self._chunks.abort()
+        if not self._vectors_file.closed:
+            self._vectors_file.close()
+        if self.staging_path.exists():
+            shutil.rmtree(self.staging_path)
+        if self.final_path.exists() and not self.store._segment_referenced(self.segment_id):
+            shutil.rmtree(self.final_path)
+
+
+class SnapshotWriter(SegmentWriter):
+    """Write a snapshot made of one new segment and publish it atomically.
+
+    The published snapshot replaces all current data. The resulting files have
+    the same format as snapshots written in one piece.
+    """
+
+    def commit(self, index: Any) -> IndexArtifacts:
+        """Finish the segment and atomically publish it as the only snapshot segment.
+
+        Args:
+            index: FAISS index built from all written embeddings.
+
+        Returns:
+            Paths for the newly published snapshot.
+
+        Raises:
+            ValueError: If the index size does not match the written records.
+            Exception: If any snapshot file cannot be written or published.
+        """
+        segment = self.finish(index)
+        return self.store.publish_segments([segment])
@@ -0,0 +1,111 @@
+import json
+from typing import Any, Iterator, List
+
+
+def is_json_array(path: str) -> bool:
+    """Return whether a JSON file contains a top-level array.
+
+    Args:
+        path: Path to the JSON file.
+
+    Returns:
+        True if the first non-whitespace character is ``[``.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            char = f.read(1)
+            if not char:
+                return False
+            if not char.isspace():
+                return char == '['
+
+
+def iter_json_array(path: str, read_size: int = 1 << 20) -> Iterator[Any]:
+    """Yield items of a top-level JSON array without loading the whole file.
+
+    Memory use is bounded by ``read_size`` plus the size of the largest item.
+
+    Args:
+        path: Path to a JSON file with a top-level array.
+        read_size: Number of characters read from disk at a time.
+
+    Returns:
+        An iterator over decoded array items.
+
+    Raises:
+        ValueError: If the file is not a JSON array or is malformed.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+        started = False
+
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+
+            if pos >= len(buffer) or (not eof and len(buffer) - pos < 2):
+                if eof:
+                    raise ValueError(f"Unexpected end of JSON array in {path}")
+                chunk = f.read(read_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            char = buffer[pos]
+            if not started:
+                if char != '[':
+                    raise ValueError(f"JSON file {path} does not contain a top-level array")
+                started = True
+                pos += 1
+                continue
+            if char == ']':
+                return
+            if char == ',':
+                pos += 1
+                continue
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"Malformed JSON array in {path}")
+                item, end = None, -1
+
+            # A scalar cut at the buffer edge (e.g. "2." of "2.5") decodes as a
+            # shorter value, so require a delimiter after the item before eof.
+            if end < 0 or (not eof and (end >= len(buffer) or buffer[end] not in ' \t\r\n,]')):
+                chunk = f.read(read_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            yield item
+            pos = end
+
+
+def iter_json_array_batches(path: str, batch_size: int) -> Iterator[List[Any]]:
+    """Yield items of a top-level JSON array in fixed-size lists.
+
+    Args:
+        path: Path to a JSON file with a top-level array.
+        batch_size: Maximum number of items per batch.
+
+    Returns:
+        An iterator over item batches.
+
+    Raises:
+        ValueError: If the file is not a JSON array or is malformed.
+    """
+    batch: List[Any] = []
+    for item in iter_json_array(path):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
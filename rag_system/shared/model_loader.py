@@ -1,5 +1,9 @@
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 
 def get_hf_cache_model_path(model_name: str) -> str:
@@ -40,3 +44,77 @@ def get_hf_cache_model_path(model_name: str) -> str:
 
     latest_snapshot = max(snapshots, key=_snapshot_file_count)
     return os.path.join(cache_dir, latest_snapshot)
+
+
+EMBEDDING_BACKENDS = ('torch', 'onnx', 'torch_int8')
+
+
+def load_sentence_transformer(
+    model_name_or_path: str,
+    device: str = 'cpu',
+    trust_remote_code: bool = False,
+    backend: str = 'torch',
+    onnx_file: Optional[str] = None,
+) -> "SentenceTransformer":
+    """Load a SentenceTransformer embedding model with the requested inference backend.
+
+    Args:
+        model_name_or_path: Local model path or Hugging Face model name.
+        device: Device for the model.
+        trust_remote_code: Whether to trust remote model code.
+        backend: ``torch`` (fp32), ``onnx`` (ONNX Runtime, exported on first
+            load if the model has no ONNX file) or ``torch_int8`` (PyTorch
+            with dynamic int8 quantization of linear layers, CPU only).
+        onnx_file: Optional ONNX file inside the model directory, e.g. a
+            pre-quantized ``onnx/model_qint8_avx512_vnni.onnx``.
+
+    Returns:
+        A SentenceTransformer embedding model.
+
+    Raises:
+        ValueError: If the backend is unknown or does not support the device.
+        ImportError: If the ONNX backend is requested without ``optimum`` and ``onnxruntime``.
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}")
+
+    # Imported here: rag_system.shared is also loaded by OCR worker processes,
+    # which should not pay for importing torch and transformers.
+    from sentence_transformers import SentenceTransformer
+
+    if backend == 'onnx':
+        return SentenceTransformer(
+            model_name_or_path,
+            device=device,
+            trust_remote_code=trust_remote_code,
+            backend='onnx',
+            model_kwargs={'file_name': onnx_file} if onnx_file else None,
+        )
+
+    model = SentenceTransformer(model_name_or_path, device=device, trust_remote_code=trust_remote_code)
+    if backend == 'torch_int8':
+        if not str(device).startswith('cpu'):
+            raise ValueError(f"Embedding backend 'torch_int8' requires a CPU device, got '{device}'")
+        import torch
+
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def embedding_model_id(model_name: str, backend: str = 'torch', onnx_file: Optional[str] = None) -> str:
+    """Return an identity for the vectors produced by a model and backend.
+
+    Quantized and exported backends produce slightly different vectors, so
+    they must not share embedding cache entries with the fp32 model.
+
+    Args:
+        model_name: Embedding model name.
+        backend: Inference backend.
+        onnx_file: Optional ONNX file inside the model directory.
+
+    Returns:
+        The model name for the default backend, otherwise the name with the backend appended.
+    """
+    if backend == 'torch':
+        return model_name
+    return f"{model_name}@{backend}" + (f":{onnx_file}" if onnx_file else "")
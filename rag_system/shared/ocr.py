@@ -1,11 +1,84 @@
+import math
+import multiprocessing
+import os
+import subprocess
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging import Logger
 from pathlib import Path
-from typing import Any, Generator, List, Union
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, Generator, Iterator, List, Optional, Tuple, Union
 
 import pytesseract
 from PIL import Image
 from pdf2image import convert_from_path
+from pdf2image import pdfinfo_from_path
 
 from rag_system.shared.logs import setup_logging
+from rag_system.shared.ocr_cache import OcrCache
+
+# Function, its arguments, and the OCR cache key of each page it returns.
+OcrTask = Tuple[Callable[..., List[str]], tuple, Optional[List[str]]]
+# Either page texts that are already known or an OCR task for the worker pool.
+OcrUnit = Union[List[str], OcrTask]
+
+
+def rotate_by_osd(img: Image.Image, logger: Optional[Logger] = None) -> Image.Image:
+    """Rotate an image according to Tesseract orientation detection.
+
+    Args:
+        img: PIL image to inspect and rotate.
+        logger: Optional logger for orientation detection failures.
+
+    Returns:
+        The rotated image, or the original image if orientation detection fails.
+    """
+    try:
+        osd = pytesseract.image_to_osd(img, output_type='dict')
+        angle = osd['orientation']
+        return img.rotate(angle)
+    except Exception as e:
+        if logger is not None:
+            logger.info(f"Error determining orientation: {e}")
+        return img
+
+
+def recognize_image(img: Image.Image, lang: str, logger: Optional[Logger] = None) -> str:
+    """Rotate one image upright and recognize its text.
+
+    Args:
+        img: PIL image to process.
+        lang: Tesseract language string.
+        logger: Optional logger for orientation detection failures.
+
+    Returns:
+        Text recognized by Tesseract.
+    """
+    img = rotate_by_osd(img, logger)
+    text: str = pytesseract.image_to_string(image=img, lang=lang)
+    return text
+
+
+def _init_ocr_worker() -> None:
+    """Limit Tesseract to one thread per worker so parallel pages do not oversubscribe cores."""
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+
+def _ocr_pdf_window(path: str, first_page: int, last_page: int, dpi: int, lang: str) -> List[str]:
+    """Rasterize and recognize a window of PDF pages in a pool worker process."""
+    texts = []
+    for img in convert_from_path(path, dpi=dpi, first_page=first_page, last_page=last_page):
+        texts.append(recognize_image(img, lang))
+        img.close()
+    return texts
+
+
+def _ocr_image_file(path: str, lang: str) -> List[str]:
+    """Recognize one image file in a pool worker process."""
+    with Image.open(path) as img:
+        return [recognize_image(img, lang)]
 
 
 class OCR:
@@ -16,6 +89,17 @@ class OCR:
         self.logger = setup_logging(self.logs_dir, 'OCRsystem')
         self.image_types: tuple = config.image_types
         self.doc_types: tuple = config.doc_types
+        self.ocr_lang: str = str(getattr(config, 'ocr_lang', 'rus+eng'))
+        self.ocr_dpi: int = int(getattr(config, 'ocr_dpi', 150))
+        self.ocr_workers: int = int(getattr(config, 'ocr_workers', 0) or 0) or (os.cpu_count() or 1)
+        self.ocr_page_window: int = max(1, int(getattr(config, 'ocr_page_window', 4)))
+        self.pdf_text_layer: bool = bool(getattr(config, 'pdf_text_layer', True))
+        self.pdf_text_min_chars: int = int(getattr(config, 'pdf_text_min_chars', 20))
+        self.page_stats: Dict[str, int] = {'text_layer': 0, 'ocr_cache': 0, 'ocr': 0}
+        self.cache: Optional[OcrCache] = OcrCache.from_config(config)
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = Lock()
 
     def rotate_image(self, img: Image.Image) -> Image.Image:
         """Rotate an image according to OCR orientation metadata.
@@ -26,13 +110,7 @@ class OCR:
         Returns:
             The rotated image, or the original image if orientation detection fails.
         """
-        try:
-            osd = pytesseract.image_to_osd(img, output_type='dict')
-            angle = osd['orientation']
-            return img.rotate(angle)
-        except Exception as e:
-            self.logger.info(f"Error determining orientation: {e}")
-            return img
+        return rotate_by_osd(img, self.logger)
 
     def get_text_from_image(self, img: Image.Image) -> str:
         """Extract Russian and English text from one image.
@@ -43,27 +121,60 @@ class OCR:
         Returns:
             Text recognized by Tesseract.
         """
-        img = self.rotate_image(img)
-        text: str = pytesseract.image_to_string(image=img, lang='rus+eng')
-        return text
+        return recognize_image(img, self.ocr_lang, self.logger)
+
+    def count_pdf_pages(self, path: Union[str, Path]) -> int:
+        """Return the number of pages in a PDF without rasterizing it.
+
+        Args:
+            path: PDF file path.
+
+        Returns:
+            Page count.
+
+        Raises:
+            Exception: If Poppler cannot read the PDF.
+        """
+        return int(pdfinfo_from_path(str(path))['Pages'])
+
+    def iter_pdf_windows(self, path: Union[str, Path], window: int) -> Iterator[Tuple[int, int]]:
+        """Yield 1-based inclusive page ranges covering a PDF.
+
+        Args:
+            path: PDF file path.
+            window: Maximum number of pages per range.
+
+        Returns:
+            An iterator over ``(first_page, last_page)`` pairs.
+
+        Raises:
+            Exception: If Poppler cannot read the PDF.
+        """
+        page_count = self.count_pdf_pages(path)
+        self.logger.info(f"Found {page_count} pages in PDF")
+        for first_page in range(1, page_count + 1, window):
+            yield first_page, min(first_page + window - 1, page_count)
 
-    def load_pages(self, path: Union[str, Path], dpi: int = 150) -> Generator[Image.Image, None, None]:
+    def load_pages(self, path: Union[str, Path], dpi: Optional[int] = None) -> Generator[Image.Image, None, None]:
         """Yield images from a PDF, image file, or directory.
 
+        PDFs are rasterized ``ocr_page_window`` pages at a time, so only one
+        window of pages is held in memory.
+
         Args:
             path: File or directory path to process.
-            dpi: PDF rendering resolution.
+            dpi: PDF rendering resolution. Defaults to ``ocr_dpi``.
 
         Returns:
             A generator of PIL images ready for OCR.
         """
         path = Path(path)
+        dpi = dpi or self.ocr_dpi
 
         if path.suffix.lower() == '.pdf':
             try:
-                pages = convert_from_path(path, dpi=dpi)
-                self.logger.info(f"Found {len(pages)} pages in PDF")
-                yield from pages
+                for first_page, last_page in self.iter_pdf_windows(path, self.ocr_page_window):
+                    yield from convert_from_path(path, dpi=dpi, first_page=first_page, last_page=last_page)
             except Exception as e:
                 self.logger.error(f"Error processing PDF {path}: {e}")
                 return
@@ -71,10 +182,7 @@ class OCR:
         elif path.is_dir():
             for file in path.iterdir():
                 if file.suffix.lower() == '.pdf':
-                    try:
-                        yield from convert_from_path(file, dpi=dpi)
-                    except Exception as e:
-                        self.logger.error(f"Error processing PDF {file}: {e}")
+                    yield from self.load_pages(file, dpi)
                 elif file.suffix.lower() in self.image_types:
                     try:
                         yield Image.open(file)
@@ -87,6 +195,202 @@ class OCR:
             except Exception as e:
                 self.logger.error(f"Error opening image {path}: {e}")
 
+    def extract_text_layer(self, path: Union[str, Path], page_count: int) -> Optional[List[str]]:
+        """Read the embedded text layer of each PDF page with Poppler's ``pdftotext``.
+
+        Args:
+            path: PDF file path.
+            page_count: Number of pages in the PDF.
+
+        Returns:
+            Text per page (empty for pages without a text layer), or None if
+            the text layer could not be read.
+        """
+        try:
+            result = subprocess.run(
+                ['pdftotext', '-enc', 'UTF-8', str(path), '-'],
+                capture_output=True,
+                timeout=max(60, page_count),
+                check=True,
+            )
+        except Exception as e:
+            self.logger.info(f"Text layer unavailable for {path}, using OCR: {e}")
+            return None
+
+        # pdftotext ends every page with a form feed.
+        pages = result.stdout.decode('utf-8', errors='replace').split('\f')
+        if len(pages) < page_count:
+            self.logger.info(f"Text layer of {path} has {len(pages)} pages instead of {page_count}, using OCR")
+            return None
+        return pages[:page_count]
+
+    def has_usable_text(self, text: str) -> bool:
+        """Return whether a text layer page has enough text to skip OCR.
+
+        Args:
+            text: Extracted page text.
+
+        Returns:
+            True if the page has at least ``pdf_text_min_chars`` non-whitespace characters.
+        """
+        return len(''.join(text.split())) >= self.pdf_text_min_chars
+
+    def plan_tasks(self, path: Union[str, Path]) -> Iterator[OcrUnit]:
+        """Yield OCR work units for a PDF, image file, or directory in page order.
+
+        PDF pages with a usable text layer or an OCR cache entry are yielded
+        directly as text; the remaining pages are grouped into page windows
+        for OCR.
+
+        Args:
+            path: File or directory path to process.
+
+        Returns:
+            An iterator over ready page texts (lists of strings) and
+            ``(function, args, cache_keys)`` OCR tasks for the worker pool.
+        """
+        path = Path(path)
+
+        if path.suffix.lower() == '.pdf':
+            try:
+                page_count = self.count_pdf_pages(path)
+            except Exception as e:
+                self.logger.error(f"Error processing PDF {path}: {e}")
+                return
+            self.logger.info(f"Found {page_count} pages in PDF")
+
+            text_layer = self.extract_text_layer(path, page_count) if self.pdf_text_layer else None
+            if text_layer is None:
+                text_layer = [''] * page_count
+            known: List[Optional[str]] = [text if self.has_usable_text(text) else None for text in text_layer]
+            from_text_layer = sum(text is not None for text in known)
+
+            keys = self._page_cache_keys(path, [page for page in range(1, page_count + 1) if known[page - 1] is None])
+            cached = self.cache.get_many(keys.values()) if self.cache is not None and keys else {}
+            for page, key in keys.items():
+                if key in cached:
+                    known[page - 1] = cached[key]
+            ocr_pages = [page for page in range(1, page_count + 1) if known[page - 1] is None]
+
+            self.page_stats['text_layer'] += from_text_layer
+            self.page_stats['ocr_cache'] += len(cached)
+            self.page_stats['ocr'] += len(ocr_pages)
+            self.logger.info(
+                f"PDF {path.name}: {from_text_layer} pages from text layer, "
+                f"{len(cached)} from OCR cache, {len(ocr_pages)} need OCR"
+            )
+
+            # Small PDFs are split finer so every worker gets a share.
+            window = max(1, min(self.ocr_page_window, math.ceil(len(ocr_pages) / self.ocr_workers)))
+            page = 1
+            while page <= page_count:
+                text = known[page - 1]
+                if text is not None:
+                    yield [text]
+                    page += 1
+                    continue
+                last_page = page
+                while last_page < page_count and last_page - page + 1 < window and known[last_page] is None:
+                    last_page += 1
+                window_keys = [keys[p] for p in range(page, last_page + 1)] if keys else None
+                yield _ocr_pdf_window, (str(path), page, last_page, self.ocr_dpi, self.ocr_lang), window_keys
+                page = last_page + 1
+
+        elif path.is_dir():
+            for file in path.iterdir():
+                if file.suffix.lower() == '.pdf' or file.suffix.lower() in self.image_types:
+                    yield from self.plan_tasks(file)
+
+        elif path.suffix.lower() in self.image_types:
+            keys = self._page_cache_keys(path, [1])
+            cached = self.cache.get_many(keys.values()) if self.cache is not None and keys else {}
+            if cached:
+                self.page_stats['ocr_cache'] += 1
+                yield list(cached.values())
+            else:
+                self.page_stats['ocr'] += 1
+                yield _ocr_image_file, (str(path), self.ocr_lang), list(keys.values()) or None
+
+    def _page_cache_keys(self, path: Path, pages: List[int]) -> Dict[int, str]:
+        """Return OCR cache keys for pages of a file, or an empty mapping without a cache."""
+        if self.cache is None or not pages:
+            return {}
+        try:
+            file_hash = self.cache.file_hash(path)
+        except OSError as e:
+            self.logger.warning(f"Could not hash {path} for the OCR cache: {e}")
+            return {}
+        return {page: self.cache.make_key(file_hash, page, self.ocr_lang, self.ocr_dpi) for page in pages}
+
+    def iter_ocr(self, path: Union[str, Path]) -> Iterator[str]:
+        """Yield text for each page or image found at a path, in order.
+
+        With more than one worker, page windows are rasterized and recognized
+        in a process pool. At most two windows per worker are in flight, which
+        bounds memory regardless of document length.
+
+        Args:
+            path: File or directory path to process.
+
+        Returns:
+            An iterator over page texts.
+        """
+        executor = self._get_executor() if self.ocr_workers > 1 else None
+        pending: Deque[Tuple[str, Union[List[str], Future], Optional[List[str]]]] = deque()
+        units = self.plan_tasks(path)
+        max_pending = max(1, self.ocr_workers * 2)
+
+        while True:
+            while len(pending) < max_pending:
+                unit = next(units, None)
+                if unit is None:
+                    break
+                if isinstance(unit, list):
+                    pending.append(('', unit, None))
+                    continue
+                func, args, keys = unit
+                label = f"{args[0]} pages {args[1]}-{args[2]}" if func is _ocr_pdf_window else str(args[0])
+                if executor is None:
+                    try:
+                        texts = func(*args)
+                    except Exception as e:
+                        self.logger.error(f"Error processing {label}: {e}")
+                        continue
+                    self._store_in_cache(keys, texts)
+                    pending.append((label, texts, None))
+                else:
+                    pending.append((label, executor.submit(func, *args), keys))
+            if not pending:
+                return
+
+            label, result, keys = pending.popleft()
+            if isinstance(result, list):
+                yield from result
+                continue
+            try:
+                texts = result.result()
+            except BrokenProcessPool:
+                # Drop the broken executor so the next call starts fresh workers.
+                self.close()
+                raise
+            except Exception as e:
+                self.logger.error(f"Error processing {label}: {e}")
+                continue
+            self._store_in_cache(keys, texts)
+            yield from texts
+
+    def _store_in_cache(self, keys: Optional[List[str]], texts: List[str]) -> None:
+        """Store recognized page texts under their OCR cache keys."""
+        if self.cache is None or not keys:
+            return
+        if len(keys) != len(texts):
+            self.logger.warning(f"OCR returned {len(texts)} pages for {len(keys)} cache keys, not caching")
+            return
+        try:
+            self.cache.put_many(dict(zip(keys, texts, strict=True)))
+        except Exception as e:
+            self.logger.warning(f"Failed to store OCR results in cache: {e}")
+
     def run_ocr(self, path: Union[str, Path]) -> List[str]:
         """Run OCR over all pages or images found at a path.
 
@@ -98,9 +402,8 @@ class OCR:
         """
         texts: List[str] = []
         try:
-            for i, page in enumerate(self.load_pages(path), 1):
-                self.logger.info(f"Processing page {i}")
-                text = self.get_text_from_image(page)
+            for i, text in enumerate(self.iter_ocr(path), 1):
+                self.logger.info(f"Processed page {i}")
                 texts.append(text)
         except Exception as e:
             self.logger.error(f"Error in run_ocr: {e}")
@@ -109,3 +412,22 @@ class OCR:
             self.logger.warning("No pages were processed")
 
         return texts
+
+    def close(self) -> None:
+        """Shut down the OCR worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the OCR process pool, starting it on first use."""
+        with self._lock:
+            if self._executor is None:
+                self.logger.info(f"Starting {self.ocr_workers} OCR workers")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.ocr_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_ocr_worker,
+                )
+            return self._executor
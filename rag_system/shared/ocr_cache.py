@@ -0,0 +1,117 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+from rag_system.shared.disk_cache import DiskCache
+from rag_system.shared.logs import setup_logging
+
+DEFAULT_OCR_CACHE_PATH = os.path.join('~', '.cache', 'rag_system', 'ocr_cache.sqlite3')
+
+
+class OcrCache:
+    """On-disk cache of recognized page texts.
+
+    Entries are keyed by the SHA-256 of the source file, the page number,
+    the Tesseract language and the rendering dpi, so re-uploading the same
+    scan skips rasterization and Tesseract for every page.
+    """
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        """Open the OCR cache.
+
+        Args:
+            path: Path to the SQLite cache file.
+            max_bytes: Maximum total size of stored texts.
+
+        Raises:
+            sqlite3.Error: If the cache file cannot be opened.
+        """
+        self.path = path
+        self.store = DiskCache(path, max_bytes=max_bytes)
+
+    @classmethod
+    def from_config(cls, config: Any) -> Optional["OcrCache"]:
+        """Create an OCR cache from a configuration object.
+
+        Args:
+            config: Configuration object with data and cache settings. An
+                empty ``ocr_cache_path`` uses ``DEFAULT_OCR_CACHE_PATH``,
+                outside the source tree.
+
+        Returns:
+            An OCR cache, or None if caching is disabled or the cache file
+            cannot be opened (for example on a read-only volume).
+        """
+        if not bool(getattr(config, 'ocr_cache_enabled', False)):
+            return None
+
+        logger = setup_logging(config.logs_dir, 'OcrCache')
+        path = os.path.expanduser(str(getattr(config, 'ocr_cache_path', '') or DEFAULT_OCR_CACHE_PATH))
+        max_bytes = int(float(getattr(config, 'ocr_cache_max_mb', 256)) * 1024 * 1024)
+        try:
+            cache = cls(path, max_bytes=max_bytes)
+            logger.info(f"OCR cache opened at {path} (limit {max_bytes // (1024 * 1024)} MB)")
+            return cache
+        except Exception as e:
+            logger.warning(f"OCR cache unavailable at {path}, continuing without it: {e}")
+            return None
+
+    @staticmethod
+    def file_hash(path: Union[str, Path]) -> str:
+        """Return the SHA-256 of a file's contents.
+
+        Args:
+            path: File to hash.
+
+        Returns:
+            Hexadecimal digest.
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(file_hash: str, page: int, lang: str, dpi: int) -> str:
+        """Build a cache key for one page.
+
+        Args:
+            file_hash: SHA-256 of the source file.
+            page: 1-based page number (1 for single images).
+            lang: Tesseract language string.
+            dpi: PDF rendering resolution.
+
+        Returns:
+            A fixed-length hexadecimal cache key.
+        """
+        key_input = f"{file_hash}\0{page}\0{lang}\0{dpi}"
+        return hashlib.sha256(key_input.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Return cached page texts for the given keys.
+
+        Args:
+            keys: Cache keys to look up.
+
+        Returns:
+            Mapping of found keys to page texts.
+        """
+        return {key: value.decode('utf-8') for key, value in self.store.get_many(keys).items()}
+
+    def put_many(self, texts: Dict[str, str]) -> None:
+        """Store page texts in the cache.
+
+        Args:
+            texts: Mapping of cache keys to page texts.
+        """
+        self.store.put_many({key: text.encode('utf-8') for key, text in texts.items()})
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache usage counters.
+
+        Returns:
+            Entry count, stored bytes, size limit, and hit/miss counters.
+        """
+        return self.store.stats()
@@ -1,57 +1,880 @@
+import bisect
+import fcntl
+import hashlib
+import json
 import logging
+import os
+import re
+import shutil
 import time
 import uuid
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from functools import cached_property
+from pathlib import Path
 from threading import Lock
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import faiss
+import numpy as np
+
+from rag_system.shared.chunk_store import ChunkStore, ChunkStoreWriter, is_chunk_store
 
 logger = logging.getLogger(__name__)
 
 SESSION_TTL = 3600  # seconds - sessions expire after 1 hour of inactivity
 MAX_SESSIONS = 100  # hard cap to prevent unbounded memory growth
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # memory budget of all temporary sessions
+TEMP_EMBEDDING_DTYPES = ("float32", "float16")
+TEMP_STORAGE_BACKENDS = ("memory", "disk")
+DEFAULT_STORAGE_DIR = "./data/temp_sessions"
+
+MANIFEST_FILENAME = "manifest.json"
+ACCESS_FILENAME = "last_access"
+EMBEDDINGS_FILENAME = "embeddings.npy"
+INDEX_FILENAME = "index.faiss"
+FILE_INFO_FILENAME = "file.json"
+LOCK_FILENAME = ".lock"
+_SAFE_NAME_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+
+def temp_data_signature(temp_data: Dict[str, Any]) -> str:
+    """Build a deterministic signature of one temporary file's chunks.
+
+    Args:
+        temp_data: Temporary chunks and embeddings payload.
+
+    Returns:
+        Hex SHA-256 digest over chunk sources and texts.
+    """
+    chunks = temp_data.get('chunks', [])
+    digest = hashlib.sha256()
+    digest.update(str(len(chunks)).encode('utf-8'))
+    for chunk in chunks:
+        if isinstance(chunk, dict):
+            source = str(chunk.get('source', ''))
+            text = str(chunk.get('text', ''))
+        else:
+            source = ''
+            text = str(chunk)
+        digest.update(source.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _temp_file_source(temp_data: Dict[str, Any]) -> Optional[str]:
+    """Return the source filename of a temporary file payload."""
+    chunks = temp_data.get('chunks')
+    if chunks and isinstance(chunks[0], dict):
+        return chunks[0].get('source')
+    return None
+
+
+def _temp_file_embeddings(temp_data: Dict[str, Any]) -> np.ndarray:
+    """Return a temporary file's embeddings as an L2-normalized float32 matrix.
+
+    Raises:
+        ValueError: If the embeddings are not a matrix with one row per chunk.
+    """
+    chunks = temp_data.get('chunks', []) if 'embeddings' in temp_data else []
+    if not len(chunks):
+        return np.empty((0, 0), dtype=np.float32)
+    matrix = np.array(temp_data['embeddings'], dtype=np.float32)
+    if matrix.ndim == 1 and len(chunks) == 1 and matrix.size:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2 or matrix.shape[0] != len(chunks):
+        raise ValueError(
+            f"Temporary chunks count ({len(chunks)}) does not match embeddings shape {matrix.shape}"
+        )
+    faiss.normalize_L2(matrix)
+    return matrix
+
+
+def _new_index(dim: int, embedding_dtype: str) -> Any:
+    """Create an empty inner-product index storing vectors in the given dtype."""
+    if embedding_dtype == "float16":
+        return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+    return faiss.IndexFlatIP(dim)
+
+
+@dataclass(frozen=True, eq=False)
+class TempFile:
+    """One processed temporary file in compact form.
+
+    Chunks live in a columnar ``ChunkStore`` and vectors in the file's own
+    FAISS index. A file is never modified, so every session that uploaded
+    the same content references one ``TempFile`` instead of a copy.
+
+    Attributes:
+        source: Source filename, or None if the chunks carry none.
+        chunks: Columnar chunk records.
+        signature: ``temp_data_signature`` of the file.
+        index: Inner-product index over the file's chunks, or None if the
+            file has no embeddings.
+        key: Content key the file is shared under, or None.
+    """
+
+    source: Optional[str]
+    chunks: ChunkStore
+    signature: str
+    index: Optional[Any] = None
+    key: Optional[str] = None
+
+    @classmethod
+    def from_payload(
+        cls,
+        temp_data: Dict[str, Any],
+        embeddings: Optional[np.ndarray] = None,
+        embedding_dtype: str = "float32",
+        key: Optional[str] = None,
+    ) -> "TempFile":
+        """Encode a ``process_file_temp`` payload.
+
+        Args:
+            temp_data: Temporary chunks and embeddings payload.
+            embeddings: Normalized embedding matrix of the file, if already converted.
+            embedding_dtype: Vector storage of the index, ``float32`` or ``float16``.
+            key: Content key to share the file under.
+
+        Returns:
+            The compact file.
+
+        Raises:
+            ValueError: If the embeddings do not match the chunks.
+        """
+        if embeddings is None:
+            embeddings = _temp_file_embeddings(temp_data)
+        index = None
+        if len(embeddings):
+            index = _new_index(embeddings.shape[1], embedding_dtype)
+            index.add(embeddings)
+        chunks = temp_data.get('chunks', [])
+        records = [chunk if isinstance(chunk, dict) else {'text': str(chunk)} for chunk in chunks]
+        return cls(
+            source=_temp_file_source(temp_data),
+            chunks=ChunkStore.from_records(records),
+            signature=temp_data_signature(temp_data),
+            index=index,
+            key=key,
+        )
+
+    @property
+    def rows(self) -> int:
+        """Number of indexed chunks."""
+        return 0 if self.index is None else int(self.index.ntotal)
+
+    @property
+    def index_nbytes(self) -> int:
+        """Memory taken by the file's vectors."""
+        return 0 if self.index is None else self.rows * int(self.index.code_size)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory taken by the file's vectors and chunks."""
+        return self.index_nbytes + self.chunks.nbytes
+
+    def payload(self) -> Dict[str, Any]:
+        """Decode the file's chunks into a payload dictionary without embeddings."""
+        return {'chunks': list(self.chunks.records())}
+
+
+class _SessionTexts(Sequence[str]):
+    """Sequence of chunk texts over all indexed files of a session, in index row order."""
+
+    def __init__(self, files: Sequence[TempFile]) -> None:
+        self._files = [temp_file for temp_file in files if temp_file.rows]
+        self._starts = list(np.cumsum([0] + [temp_file.rows for temp_file in self._files])[:-1])
+        self._length = sum(temp_file.rows for temp_file in self._files)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, row: Any) -> Any:
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        row = int(row)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("session chunk index out of range")
+        position = bisect.bisect_right(self._starts, row) - 1
+        return self._files[position].chunks.texts[row - int(self._starts[position])]
+
+    def __iter__(self) -> Iterator[str]:
+        for temp_file in self._files:
+            yield from temp_file.chunks.texts
+
+
+class _SessionSearcher:
+    """Search the indexes of a session's files like one index with rows in file order.
+
+    Every file index is searched exhaustively, so merging the per-file top-k
+    gives the same neighbors as a single index over all vectors.
+    """
+
+    def __init__(self, files: Sequence[TempFile]) -> None:
+        self._parts: List[Tuple[Any, int]] = []
+        start = 0
+        for temp_file in files:
+            if temp_file.rows:
+                self._parts.append((temp_file.index, start))
+                start += temp_file.rows
+        self.ntotal = start
+        self.d = int(self._parts[0][0].d)
+
+    def search(self, x: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the inner products and session rows of the ``k`` nearest chunks per query.
+
+        Missing neighbors are padded with row -1, as FAISS does.
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        if len(self._parts) == 1:
+            return self._parts[0][0].search(x, k)
+        scores, rows = [], []
+        for index, start in self._parts:
+            part_scores, part_rows = index.search(x, min(k, int(index.ntotal)))
+            scores.append(part_scores)
+            rows.append(np.where(part_rows >= 0, part_rows + start, -1))
+        all_scores, all_rows = np.hstack(scores), np.hstack(rows)
+        order = np.argsort(-all_scores, axis=1, kind='stable')[:, :k]
+        top_scores = np.take_along_axis(all_scores, order, axis=1)
+        top_rows = np.take_along_axis(all_rows, order, axis=1)
+        if top_rows.shape[1] < k:
+            pad = k - top_rows.shape[1]
+            top_scores = np.pad(top_scores, ((0, 0), (0, pad)), constant_values=np.finfo(np.float32).min)
+            top_rows = np.pad(top_rows, ((0, 0), (0, pad)), constant_values=-1)
+        return top_scores, top_rows
+
+
+@dataclass(frozen=True)
+class SessionIndex:
+    """Searchable state of a temporary session.
+
+    A session index is never modified after it is built: adding or removing
+    a file produces a new one that shares the unchanged files, so requests
+    that hold the previous index can keep searching it while the session
+    changes. Because of that, the merged search and text views are built on
+    first access and cached for the lifetime of the index.
+
+    Attributes:
+        files: Files of the session in upload order.
+        signature: Signature of the whole session, used to scope answer caches.
+    """
+
+    files: Tuple[TempFile, ...]
+    signature: str
+
+    @cached_property
+    def index(self) -> Optional[_SessionSearcher]:
+        """Inner-product search over all indexed chunks in file order, or None if there are none."""
+        return _SessionSearcher(self.files) if self.ntotal else None
+
+    @cached_property
+    def ntotal(self) -> int:
+        """Number of indexed chunks."""
+        return sum(temp_file.rows for temp_file in self.files)
+
+    @cached_property
+    def texts(self) -> Sequence[str]:
+        """Chunk texts; ``texts[i]`` belongs to row ``i`` of ``index``."""
+        return _SessionTexts(self.files)
+
+    @property
+    def index_nbytes(self) -> int:
+        """Memory taken by the vectors of the session's files."""
+        return sum(temp_file.index_nbytes for temp_file in self.files)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory taken by the session's files, counting shared files in full."""
+        return sum(temp_file.nbytes for temp_file in self.files)
+
+
+def _session_signature(files: Sequence[TempFile]) -> str:
+    """Combine per-file signatures into a session signature."""
+    digest = hashlib.sha256()
+    for temp_file in files:
+        digest.update(temp_file.signature.encode('ascii'))
+    return digest.hexdigest()
+
+
+def _with_file(session_index: Optional[SessionIndex], temp_file: TempFile) -> SessionIndex:
+    """Return a session index with a processed file appended.
+
+    Raises:
+        ValueError: If the file's embedding dimension differs from the session's.
+    """
+    files = session_index.files if session_index else ()
+    dims = {int(other.index.d) for other in files if other.index is not None}
+    if temp_file.index is not None and dims and int(temp_file.index.d) not in dims:
+        raise ValueError(
+            f"Temporary file embedding dimension {temp_file.index.d} != session dimension {dims.pop()}"
+        )
+    files = files + (temp_file,)
+    return SessionIndex(files=files, signature=_session_signature(files))
+
+
+def extend_session_index(
+    session_index: Optional[SessionIndex],
+    temp_data: Dict[str, Any],
+    embeddings: Optional[np.ndarray] = None,
+    embedding_dtype: str = "float32",
+) -> SessionIndex:
+    """Return a session index with one more file appended.
+
+    Only the new file's vectors are indexed; the other files are shared with
+    the previous session index.
+
+    Args:
+        session_index: Current session index, or None for a new session.
+        temp_data: Temporary chunks and embeddings payload of the added file.
+        embeddings: Normalized embedding matrix of the file, if already converted.
+        embedding_dtype: Vector storage of the file, ``float32`` or ``float16``.
+
+    Returns:
+        The extended session index.
+
+    Raises:
+        ValueError: If the embeddings do not match the chunks or the session dimension.
+    """
+    return _with_file(session_index, TempFile.from_payload(temp_data, embeddings, embedding_dtype))
+
+
+def build_session_index(temp_data_list: Sequence[Dict[str, Any]], embedding_dtype: str = "float32") -> SessionIndex:
+    """Build a session index from temporary file payloads.
+
+    Args:
+        temp_data_list: Temporary chunks and embeddings payloads, in file order.
+        embedding_dtype: Vector storage of the index, ``float32`` or ``float16``.
+
+    Returns:
+        The session index.
+    """
+    session_index: Optional[SessionIndex] = None
+    for temp_data in temp_data_list:
+        session_index = extend_session_index(session_index, temp_data, embedding_dtype=embedding_dtype)
+    return session_index or SessionIndex((), _session_signature(()))
+
+
+def _unique_files(sessions: Sequence[SessionIndex]) -> List[TempFile]:
+    """Return the distinct files of several sessions."""
+    return list({id(temp_file): temp_file for session_index in sessions for temp_file in session_index.files}.values())
+
+
+def _without_files(session_index: SessionIndex, files_kept: Sequence[bool]) -> SessionIndex:
+    """Return a session index without the files that are not kept."""
+    files = tuple(temp_file for temp_file, kept in zip(session_index.files, files_kept, strict=True) if kept)
+    return SessionIndex(files=files, signature=_session_signature(files))
+
+
+class DiskSessionStore:
+    """Temporary sessions kept on a directory shared by query workers.
+
+    Processed files live once under ``files/<key>``, as a chunk store, the
+    file's FAISS index and a ``file.json`` with its source and signature.
+    Chunks and the index are opened memory-mapped, so workers on one host
+    share the page cache instead of copying vectors into their own indexes.
+    Every session is a directory under ``sessions`` whose ``manifest.json``
+    lists the keys of its files, so sessions that uploaded the same content
+    reference one copy, and a file is deleted once no manifest references it.
+
+    A file is written before the manifest that references it and manifests
+    are replaced atomically, so workers in other processes or hosts see
+    either the old or the new session. Writers serialize on a lock file in
+    the root directory. The modification time of a session's
+    ``last_access`` file implements ``SESSION_TTL`` across workers.
+    """
+
+    def __init__(self, root: Union[str, Path], ttl: float = SESSION_TTL) -> None:
+        """Initialize the store.
+
+        Args:
+            root: Shared directory holding the sessions, created if missing.
+            ttl: Seconds without access after which a session expires.
+        """
+        self.root = Path(root)
+        self.sessions_dir = self.root / "sessions"
+        self.files_dir = self.root / "files"
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the store-wide write lock, across threads and processes."""
+        with open(self.root / LOCK_FILENAME, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def session_dir(self, session_id: str) -> Path:
+        """Return the directory of a session.
+
+        Args:
+            session_id: Session identifier.
+
+        Returns:
+            The directory, which may not exist.
+
+        Raises:
+            ValueError: If the session id is not safe to use as a directory name.
+        """
+        if not _SAFE_NAME_PATTERN.fullmatch(session_id):
+            raise ValueError(f"Invalid temporary session id '{session_id}'")
+        return self.sessions_dir / session_id
+
+    def _file_dir(self, key: str) -> Path:
+        """Return the directory of a processed file.
+
+        Raises:
+            ValueError: If the key is not safe to use as a directory name.
+        """
+        if not _SAFE_NAME_PATTERN.fullmatch(key):
+            raise ValueError(f"Invalid temporary file key '{key}'")
+        return self.files_dir / key
+
+    def _expired(self, session_dir: Path) -> bool:
+        """Return whether a session directory has not been accessed within the TTL."""
+        try:
+            return time.time() - os.stat(session_dir / ACCESS_FILENAME).st_mtime > self.ttl
+        except FileNotFoundError:
+            return True
+
+    def read_manifest(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Read the manifest of a live session.
+
+        Args:
+            session_id: Session identifier.
+
+        Returns:
+            The manifest, or None if the session does not exist or expired.
+        """
+        try:
+            session_dir = self.session_dir(session_id)
+            with open(session_dir / MANIFEST_FILENAME, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (ValueError, FileNotFoundError):
+            return None
+        return None if self._expired(session_dir) else manifest
+
+    def touch(self, session_id: str) -> None:
+        """Mark a session as accessed now."""
+        try:
+            os.utime(self.session_dir(session_id) / ACCESS_FILENAME)
+        except (ValueError, FileNotFoundError):
+            pass
+
+    def last_accessed(self, session_id: str) -> float:
+        """Return the wall-clock time a session was last accessed, or 0 if unknown."""
+        try:
+            return os.stat(self.session_dir(session_id) / ACCESS_FILENAME).st_mtime
+        except (ValueError, FileNotFoundError):
+            return 0.0
+
+    def write_file(self, temp_file: TempFile) -> Dict[str, Any]:
+        """Write a processed file under its key unless it is already stored.
+
+        Call with the lock held. The file is written to a temporary directory
+        and renamed into place, so an interrupted write leaves no entry.
+
+        Args:
+            temp_file: File with a key.
+
+        Returns:
+            The manifest entry of the file.
+        """
+        file_dir = self._file_dir(temp_file.key)
+        if not is_chunk_store(file_dir):
+            tmp_dir = self.files_dir / f".{temp_file.key}.{uuid.uuid4().hex}.tmp"
+            writer = ChunkStoreWriter(tmp_dir)
+            try:
+                writer.write(temp_file.chunks.records())
+                writer.close()
+                if temp_file.rows:
+                    faiss.write_index(temp_file.index, str(tmp_dir / INDEX_FILENAME))
+                with open(tmp_dir / FILE_INFO_FILENAME, "w", encoding="utf-8") as f:
+                    json.dump({"source": temp_file.source, "signature": temp_file.signature}, f, ensure_ascii=False)
+                shutil.rmtree(file_dir, ignore_errors=True)
+                os.replace(tmp_dir, file_dir)
+            except Exception:
+                writer.abort()
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+        return {"key": temp_file.key, "source": temp_file.source}
+
+    def load_file(self, key: str) -> TempFile:
+        """Open a stored file with its chunks and index memory-mapped.
+
+        The mapped index is read-only, which is safe because a ``TempFile``
+        is never modified. Files written as an ``embeddings.npy`` matrix by
+        older versions are indexed in memory.
+
+        Args:
+            key: Key of the file.
+
+        Returns:
+            The file.
+
+        Raises:
+            FileNotFoundError: If the file is not stored, e.g. because it was
+                collected after the manifest that referenced it was read.
+        """
+        file_dir = self._file_dir(key)
+        with open(file_dir / FILE_INFO_FILENAME, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        chunks = ChunkStore.open(file_dir, mmap=True)
+        index = None
+        if (file_dir / INDEX_FILENAME).exists():
+            flags = faiss.IO_FLAG_READ_ONLY | getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP)
+            index = faiss.read_index(str(file_dir / INDEX_FILENAME), flags)
+        elif (file_dir / EMBEDDINGS_FILENAME).exists():
+            embeddings = np.load(file_dir / EMBEDDINGS_FILENAME, mmap_mode='r')
+            index = _new_index(embeddings.shape[1], str(embeddings.dtype))
+            index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+        return TempFile(source=info["source"], chunks=chunks, signature=info["signature"], index=index, key=key)
+
+    def write_manifest(self, session_id: str, manifest: Dict[str, Any]) -> None:
+        """Atomically replace the manifest of a session and mark it as accessed."""
+        session_dir = self.session_dir(session_id)
+        session_dir.mkdir(parents=True, exist_ok=True)
+        (session_dir / ACCESS_FILENAME).touch()
+        tmp_path = session_dir / f"{MANIFEST_FILENAME}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, session_dir / MANIFEST_FILENAME)
+
+    def remove_session(self, session_id: str) -> bool:
+        """Delete a session directory; call with the lock held and collect files afterwards.
+
+        Returns:
+            True if the session existed.
+        """
+        try:
+            session_dir = self.session_dir(session_id)
+        except ValueError:
+            return False
+        existed = (session_dir / MANIFEST_FILENAME).exists() and not self._expired(session_dir)
+        shutil.rmtree(session_dir, ignore_errors=True)
+        return existed
+
+    def session_ids(self) -> List[str]:
+        """Return the identifiers of all live sessions."""
+        return [
+            path.name for path in self.sessions_dir.iterdir()
+            if (path / MANIFEST_FILENAME).exists() and not self._expired(path)
+        ]
+
+    def collect_files(self) -> None:
+        """Delete files no session manifest references; call with the lock held."""
+        referenced = set()
+        for path in self.sessions_dir.iterdir():
+            try:
+                with open(path / MANIFEST_FILENAME, "r", encoding="utf-8") as f:
+                    referenced.update(entry["key"] for entry in json.load(f)["files"])
+            except FileNotFoundError:
+                continue
+        for path in self.files_dir.iterdir():
+            if path.name not in referenced:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def evict_expired(self) -> None:
+        """Delete expired sessions and leftovers of interrupted writes; call with the lock held."""
+        for path in self.sessions_dir.iterdir():
+            if self._expired(path):
+                shutil.rmtree(path, ignore_errors=True)
+                logger.info(f"Evicted expired session {path.name}")
+        self.collect_files()
+
+    def clear(self) -> None:
+        """Delete all sessions and files; call with the lock held."""
+        for directory in (self.sessions_dir, self.files_dir):
+            for path in directory.iterdir():
+                shutil.rmtree(path, ignore_errors=True)
 
 
 class TempIndexManager:
-    """Manage temporary in-memory indexes with TTL-based eviction."""
+    """Manage temporary session indexes with TTL and memory-budget eviction.
+
+    Every session keeps a ready ``SessionIndex`` that is updated when files
+    are added or removed, so questions only pay for the search. Chunks are
+    stored as columnar chunk stores and vectors only in per-file FAISS
+    indexes, as float32 or float16. When the sessions together exceed
+    ``max_bytes``, the least recently used ones are evicted.
 
-    def __init__(self) -> None:
-        self.temp_indexes: Dict[str, List[Dict[str, Any]]] = {}
+    Files uploaded with a content key are shared: ``get_processed_file``
+    returns the file another session already holds, so uploading the same
+    content again skips processing and adds no memory. The registry holds
+    files weakly, so a file is released when the last session (or request)
+    referencing it drops it.
+
+    With the ``disk`` backend the sessions live in a ``DiskSessionStore``
+    shared by all workers, and the in-memory indexes are only a per-worker
+    read cache: it is checked against the session manifest on every access,
+    and evicting from it does not lose the session.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        embedding_dtype: str = "float32",
+        store: Optional[DiskSessionStore] = None,
+    ) -> None:
+        self._sessions: Dict[str, SessionIndex] = {}
         self._last_accessed: Dict[str, float] = {}
+        self._revisions: Dict[str, str] = {}
+        self._files: "weakref.WeakValueDictionary[str, TempFile]" = weakref.WeakValueDictionary()
         self._lock = Lock()
+        self.max_bytes: int = DEFAULT_MAX_BYTES
+        self.embedding_dtype: str = "float32"
+        self.store: Optional[DiskSessionStore] = store
+        self.configure(max_bytes, embedding_dtype)
+
+    def configure(
+        self,
+        max_bytes: Optional[int] = None,
+        embedding_dtype: Optional[str] = None,
+        backend: Optional[str] = None,
+        storage_dir: Optional[Union[str, Path]] = None,
+    ) -> None:
+        """Set the memory budget, vector storage and session backend.
+
+        Args:
+            max_bytes: Memory budget of all sessions in bytes; 0 disables it.
+                With the ``disk`` backend it bounds the per-worker cache.
+            embedding_dtype: ``float32`` or ``float16`` vector storage for
+                sessions created from now on.
+            backend: ``memory`` to keep sessions in this process or ``disk``
+                to share them through ``storage_dir``. Changing the backend
+                drops the sessions held in memory.
+            storage_dir: Shared session directory of the ``disk`` backend.
+
+        Raises:
+            ValueError: If the dtype or backend is not supported.
+        """
+        if embedding_dtype is not None:
+            embedding_dtype = str(embedding_dtype).strip().lower()
+            if embedding_dtype not in TEMP_EMBEDDING_DTYPES:
+                raise ValueError(
+                    f"Unsupported temporary embedding dtype '{embedding_dtype}', expected one of {TEMP_EMBEDDING_DTYPES}"
+                )
+        if backend is not None:
+            backend = str(backend).strip().lower()
+            if backend not in TEMP_STORAGE_BACKENDS:
+                raise ValueError(
+                    f"Unsupported temporary storage backend '{backend}', expected one of {TEMP_STORAGE_BACKENDS}"
+                )
+        store = DiskSessionStore(storage_dir or DEFAULT_STORAGE_DIR) if backend == "disk" else None
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max(0, int(max_bytes))
+            if embedding_dtype is not None:
+                self.embedding_dtype = embedding_dtype
+            if backend is not None:
+                self.store = store
+                self._sessions.clear()
+                self._last_accessed.clear()
+                self._revisions.clear()
+
+    def configure_from(self, config: Any) -> None:
+        """Apply the ``temp_storage_*`` and ``temp_embedding_dtype`` settings of a configuration object."""
+        max_mb = float(getattr(config, 'temp_storage_max_mb', DEFAULT_MAX_BYTES / (1024 * 1024)))
+        self.configure(
+            int(max_mb * 1024 * 1024),
+            getattr(config, 'temp_embedding_dtype', 'float32'),
+            getattr(config, 'temp_storage_backend', 'memory'),
+            getattr(config, 'temp_storage_dir', DEFAULT_STORAGE_DIR),
+        )
+
+    def _drop_session(self, session_id: str) -> None:
+        """Forget a session while the lock is held."""
+        self._sessions.pop(session_id, None)
+        self._last_accessed.pop(session_id, None)
+        self._revisions.pop(session_id, None)
+
+    def _used_bytes(self) -> int:
+        """Return the memory taken by all sessions while the lock is held, counting shared files once."""
+        return sum(temp_file.nbytes for temp_file in _unique_files(self._sessions.values()))
 
     def _evict_expired(self) -> None:
         """Remove expired sessions while the lock is held."""
         now = time.monotonic()
         expired = [sid for sid, ts in self._last_accessed.items() if now - ts > SESSION_TTL]
         for sid in expired:
-            self.temp_indexes.pop(sid, None)
-            self._last_accessed.pop(sid, None)
+            self._drop_session(sid)
             logger.info(f"Evicted expired session {sid}")
 
-    def _evict_oldest(self) -> None:
-        """Remove the least recently used session while the lock is held."""
-        if not self._last_accessed:
-            return
-        oldest = min(self._last_accessed, key=lambda k: self._last_accessed[k])
-        self.temp_indexes.pop(oldest, None)
-        self._last_accessed.pop(oldest, None)
-        logger.info(f"Evicted oldest session {oldest} (MAX_SESSIONS={MAX_SESSIONS} reached)")
+    def _evict_oldest(self, keep: Optional[str] = None) -> bool:
+        """Remove the least recently used session other than ``keep`` while the lock is held.
+
+        Returns:
+            True if a session was evicted.
+        """
+        candidates = [sid for sid in self._last_accessed if sid != keep]
+        if not candidates:
+            return False
+        oldest = min(candidates, key=lambda k: self._last_accessed[k])
+        self._drop_session(oldest)
+        logger.info(f"Evicted least recently used session {oldest}")
+        return True
+
+    def _check_budget(self, session_index: SessionIndex) -> None:
+        """Reject a session that alone exceeds the memory budget.
+
+        Raises:
+            ValueError: If the session is larger than ``max_bytes``.
+        """
+        if self.max_bytes and session_index.nbytes > self.max_bytes:
+            raise ValueError(
+                f"Temporary session would take {session_index.nbytes} bytes, "
+                f"more than the {self.max_bytes} byte budget"
+            )
+
+    def _cache(self, session_id: str, session_index: SessionIndex, revision: str = "") -> None:
+        """Keep a session index in memory, evicting least recently used ones, while the lock is held."""
+        self._evict_expired()
+        if session_id not in self._sessions and len(self._sessions) >= MAX_SESSIONS:
+            self._evict_oldest()
+        self._sessions[session_id] = session_index
+        self._last_accessed[session_id] = time.monotonic()
+        self._revisions[session_id] = revision
+        while self.max_bytes and self._used_bytes() > self.max_bytes and self._evict_oldest(keep=session_id):
+            pass
+
+    def _stored_session_index(self, session_id: str, manifest: Dict[str, Any]) -> SessionIndex:
+        """Return the cached index of a stored session, loading it if the manifest changed."""
+        with self._lock:
+            cached = self._sessions.get(session_id)
+            if cached is not None and self._revisions.get(session_id) == manifest["revision"]:
+                self._last_accessed[session_id] = time.monotonic()
+                return cached
+        files = tuple(self._stored_file(entry["key"]) for entry in manifest["files"])
+        session_index = SessionIndex(files=files, signature=_session_signature(files))
+        if not self.max_bytes or session_index.nbytes <= self.max_bytes:
+            with self._lock:
+                self._cache(session_id, session_index, manifest["revision"])
+        return session_index
+
+    def _stored_file(self, key: str) -> TempFile:
+        """Return a file of the shared store, opening it only if no session of this worker holds it.
+
+        Raises:
+            FileNotFoundError: If the file is not stored.
+        """
+        with self._lock:
+            temp_file = self._files.get(key)
+        if temp_file is None:
+            temp_file = self.store.load_file(key)
+            with self._lock:
+                temp_file = self._files.setdefault(key, temp_file)
+        return temp_file
+
+    def get_processed_file(self, key: str) -> Optional[TempFile]:
+        """Return an already processed file with the given content key.
 
-    def add_temp_index(self, session_id: str, temp_data: Dict[str, Any]) -> None:
+        Args:
+            key: Content key, see ``rag_system.query.combined.temp_file_key``.
+
+        Returns:
+            The shared file if a session in this worker, or with the ``disk``
+            backend in any worker, holds it, otherwise None.
+        """
+        with self._lock:
+            temp_file = self._files.get(key)
+        if temp_file is not None or self.store is None:
+            return temp_file
+        try:
+            return self._stored_file(key)
+        except (ValueError, FileNotFoundError):
+            return None
+
+    def add_temp_index(self, session_id: str, temp_data: Dict[str, Any], key: Optional[str] = None) -> TempFile:
         """Add temporary indexed data to a session.
 
+        Least recently used sessions are evicted while the session count or
+        the memory budget is exceeded.
+
         Args:
             session_id: Session identifier.
             temp_data: Temporary chunks and embeddings payload.
+            key: Content key to share the processed file under.
+
+        Returns:
+            The added file.
+
+        Raises:
+            ValueError: If the embeddings do not match the chunks or the
+                dimension of the session's other files, if the session
+                alone would exceed the memory budget, or if the session id
+                cannot be stored by the ``disk`` backend.
         """
-        with self._lock:
-            self._evict_expired()
-            if session_id not in self.temp_indexes and len(self.temp_indexes) >= MAX_SESSIONS:
-                self._evict_oldest()
-            if session_id not in self.temp_indexes:
-                self.temp_indexes[session_id] = []
-            self.temp_indexes[session_id].append(temp_data)
-            self._last_accessed[session_id] = time.monotonic()
-        logger.info(f"Added temporary index for session {session_id}, total files: {len(self.temp_indexes[session_id])}")
+        temp_file = TempFile.from_payload(temp_data, embedding_dtype=self.embedding_dtype, key=key)
+        return self.add_temp_file(session_id, temp_file)
+
+    def add_temp_file(self, session_id: str, temp_file: TempFile) -> TempFile:
+        """Add a processed file to a session, sharing it with other sessions if it has a key.
+
+        Args:
+            session_id: Session identifier.
+            temp_file: File from ``get_processed_file`` or ``TempFile.from_payload``.
+
+        Returns:
+            The added file; the registered one if a file with the same key
+            was added concurrently.
+
+        Raises:
+            ValueError: If the file's dimension differs from the session's
+                other files, if the session alone would exceed the memory
+                budget, or if the session id cannot be stored by the ``disk``
+                backend.
+        """
+        if temp_file.key is None and self.store is not None:
+            # Stored files are addressed by key, so content without one gets a unique key.
+            temp_file = replace(temp_file, key=uuid.uuid4().hex)
+        if temp_file.key is not None:
+            with self._lock:
+                temp_file = self._files.setdefault(temp_file.key, temp_file)
+        if self.store is not None:
+            session_index = self._add_stored(session_id, temp_file)
+        else:
+            with self._lock:
+                session_index = _with_file(self._sessions.get(session_id), temp_file)
+                self._check_budget(session_index)
+                self._cache(session_id, session_index)
+        logger.info(
+            f"Added temporary index for session {session_id}, total files: {len(session_index.files)}, "
+            f"session size: {session_index.nbytes} bytes"
+        )
+        return temp_file
+
+    def _add_stored(self, session_id: str, temp_file: TempFile) -> SessionIndex:
+        """Append a file to a session of the shared store and return the new session index."""
+        store = self.store
+        with store.lock():
+            store.evict_expired()
+            manifest = store.read_manifest(session_id)
+            if manifest is None:
+                store.session_dir(session_id)  # reject unsafe ids before evicting anything
+                sessions = store.session_ids()
+                if len(sessions) >= MAX_SESSIONS:
+                    store.remove_session(min(sessions, key=store.last_accessed))
+                    store.collect_files()
+                manifest = {"revision": "", "files": []}
+                base = None
+            else:
+                base = self._stored_session_index(session_id, manifest)
+            session_index = _with_file(base, temp_file)
+            self._check_budget(session_index)
+            entry = store.write_file(temp_file)
+            manifest = {**manifest, "revision": uuid.uuid4().hex, "files": manifest["files"] + [entry]}
+            store.write_manifest(session_id, manifest)
+            with self._lock:
+                self._cache(session_id, session_index, manifest["revision"])
+        return session_index
 
     def get_temp_index(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
         """Return temporary indexed data for a session.
@@ -60,13 +883,42 @@ class TempIndexManager:
             session_id: Session identifier.
 
         Returns:
-            Temporary data list if the session exists, otherwise None.
+            Decoded chunk payloads of the session files if the session exists,
+            otherwise None. Embeddings are kept only in the session index.
         """
-        with self._lock:
-            result = self.temp_indexes.get(session_id)
-            if result is not None:
-                self._last_accessed[session_id] = time.monotonic()
-            return result
+        session_index = self.get_session_index(session_id)
+        if session_index is None:
+            return None
+        return [temp_file.payload() for temp_file in session_index.files]
+
+    def get_session_index(self, session_id: str) -> Optional[SessionIndex]:
+        """Return the ready search index of a session.
+
+        Args:
+            session_id: Session identifier.
+
+        Returns:
+            The session index if the session exists, otherwise None.
+        """
+        if self.store is None:
+            with self._lock:
+                result = self._sessions.get(session_id)
+                if result is not None:
+                    self._last_accessed[session_id] = time.monotonic()
+                return result
+        for _ in range(2):
+            manifest = self.store.read_manifest(session_id)
+            if manifest is None:
+                with self._lock:
+                    self._drop_session(session_id)
+                return None
+            self.store.touch(session_id)
+            try:
+                return self._stored_session_index(session_id, manifest)
+            except FileNotFoundError:
+                # A file was removed by another worker after the manifest was read.
+                continue
+        return None
 
     def remove_temp_index(self, session_id: str) -> bool:
         """Remove all temporary indexed data for a session.
@@ -77,13 +929,18 @@ class TempIndexManager:
         Returns:
             True if the session existed and was removed, otherwise False.
         """
+        removed = False
+        if self.store is not None:
+            with self.store.lock():
+                removed = self.store.remove_session(session_id)
+                self.store.collect_files()
         with self._lock:
-            if session_id in self.temp_indexes:
-                del self.temp_indexes[session_id]
-                self._last_accessed.pop(session_id, None)
-                logger.info(f"Removed temporary index for session {session_id}")
-                return True
-            return False
+            if self.store is None:
+                removed = session_id in self._sessions
+            self._drop_session(session_id)
+        if removed:
+            logger.info(f"Removed temporary index for session {session_id}")
+        return removed
 
     def remove_temp_file(self, session_id: str, filename: str) -> bool:
         """Remove one temporary file from a session.
@@ -95,30 +952,56 @@ class TempIndexManager:
         Returns:
             True if a file was removed, otherwise False.
         """
-        with self._lock:
-            if session_id not in self.temp_indexes:
-                return False
-            temp_data_list = self.temp_indexes[session_id]
-            initial_length = len(temp_data_list)
-            self.temp_indexes[session_id] = [
-                td for td in temp_data_list
-                if not (
-                    td.get('chunks')
-                    and len(td['chunks']) > 0
-                    and isinstance(td['chunks'][0], dict)
-                    and td['chunks'][0].get('source') == filename
-                )
-            ]
-            removed = len(self.temp_indexes[session_id]) < initial_length
-            if len(self.temp_indexes[session_id]) == 0:
-                del self.temp_indexes[session_id]
-                self._last_accessed.pop(session_id, None)
-            elif removed:
-                self._last_accessed[session_id] = time.monotonic()
+        if self.store is not None:
+            removed = self._remove_stored_file(session_id, filename)
+        else:
+            with self._lock:
+                session_index = self._sessions.get(session_id)
+                if session_index is None:
+                    return False
+                kept = [temp_file.source != filename for temp_file in session_index.files]
+                removed = not all(kept)
+                if not any(kept):
+                    self._drop_session(session_id)
+                elif removed:
+                    self._sessions[session_id] = _without_files(session_index, kept)
+                    self._last_accessed[session_id] = time.monotonic()
         if removed:
             logger.info(f"Removed file '{filename}' from session {session_id}")
         return removed
 
+    def _remove_stored_file(self, session_id: str, filename: str) -> bool:
+        """Remove one file from a session of the shared store."""
+        store = self.store
+        with store.lock():
+            manifest = store.read_manifest(session_id)
+            if manifest is None:
+                return False
+            kept = [entry["source"] != filename for entry in manifest["files"]]
+            if all(kept):
+                return False
+            if not any(kept):
+                store.remove_session(session_id)
+                store.collect_files()
+                with self._lock:
+                    self._drop_session(session_id)
+                return True
+            updated = {
+                **manifest,
+                "revision": uuid.uuid4().hex,
+                "files": [entry for entry, keep in zip(manifest["files"], kept, strict=True) if keep],
+            }
+            store.write_manifest(session_id, updated)
+            store.collect_files()
+            with self._lock:
+                cached = self._sessions.get(session_id)
+                if cached is not None and self._revisions.get(session_id) == manifest["revision"]:
+                    self._sessions[session_id] = _without_files(cached, kept)
+                    self._revisions[session_id] = updated["revision"]
+                else:
+                    self._drop_session(session_id)
+        return True
+
     def get_temp_file_content(self, session_id: str, filename: str) -> Optional[Dict[str, Any]]:
         """Return temporary indexed data for one session file.
 
@@ -127,21 +1010,15 @@ class TempIndexManager:
             filename: Source filename to find.
 
         Returns:
-            Temporary file payload if found, otherwise None.
+            Decoded chunk payload of the file if found, otherwise None.
         """
-        with self._lock:
-            if session_id not in self.temp_indexes:
-                return None
-            self._last_accessed[session_id] = time.monotonic()
-            for temp_data in self.temp_indexes[session_id]:
-                if (
-                    temp_data.get('chunks')
-                    and len(temp_data['chunks']) > 0
-                    and isinstance(temp_data['chunks'][0], dict)
-                    and temp_data['chunks'][0].get('source') == filename
-                ):
-                    return temp_data
+        session_index = self.get_session_index(session_id)
+        if session_index is None:
             return None
+        for temp_file in session_index.files:
+            if temp_file.source == filename:
+                return temp_file.payload()
+        return None
 
     def has_session(self, session_id: str) -> bool:
         """Return whether a temporary session exists.
@@ -152,12 +1029,49 @@ class TempIndexManager:
         Returns:
             True if the session exists, otherwise False.
         """
+        if self.store is not None:
+            exists = self.store.read_manifest(session_id) is not None
+            if exists:
+                self.store.touch(session_id)
+            return exists
         with self._lock:
-            exists = session_id in self.temp_indexes
+            exists = session_id in self._sessions
             if exists:
                 self._last_accessed[session_id] = time.monotonic()
             return exists
 
+    def usage(self) -> Dict[str, Any]:
+        """Return the memory used by temporary sessions.
+
+        Returns:
+            Session count, distinct files and references to them, chunk
+            count, total, vector and chunk bytes with shared files counted
+            once, the byte budget, the vector storage dtype and the backend. With the ``disk`` backend
+            the counts cover this worker's cache and ``stored_sessions`` the
+            sessions in the shared store.
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            max_bytes, embedding_dtype, store = self.max_bytes, self.embedding_dtype, self.store
+        files = _unique_files(sessions)
+        index_bytes = sum(temp_file.index_nbytes for temp_file in files)
+        total_bytes = sum(temp_file.nbytes for temp_file in files)
+        usage: Dict[str, Any] = {
+            "sessions": len(sessions),
+            "files": len(files),
+            "file_references": sum(len(session_index.files) for session_index in sessions),
+            "chunks": sum(temp_file.rows for temp_file in files),
+            "bytes": total_bytes,
+            "index_bytes": index_bytes,
+            "chunk_bytes": total_bytes - index_bytes,
+            "max_bytes": max_bytes,
+            "embedding_dtype": embedding_dtype,
+            "backend": "memory" if store is None else "disk",
+        }
+        if store is not None:
+            usage["stored_sessions"] = len(store.session_ids())
+        return usage
+
     def generate_session_id(self) -> str:
         """Generate a new temporary session identifier.
 
@@ -172,17 +1086,37 @@ class TempIndexManager:
         Returns:
             Active session identifiers.
         """
+        if self.store is not None:
+            return self.store.session_ids()
         with self._lock:
-            return list(self.temp_indexes.keys())
+            return list(self._sessions.keys())
 
     def clear_all(self) -> None:
         """Remove all temporary sessions and indexes."""
+        if self.store is not None:
+            with self.store.lock():
+                self.store.clear()
         with self._lock:
-            self.temp_indexes.clear()
+            self._sessions.clear()
             self._last_accessed.clear()
+            self._revisions.clear()
         logger.info("Cleared all temporary indexes")
 
 
 temp_index_manager = TempIndexManager()
 
-__all__ = ["MAX_SESSIONS", "SESSION_TTL", "TempIndexManager", "temp_index_manager"]
+__all__ = [
+    "DEFAULT_MAX_BYTES",
+    "DEFAULT_STORAGE_DIR",
+    "DiskSessionStore",
+    "MAX_SESSIONS",
+    "SESSION_TTL",
+    "SessionIndex",
+    "TempFile",
+    "TEMP_STORAGE_BACKENDS",
+    "TempIndexManager",
+    "build_session_index",
+    "extend_session_index",
+    "temp_data_signature",
+    "temp_index_manager",
+]
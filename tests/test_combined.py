@@ -0,0 +1,105 @@
+import numpy as np
+
+import rag_system.query.combined as combined_module
+from rag_system.query.combined import CombinedQueryService
+from rag_system.shared.temp_storage import build_session_index
+
+
+class DummyPermanentQuery:
+    """Permanent query stub that records how often it encodes questions."""
+
+    emb_model_name = "intfloat/multilingual-e5-base"
+    emb_model_id = "intfloat/multilingual-e5-base"
+    k = 2
+
+    def __init__(self, vector):
+        self.vector = vector
+        self.encoded = []
+
+    def normalize_text(self, text):
+        return text.strip()
+
+    def encode_queries(self, requests):
+        self.encoded.extend(requests)
+        return np.asarray([self.vector], dtype=np.float32)
+
+    def search_candidates(self, request_embeddings):
+        assert np.array_equal(request_embeddings[0], self.vector)
+        return [[("permanent best", 0.9), ("shared chunk", 0.5), ("permanent weak", 0.1)]]
+
+
+class TempModel:
+    """Temporary index model that records the questions it encodes."""
+
+    def __init__(self, vector):
+        self.vector = vector
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        return np.asarray([self.vector], dtype=np.float32)
+
+
+class FailingModel:
+    """Embedding model that must not be called when the permanent query encodes the question."""
+
+    def encode(self, *args, **kwargs):
+        raise AssertionError("question encoded twice")
+
+
+def test_combined_search_encodes_once_and_merges_by_dense_score():
+    """Verify both indexes are searched with one embedding and candidates are ordered by their scores."""
+    vector = np.zeros(4, dtype=np.float32)
+    vector[0] = 1.0
+    session_index = build_session_index([{
+        'chunks': [{'text': text, 'source': 'a.pdf'} for text in ("temp best", "shared chunk", "temp far")],
+        'embeddings': [[0.95, 0.31, 0, 0], [0.7, 0.71, 0, 0], [0, 0, 1, 0]],
+    }])
+    permanent = DummyPermanentQuery(vector)
+    service = CombinedQueryService(
+        permanent,
+        session_index.index,
+        session_index.texts,
+        FailingModel(),
+        k=2,
+        emb_model_name=DummyPermanentQuery.emb_model_name,
+        emb_model_id=DummyPermanentQuery.emb_model_id,
+    )
+
+    candidates = service.search_candidates("  question ")
+
+    assert permanent.encoded == ["question"]
+    assert [text for text, _ in candidates] == ["temp best", "permanent best", "shared chunk"]
+    assert dict(candidates)["shared chunk"] > 0.5
+    assert service.query("question") == ["temp best", "permanent best", "shared chunk"]
+    executor = combined_module._get_search_executor()
+    assert combined_module._get_search_executor() is executor
+    combined_module.shutdown_search_executor()
+    assert combined_module._get_search_executor() is not executor
+
+
+def test_combined_search_encodes_twice_for_other_backend():
+    """Verify the same model name on another backend embeds the question with the temporary model."""
+    vector = np.zeros(4, dtype=np.float32)
+    vector[0] = 1.0
+    session_index = build_session_index([{
+        'chunks': [{'text': 'temp best', 'source': 'a.pdf'}],
+        'embeddings': [[1, 0, 0, 0]],
+    }])
+    permanent = DummyPermanentQuery(vector)
+    temp_model = TempModel(vector)
+    service = CombinedQueryService(
+        permanent,
+        session_index.index,
+        session_index.texts,
+        temp_model,
+        k=2,
+        emb_model_name=DummyPermanentQuery.emb_model_name,
+        emb_model_id=f"{DummyPermanentQuery.emb_model_name}@onnx",
+    )
+
+    candidates = service.search_candidates("question")
+
+    assert permanent.encoded == ["question"]
+    assert len(temp_model.encoded) == 1
+    assert [text for text, _ in candidates][:2] == ["permanent best", "shared chunk"]
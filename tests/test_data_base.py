@@ -0,0 +1,238 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+import pytest
+
+from rag_system.shared.data_base import FaissDB
+from rag_system.shared.data_base import describe_index
+
+
+class DummyConfig:
+    """Minimal configuration object for FaissDB tests."""
+
+    def __init__(self, tmp_path):
+        self.index_path = str(tmp_path / "index.index")
+        self.logs_dir = str(tmp_path / "logs")
+        self.hnsw_m = 8
+        self.hnsw_ef_construction = 40
+        self.hnsw_ef_search = 32
+
+
+def _random_embeddings(count: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    """Return L2-normalized random embeddings."""
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((count, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings
+
+
+def test_append_to_index_keeps_existing_ids(tmp_path):
+    """Verify appended vectors get ids after the existing rows."""
+    db = FaissDB(DummyConfig(tmp_path))
+    existing = _random_embeddings(50, seed=1)
+    new = _random_embeddings(5, seed=2)
+
+    index = db.build_index(existing)
+    db.append_to_index(index, new)
+    db.index = index
+
+    assert index.ntotal == 55
+    ids, scores = db.search(new[:1], 1)
+    assert ids[0] == 50
+    assert scores[0] == pytest.approx(1.0, abs=1e-4)
+
+
+def test_append_to_index_rejects_dimension_mismatch(tmp_path):
+    """Verify appending embeddings with another dimension fails."""
+    db = FaissDB(DummyConfig(tmp_path))
+    index = db.build_index(_random_embeddings(10))
+
+    with pytest.raises(ValueError, match="dim"):
+        db.append_to_index(index, _random_embeddings(2, dim=8))
+
+
+def test_read_index_returns_none_for_missing_file(tmp_path):
+    """Verify reading a missing index does not touch the in-memory index."""
+    db = FaissDB(DummyConfig(tmp_path))
+    db.index = db.build_index(_random_embeddings(3))
+
+    assert db.read_index(str(tmp_path / "missing.index")) is None
+    assert db.index is not None
+
+
+def test_mmap_index_returns_same_results(tmp_path):
+    """Verify a memory-mapped index answers searches like one read into RAM."""
+    config = DummyConfig(tmp_path)
+    embeddings = _random_embeddings(100, seed=3)
+    FaissDB(config).create_index(embeddings)
+
+    config.mmap_snapshot = True
+    mapped = FaissDB(config)
+    mapped.load_index()
+    in_memory = FaissDB(DummyConfig(tmp_path))
+    in_memory.load_index()
+
+    mapped_ids, mapped_scores = mapped.search(embeddings[:1], 5)
+    ids, scores = in_memory.search(embeddings[:1], 5)
+    np.testing.assert_array_equal(mapped_ids, ids)
+    np.testing.assert_allclose(mapped_scores, scores)
+
+
+def test_auto_index_type_follows_corpus_size_and_budget(tmp_path):
+    """Verify auto selection picks flat, HNSW, HNSW-SQ8 and IVF-PQ as the corpus grows."""
+    config = DummyConfig(tmp_path)
+    config.index_type = "auto"
+    config.flat_max_items = 1000
+    config.index_memory_budget_mb = 1
+    db = FaissDB(config)
+
+    assert db.choose_index_spec(500, 16)["type"] == "flat"
+    assert db.choose_index_spec(5000, 16)["type"] == "hnsw"
+    assert db.choose_index_spec(3000, 256)["type"] == "hnsw_sq8"
+    spec = db.choose_index_spec(1_000_000, 256)
+    assert spec["type"] == "ivf_pq"
+    assert 256 % spec["m"] == 0
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "hnsw_sq8", "ivf_pq"])
+def test_index_families_find_exact_match(tmp_path, index_type):
+    """Verify every index family finds a stored vector and is described correctly."""
+    config = DummyConfig(tmp_path)
+    config.index_type = index_type
+    config.pq_nbits = 4
+    config.ivf_nprobe = 8
+    db = FaissDB(config)
+    embeddings = _random_embeddings(2000, seed=4)
+
+    index = db.build_index_from_rows(embeddings, batch_size=512)
+    db.index = index
+
+    assert index.ntotal == 2000
+    assert describe_index(index)["type"] == index_type
+    ids, _ = db.search(embeddings[7:8], 5)
+    assert 7 in ids.tolist()
+
+
+def test_index_spec_from_manifest_sets_nprobe(tmp_path):
+    """Verify IVF search parameters recorded for a segment are used without modifying the index."""
+    config = DummyConfig(tmp_path)
+    config.index_type = "ivf_pq"
+    config.pq_nbits = 4
+    db = FaissDB(config)
+    index = db.build_index(_random_embeddings(2000, seed=5))
+    faiss.write_index(index, config.index_path)
+    spec = dict(describe_index(index), nprobe=3)
+
+    db.load_segments([SimpleNamespace(index_path=config.index_path, deleted=(), index_spec=spec)])
+
+    assert db.segments[0].nprobe == 3
+    assert faiss.extract_index_ivf(db.index).nprobe == index.nprobe
+
+
+def _segment_files(tmp_path, name, embeddings, db, deleted=()):
+    """Write a segment's embeddings and index and describe it like a snapshot segment."""
+    embeddings_path = tmp_path / f"{name}.npy"
+    index_path = tmp_path / f"{name}.index"
+    np.save(embeddings_path, embeddings)
+    faiss.write_index(db.build_index(embeddings), str(index_path))
+    return SimpleNamespace(
+        index_path=str(index_path),
+        embeddings_path=str(embeddings_path),
+        deleted=tuple(deleted),
+        index_spec=None,
+    )
+
+
+@pytest.mark.parametrize("rescore_mode", ["binary", "index"])
+def test_two_stage_search_rescores_exactly(tmp_path, rescore_mode):
+    """Verify compressed candidates are rescored with exact scores and tombstones stay hidden."""
+    config = DummyConfig(tmp_path)
+    config.index_type = "hnsw_sq8"
+    db = FaissDB(config)
+    first = _random_embeddings(600, dim=32, seed=6)
+    second = _random_embeddings(400, dim=32, seed=7)
+    segments = [
+        _segment_files(tmp_path, "first", first, db, deleted=(3,)),
+        _segment_files(tmp_path, "second", second, db),
+    ]
+
+    db.load_segments(segments, rescore_mode=rescore_mode, rescore_factor=8)
+    query = first[3:4] * 0.6 + second[5:6] * 0.4
+    faiss.normalize_L2(query)
+    positions, ids, scores = db.search_segments(query, 10)
+
+    assert (0, 3) not in set(zip(positions.tolist(), ids.tolist(), strict=True))
+    expected = np.where(positions == 0, first[ids % 600] @ query[0], second[ids % 400] @ query[0])
+    np.testing.assert_allclose(scores, expected, rtol=1e-5)
+    exact = db.exact_search_segments(query, 10)[0]
+    assert exact[0].tolist() == [1, 5]
+    assert db.rescore_recall(query, 10) >= 0.8
+
+
+def test_calibrate_rescore_raises_factor_until_recall_meets_tolerance(tmp_path):
+    """Verify calibration over-fetches more until binary first-pass recall is within tolerance."""
+    db = FaissDB(DummyConfig(tmp_path))
+    segment = _segment_files(tmp_path, "only", _random_embeddings(2000, dim=32, seed=8), db)
+    db.load_segments([segment], rescore_mode="binary", rescore_factor=1)
+
+    recall = db.calibrate_rescore(k=10, tolerance=0.05, sample_size=16)
+
+    assert recall >= 0.95
+    assert db.rescore_factor > 1
+    assert db.index.code_size == 4
+
+
+def test_concurrent_searches_use_per_call_parameters(tmp_path):
+    """Verify concurrent searches with different efSearch values match serial ones and leave the index unchanged."""
+    config = DummyConfig(tmp_path)
+    config.index_type = "hnsw"
+    db = FaissDB(config)
+    embeddings = _random_embeddings(3000, dim=32, seed=8)
+    segment = _segment_files(tmp_path, "hnsw", embeddings, db, deleted=(7,))
+    db.load_segments([segment])
+    db.configure_search_concurrency(max_concurrency=2, omp_threads=1)
+    ef_before = db.index.hnsw.efSearch
+    queries = _random_embeddings(64, dim=32, seed=9)
+    ef_values = [8, 256]
+
+    def search(i):
+        return db.search_segments(queries[i:i + 1], 20, ef_search=ef_values[i % 2])[1]
+
+    expected = [search(i) for i in range(len(queries))]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(search, range(len(queries))))
+
+    assert all(np.array_equal(got, want) for got, want in zip(results, expected, strict=True))
+    assert db.index.hnsw.efSearch == ef_before
+    assert 7 not in np.concatenate(results)
+    exact = np.argsort(-(embeddings @ queries.T), axis=0)[:21].T
+    recall = [len(set(ids) & set(truth)) / len(ids) for ids, truth in zip(expected, exact, strict=True)]
+    assert np.mean(recall[1::2]) >= np.mean(recall[0::2])
+    assert len(db.search(queries[:1], 5, ef_search=16)[0]) == 5
+    assert db.index.hnsw.efSearch == ef_before
+
+
+@pytest.mark.parametrize("rescore_mode", ["none", "binary"])
+def test_search_batch_matches_single_query_search(tmp_path, rescore_mode):
+    """Verify batched search returns the same per-query results as searching queries one by one."""
+    config = DummyConfig(tmp_path)
+    config.index_type = "hnsw"
+    db = FaissDB(config)
+    segments = [
+        _segment_files(tmp_path, "first", _random_embeddings(500, dim=32, seed=10), db, deleted=(1, 2)),
+        _segment_files(tmp_path, "second", _random_embeddings(300, dim=32, seed=11), db),
+    ]
+    db.load_segments(segments, rescore_mode=rescore_mode, rescore_factor=4)
+    queries = _random_embeddings(12, dim=32, seed=12)
+
+    batched = db.search_batch(queries, 7)
+
+    assert len(batched) == len(queries)
+    for query, (positions, ids, scores) in zip(queries, batched, strict=True):
+        single = db.search_segments(query[None, :], 7)
+        np.testing.assert_array_equal(positions, single[0])
+        np.testing.assert_array_equal(ids, single[1])
+        np.testing.assert_allclose(scores, single[2], rtol=1e-5)
+    assert db.search_batch(queries[:0], 7) == []
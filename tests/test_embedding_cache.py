@@ -0,0 +1,74 @@
+import numpy as np
+
+from rag_system.indexing.data_vectorize import create_embeddings
+from rag_system.shared.disk_cache import DiskCache
+from rag_system.shared.embedding_cache import EmbeddingCache
+from rag_system.shared.model_loader import embedding_model_id
+
+
+class CountingModel:
+    """Deterministic fake embedding model that records encoded texts."""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, convert_to_numpy=True):
+        """Return one deterministic vector per text."""
+        self.encoded.extend(texts)
+        return np.array(
+            [[len(text) + i for i in range(self.dim)] for text in texts],
+            dtype=np.float32,
+        ).reshape(len(texts), self.dim)
+
+
+def test_create_embeddings_reuses_cached_vectors(tmp_path):
+    """Verify cached texts are not passed to the model again."""
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+    model = CountingModel()
+
+    first = create_embeddings(["alpha", "beta"], model, model_name="intfloat/multilingual-e5-base", cache=cache)
+    second = create_embeddings(
+        ["beta", "gamma", "beta"],
+        model,
+        model_name="intfloat/multilingual-e5-base",
+        cache=cache,
+    )
+
+    assert model.encoded == ["passage: alpha", "passage: beta", "passage: gamma"]
+    np.testing.assert_allclose(second[0], first[1])
+    np.testing.assert_allclose(second[2], first[1])
+    np.testing.assert_allclose(np.linalg.norm(second, axis=1), 1.0, rtol=1e-5)
+
+
+def test_cache_key_depends_on_model_and_prefix_mode():
+    """Verify the same text gets distinct keys per model and prefix mode."""
+    key = EmbeddingCache.make_key("model-a", "passage", "text")
+
+    assert key == EmbeddingCache.make_key("model-a", "passage", "text")
+    assert key != EmbeddingCache.make_key("model-b", "passage", "text")
+    assert key != EmbeddingCache.make_key("model-a", "query", "text")
+
+
+def test_embedding_model_id_separates_backends():
+    """Verify non-default backends do not share cache entries with the fp32 model."""
+    name = "intfloat/multilingual-e5-base"
+
+    assert embedding_model_id(name) == name
+    assert embedding_model_id(name, "torch_int8") != name
+    assert embedding_model_id(name, "onnx") != embedding_model_id(name, "onnx", "onnx/model_qint8_avx512.onnx")
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    """Verify the size bound evicts the least recently used entries first."""
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=350)
+    cache.put("a", b"x" * 100)
+    cache.put("b", b"x" * 100)
+    cache.get("a")
+    cache.put("c", b"x" * 100)
+    cache.put("d", b"x" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("d") is not None
+    assert cache.stats()["bytes"] <= 350
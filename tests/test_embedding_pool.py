@@ -0,0 +1,84 @@
+import numpy as np
+
+from rag_system.indexing.data_vectorize import create_embeddings
+from rag_system.indexing.data_vectorize import plan_token_batches
+from rag_system.indexing.embedding_pool import shard_ranges
+
+
+class ShardedPool:
+    """Fake pool that encodes each shard separately, like the worker processes."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, prepared_texts, batch_size):
+        """Encode shards in order and stack the results."""
+        self.calls += 1
+        return np.vstack([
+            np.array([[len(text), 1.0] for text in prepared_texts[start:end]], dtype=np.float32)
+            for start, end in shard_ranges(len(prepared_texts), 3, batch_size)
+        ])
+
+
+class FailingModel:
+    """Model that must not be used when the pool handles the input."""
+
+    def encode(self, *args, **kwargs):
+        """Fail if called."""
+        raise AssertionError("model.encode should not be called")
+
+
+class LengthModel:
+    """Model without a tokenizer that embeds texts by length."""
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, convert_to_numpy=True):
+        """Return one vector per text."""
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_shard_ranges_cover_input_in_order():
+    """Verify shards are contiguous, cover every item, and hold at least one batch."""
+    ranges = shard_ranges(1000, num_workers=4, batch_size=32)
+
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == 1000
+    assert all(prev[1] == cur[0] for prev, cur in zip(ranges[:-1], ranges[1:], strict=True))
+    assert all(end - start >= 32 for start, end in ranges[:-1])
+    assert shard_ranges(0, 4, 32) == []
+
+
+def test_create_embeddings_uses_pool_in_input_order():
+    """Verify pooled output keeps the input order and is normalized."""
+    texts = ["a" * (i + 1) for i in range(50)]
+    pool = ShardedPool()
+
+    embeddings = create_embeddings(texts, FailingModel(), batch_size=4, pool=pool)
+
+    expected = np.array([[i + 1, 1.0] for i in range(50)], dtype=np.float32)
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    assert pool.calls == 1
+    np.testing.assert_allclose(embeddings, expected, rtol=1e-6)
+
+
+def test_plan_token_batches_respects_budget():
+    """Verify length-sorted batches stay within the padded-token budget."""
+    counts = [5, 120, 7, 300, 6, 118, 700]
+
+    batches = plan_token_batches(counts, max_tokens_per_batch=256)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(counts)))
+    assert batches[0] == [6]
+    for batch in batches:
+        assert len(batch) == 1 or len(batch) * counts[batch[0]] <= 256
+        assert counts[batch[0]] == max(counts[i] for i in batch)
+
+
+def test_token_budget_batching_keeps_input_order():
+    """Verify token-budget batching returns vectors in the original order."""
+    texts = ["a" * (i * 7 % 50 + 1) for i in range(40)]
+
+    embeddings = create_embeddings(texts, LengthModel(), batch_size=4, max_tokens_per_batch=40)
+
+    expected = np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    np.testing.assert_allclose(embeddings, expected, rtol=1e-6)
@@ -0,0 +1,261 @@
+import json
+import time
+from dataclasses import replace
+
+import faiss
+import numpy as np
+import pytest
+
+from rag_system.shared.chunk_store import ChunkStore
+from rag_system.shared.chunk_store import ChunkStoreWriter
+from rag_system.shared.data_base import FaissDB
+from rag_system.shared.index_snapshot import IndexSnapshotStore
+from rag_system.shared.index_snapshot import read_chunk_store
+from rag_system.shared.json_stream import iter_json_array
+
+
+def _store(tmp_path) -> IndexSnapshotStore:
+    """Create a snapshot store rooted in a temporary directory."""
+    return IndexSnapshotStore(
+        data_dir=str(tmp_path),
+        processed_data_path=str(tmp_path / "processed_data.json"),
+        embeddings_path=str(tmp_path / "embeddings.npy"),
+        index_path=str(tmp_path / "index.index"),
+    )
+
+
+def _index(embeddings: np.ndarray):
+    """Build a flat inner-product index over embeddings."""
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    index.add(embeddings)
+    return index
+
+
+def test_writer_batches_match_single_publish(tmp_path):
+    """Verify a snapshot written in batches has the same records as one publish call."""
+    records = [{"text": f"текст\n{i}", "source": "a.txt", "hash": f"h{i}"} for i in range(5)]
+    embeddings = np.random.default_rng(0).random((5, 4), dtype=np.float32)
+    store = _store(tmp_path)
+
+    published = store.publish(records, embeddings, _index(embeddings))
+
+    writer = store.open_writer()
+    writer.write(records[:2], embeddings[:2])
+    writer.write(records[2:], embeddings[2:])
+    streamed = writer.commit(_index(embeddings))
+
+    for artifacts in (published, streamed):
+        assert list(read_chunk_store(artifacts.processed_data_path).records()) == records
+    np.testing.assert_array_equal(np.load(streamed.embeddings_path), embeddings)
+    assert store.current_artifacts().snapshot_id == streamed.snapshot_id
+    assert [len(batch) for batch in store.iter_processed_data(2)] == [2, 2, 1]
+    assert store.load_hashes() == [f"h{i}" for i in range(5)]
+
+
+def test_chunk_store_round_trips_records(tmp_path):
+    """Verify columns decode to the original records, including missing and odd values."""
+    records = [
+        {"text": "один", "source": "a.pdf", "timestamp": "2024-05-01T10:20:30.123456", "hash": "a" * 64},
+        {"text": "", "source": "b.pdf", "timestamp": "2024-05-01T10:20:30", "hash": "b" * 64},
+        {"text": "три", "source": "a.pdf", "timestamp": "not a date", "hash": "c" * 64},
+        {"text": "four", "timestamp": None, "hash": "d" * 64, "page": 4},
+    ]
+    writer = ChunkStoreWriter(tmp_path / "chunks")
+    writer.write(records[:1])
+    writer.write(records[1:])
+    writer.close()
+
+    chunks = ChunkStore.open(tmp_path / "chunks")
+
+    assert list(chunks.records()) == records
+    assert chunks.texts[2] == "три" and list(chunks.texts) == [r["text"] for r in records]
+    assert chunks.rows_with_value("source", "a.pdf").tolist() == [0, 2]
+    assert chunks.dictionaries["source"] == ["a.pdf", "b.pdf"]
+    assert ChunkStore.open_hashes(tmp_path / "chunks") == [r["hash"] for r in records]
+
+
+def test_chunk_store_mmap_matches_in_memory(tmp_path):
+    """Verify a memory-mapped chunk store decodes the same records, including an empty one."""
+    records = [{"text": f"строка {i}", "source": f"{i % 2}.txt", "hash": f"h{i}"} for i in range(4)]
+    writer = ChunkStoreWriter(tmp_path / "chunks")
+    writer.write(records)
+    writer.close()
+    empty = ChunkStoreWriter(tmp_path / "empty")
+    empty.close()
+
+    mapped = ChunkStore.open(tmp_path / "chunks", mmap=True)
+
+    assert list(mapped.records()) == list(ChunkStore.open(tmp_path / "chunks").records()) == records
+    assert mapped.texts[-1] == "строка 3"
+    assert len(ChunkStore.open(tmp_path / "empty", mmap=True)) == 0
+
+
+def test_reader_loads_legacy_json_snapshot(tmp_path):
+    """Verify a pointer to a pre-columnar snapshot still resolves and loads."""
+    records = [{"text": "a", "source": "x.txt", "hash": "h1"}, {"text": "b", "source": "y.txt", "hash": "h2"}]
+    embeddings = np.ones((2, 4), dtype=np.float32)
+    store = _store(tmp_path)
+    snapshot_path = store.snapshot_dir / "legacy"
+    snapshot_path.mkdir(parents=True)
+    (snapshot_path / "processed_data.json").write_text(json.dumps(records, indent=2), encoding="utf-8")
+    np.save(snapshot_path / "embeddings.npy", embeddings)
+    store._replace_pointer("legacy", 2)
+
+    assert store.current_artifacts().processed_data_path.endswith("processed_data.json")
+    assert store.load_processed_data() == records
+    assert [len(batch) for batch in store.iter_processed_data(1)] == [1, 1]
+    assert store.load_hashes() == ["h1", "h2"]
+    assert store.load_chunks().rows_with_value("source", "y.txt").tolist() == [1]
+
+
+def test_writer_rejects_index_size_mismatch(tmp_path):
+    """Verify commit fails and leaves the pointer untouched on inconsistent data."""
+    embeddings = np.ones((2, 4), dtype=np.float32)
+    store = _store(tmp_path)
+    writer = store.open_writer()
+    writer.write([{"text": "a"}, {"text": "b"}], embeddings)
+
+    with pytest.raises(ValueError, match="FAISS index size"):
+        writer.commit(_index(embeddings[:1]))
+    writer.abort()
+
+    assert not store.pointer_path.exists()
+    assert not store.snapshot_dir.exists()
+    assert list(store.segment_dir.iterdir()) == []
+
+
+def test_iter_json_array_handles_small_reads(tmp_path):
+    """Verify items split across read boundaries are decoded correctly."""
+    items = [{"text": "a]b", "n": 1}, 2.5, "строка", None, [1, {"x": "}"}]]
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    assert list(iter_json_array(str(path), read_size=3)) == items
+
+
+class DummyConfig:
+    """Minimal configuration object for FaissDB."""
+
+    def __init__(self, tmp_path):
+        self.index_path = str(tmp_path / "index.index")
+        self.logs_dir = str(tmp_path / "logs")
+
+
+def _write_segment(store, records, embeddings):
+    """Write one unpublished segment with a flat index."""
+    writer = store.open_segment_writer()
+    writer.write(records, embeddings)
+    return writer.finish(_index(embeddings))
+
+
+def test_segments_and_tombstones_hide_deleted_rows(tmp_path):
+    """Verify live rows, hashes, vectors and search skip tombstoned rows across segments."""
+    records = [{"text": f"t{i}", "source": "a.txt" if i < 3 else "b.txt", "hash": f"h{i}"} for i in range(5)]
+    embeddings = np.eye(5, 8, dtype=np.float32)
+    store = _store(tmp_path)
+    first = _write_segment(store, records[:3], embeddings[:3])
+    second = _write_segment(store, records[3:], embeddings[3:])
+    store.publish_segments([first, second])
+
+    artifacts = store.publish_segments([replace(first, deleted=(1,)), second])
+
+    live = [records[i] for i in (0, 2, 3, 4)]
+    assert store.current_artifacts().live_count == 4
+    assert store.load_processed_data() == live
+    assert store.load_hashes() == ["h0", "h2", "h3", "h4"]
+    np.testing.assert_array_equal(store.load_embeddings(), embeddings[[0, 2, 3, 4]])
+    assert store.load_chunks().rows_with_value("source", "a.txt").tolist() == [0, 1]
+    assert [len(batch) for batch in store.iter_processed_data(3)] == [3, 1]
+
+    db = FaissDB(DummyConfig(tmp_path))
+    db.load_segments(artifacts.segments)
+    positions, ids, _ = db.search_segments(embeddings[1:2] + embeddings[4:5] * 0.5, 5)
+    assert list(zip(positions.tolist(), ids.tolist(), strict=True))[0] == (1, 1)
+    assert (0, 1) not in set(zip(positions.tolist(), ids.tolist(), strict=True))
+
+    store.remove_segments([first])
+    assert (tmp_path / "index_segments" / first.segment_id).exists()
+
+
+def test_retired_segments_outlive_retention_period(tmp_path):
+    """Verify superseded segments are kept for readers until the retention period passes."""
+    records = [{"text": f"t{i}", "source": "a.txt", "hash": f"h{i}"} for i in range(4)]
+    embeddings = np.eye(4, 8, dtype=np.float32)
+    store = _store(tmp_path)
+    first = _write_segment(store, records[:2], embeddings[:2])
+    second = _write_segment(store, records[2:], embeddings[2:])
+    store.publish_segments([first, second])
+    store.publish_segments([second])
+
+    store.retire_segments([first, second])
+    first_dir = tmp_path / "index_segments" / first.segment_id
+    assert (first_dir / "retired").exists()
+    assert not (tmp_path / "index_segments" / second.segment_id / "retired").exists()
+
+    store.publish_segments([second])
+    assert first_dir.exists()
+    assert store.collect_retired_segments(now=time.time() + store.segment_retention_seconds) == 1
+    assert not first_dir.exists()
+    assert store.load_hashes() == ["h2", "h3"]
+
+
+
+def test_rescore_calibration_is_recorded_per_snapshot(tmp_path):
+    """Verify a calibrated rescore factor is reused for its snapshot and not for the next one."""
+    records = [{"text": f"t{i}", "source": "a.txt", "hash": f"h{i}"} for i in range(3)]
+    embeddings = np.eye(3, 8, dtype=np.float32)
+    store = _store(tmp_path)
+    first = store.publish(records, embeddings, _index(embeddings))
+
+    assert store.read_rescore_calibration(first.snapshot_id, "binary:k=5") is None
+    store.record_rescore_calibration(first.snapshot_id, "binary:k=5", 8)
+    store.record_rescore_calibration(first.snapshot_id, "index:k=5", 4)
+    store.record_rescore_calibration(None, "binary:k=5", 16)
+
+    assert store.read_rescore_calibration(first.snapshot_id, "binary:k=5") == 8
+    assert store.read_rescore_calibration(first.snapshot_id, "index:k=5") == 4
+    assert store.read_rescore_calibration(None, "binary:k=5") is None
+    second = store.publish(records, embeddings, _index(embeddings))
+    assert store.read_rescore_calibration(second.snapshot_id, "binary:k=5") is None
+
+
+@pytest.mark.parametrize("dtype, atol", [("float16", 1e-3), ("int8", 1e-2)])
+def test_reduced_precision_embeddings_upcast_on_read(tmp_path, dtype, atol):
+    """Verify float16 and int8 snapshots record their dtype and read back as float32."""
+    records = [{"text": f"t{i}", "source": "a.txt", "hash": f"h{i}"} for i in range(6)]
+    embeddings = np.random.default_rng(1).standard_normal((6, 8)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    store = IndexSnapshotStore(
+        data_dir=str(tmp_path),
+        processed_data_path=str(tmp_path / "processed_data.json"),
+        embeddings_path=str(tmp_path / "embeddings.npy"),
+        index_path=str(tmp_path / "index.index"),
+        embedding_dtype=dtype,
+    )
+
+    artifacts = store.publish(records, embeddings, _index(embeddings))
+
+    manifest = json.loads((tmp_path / "index_segments" / artifacts.segments[0].segment_id / "manifest.json").read_text())
+    assert manifest["embedding_dtype"] == dtype
+    assert np.load(artifacts.embeddings_path).dtype == np.dtype(dtype)
+    for mmap in (False, True):
+        loaded = store.load_embeddings(mmap=mmap)
+        assert loaded.shape == embeddings.shape
+        assert loaded[1:3].dtype == np.float32
+        np.testing.assert_allclose(loaded[[0, 5]], embeddings[[0, 5]], atol=atol)
+        np.testing.assert_allclose(np.vstack([loaded, embeddings[:1]])[:6], embeddings, atol=atol)
+
+    store.publish_segments([replace(artifacts.segments[0], deleted=(2,))])
+    np.testing.assert_allclose(store.load_embeddings(), embeddings[[0, 1, 3, 4, 5]], atol=atol)
+
+
+def test_unknown_embedding_dtype_is_rejected(tmp_path):
+    """Verify an unsupported embedding storage dtype fails fast."""
+    with pytest.raises(ValueError):
+        IndexSnapshotStore(
+            data_dir=str(tmp_path),
+            processed_data_path=str(tmp_path / "processed_data.json"),
+            embeddings_path=str(tmp_path / "embeddings.npy"),
+            index_path=str(tmp_path / "index.index"),
+            embedding_dtype="bfloat16",
+        )
@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from rag_system.query.micro_batch import MicroBatcher
+
+
+def test_concurrent_submissions_share_one_call():
+    """Verify concurrent callers are served by one batch call and get their own slices."""
+    calls = []
+
+    def double(items):
+        calls.append(list(items))
+        return np.asarray(items) * 2
+
+    # The batch closes once all 10 items are queued, well before the window ends.
+    batcher = MicroBatcher(double, window_ms=5000, max_batch_size=10)
+    inputs = [[1], [2, 3], [4, 5, 6], [7, 8, 9, 10]]
+    with ThreadPoolExecutor(max_workers=len(inputs)) as pool:
+        results = list(pool.map(batcher.submit, inputs))
+
+    assert [result.tolist() for result in results] == [[2], [4, 6], [8, 10, 12], [14, 16, 18, 20]]
+    assert len(calls) == 1
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["requests"] == 4
+    assert stats["max_batch_items"] == 10
+    assert stats["queue_depth"] == 0
+
+
+def test_batch_errors_reach_every_caller():
+    """Verify an exception raised for a batch is re-raised in each waiting caller."""
+    started = threading.Event()
+
+    def fail(items):
+        started.set()
+        raise ValueError("model failed")
+
+    batcher = MicroBatcher(fail, window_ms=0)
+    with pytest.raises(ValueError, match="model failed"):
+        batcher.submit(["question"])
+    assert started.is_set()
+    assert batcher.stats()["batches"] == 1
+
+
+def test_idle_worker_exits_and_restarts():
+    """Verify the worker thread stops when idle and the next submit starts a new one."""
+    batcher = MicroBatcher(lambda items: items, window_ms=0, idle_timeout=0.01)
+    assert batcher.submit(["a"]) == ["a"]
+    worker = batcher._worker
+    if worker is not None:
+        worker.join(timeout=1)
+    assert batcher._worker is None
+    assert batcher.submit(["b", "c"]) == ["b", "c"]
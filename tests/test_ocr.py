@@ -0,0 +1,93 @@
+import rag_system.shared.ocr as ocr_module
+from rag_system.shared.ocr import OCR
+
+
+class DummyConfig:
+    """Minimal OCR configuration."""
+
+    def __init__(self, tmp_path, workers, window, cache=False):
+        self.logs_dir = str(tmp_path / "logs")
+        self.ocr_cache_enabled = cache
+        self.ocr_cache_path = str(tmp_path / "ocr_cache.sqlite3")
+        self.image_types = [".png", ".jpg"]
+        self.doc_types = [".pdf"]
+        self.ocr_workers = workers
+        self.ocr_page_window = window
+
+
+def test_plan_tasks_splits_pdf_into_ordered_windows(tmp_path, monkeypatch):
+    """Verify PDF pages are covered once, in order, by bounded page windows."""
+    ocr = OCR(DummyConfig(tmp_path, workers=4, window=8))
+    monkeypatch.setattr(ocr, "count_pdf_pages", lambda path: 10)
+
+    windows = [args[1:3] for _, args, _ in ocr.plan_tasks(tmp_path / "scan.pdf")]
+
+    # 10 pages over 4 workers gives windows of 3 pages, below the configured 8.
+    assert windows == [(1, 3), (4, 6), (7, 9), (10, 10)]
+
+
+def test_plan_tasks_skips_unreadable_pdf(tmp_path, monkeypatch):
+    """Verify a PDF whose page count cannot be read produces no tasks."""
+    ocr = OCR(DummyConfig(tmp_path, workers=2, window=4))
+
+    def fail(path):
+        raise RuntimeError("pdfinfo failed")
+
+    monkeypatch.setattr(ocr, "count_pdf_pages", fail)
+
+    assert list(ocr.plan_tasks(tmp_path / "broken.pdf")) == []
+
+
+def test_plan_tasks_uses_text_layer_before_ocr(tmp_path, monkeypatch):
+    """Verify only pages without a usable text layer are sent to OCR."""
+    ocr = OCR(DummyConfig(tmp_path, workers=1, window=4))
+    layer = ["", "digital page two with plenty of text", " \n ", "", "digital page five with plenty of text"]
+    monkeypatch.setattr(ocr, "count_pdf_pages", lambda path: 5)
+    monkeypatch.setattr(ocr, "extract_text_layer", lambda path, page_count: layer)
+
+    units = list(ocr.plan_tasks(tmp_path / "mixed.pdf"))
+
+    assert units[0][1][1:3] == (1, 1)
+    assert units[1] == [layer[1]]
+    assert units[2][1][1:3] == (3, 4)
+    assert units[3] == [layer[4]]
+    assert ocr.page_stats == {"text_layer": 2, "ocr_cache": 0, "ocr": 3}
+
+
+def test_ocr_cache_skips_recognized_pages(tmp_path, monkeypatch):
+    """Verify pages recognized once are served from the OCR cache on re-upload."""
+    pdf_path = tmp_path / "scan.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 scanned")
+    calls = []
+
+    def fake_window(path, first_page, last_page, dpi, lang):
+        calls.append((first_page, last_page))
+        return [f"page {page}" for page in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(ocr_module, "_ocr_pdf_window", fake_window)
+    monkeypatch.setattr(OCR, "count_pdf_pages", lambda self, path: 3)
+    monkeypatch.setattr(OCR, "extract_text_layer", lambda self, path, page_count: None)
+
+    first = OCR(DummyConfig(tmp_path, workers=1, window=2, cache=True))
+    assert first.run_ocr(pdf_path) == ["page 1", "page 2", "page 3"]
+    assert calls == [(1, 2), (3, 3)]
+
+    second = OCR(DummyConfig(tmp_path, workers=1, window=2, cache=True))
+    assert second.run_ocr(pdf_path) == ["page 1", "page 2", "page 3"]
+    assert calls == [(1, 2), (3, 3)]
+    assert second.page_stats == {"text_layer": 0, "ocr_cache": 3, "ocr": 0}
+    assert second.cache.stats()["hits"] == 3
+
+
+def test_close_shuts_down_worker_pool(tmp_path):
+    """Verify close stops the lazily started OCR pool and a later run starts a new one."""
+    ocr = OCR(DummyConfig(tmp_path, workers=2, window=4))
+    ocr.close()
+
+    executor = ocr._get_executor()
+    ocr.close()
+
+    assert ocr._executor is None
+    assert executor._shutdown_thread
+    assert ocr._get_executor() is not executor
+    ocr.close()
@@ -0,0 +1,39 @@
+from rag_system.query.reranker import CrossEncoderReranker
+
+
+class DummyConfig:
+    """Minimal configuration object for reranker tests."""
+
+    def __init__(self, tmp_path):
+        self.logs_dir = str(tmp_path / "logs")
+        self.rerank_enabled = False
+        self.rerank_batch_size = 4
+
+
+class LengthModel:
+    """Cross-encoder stand-in that scores a pair by the length of its text."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.calls.append(list(pairs))
+        return [float(len(text)) for _query, text in pairs]
+
+
+def test_rerank_batch_scores_all_queries_in_one_call(tmp_path):
+    """Verify candidates of several queries are scored together and split back per query."""
+    reranker = CrossEncoderReranker(DummyConfig(tmp_path))
+    reranker.enabled = True
+    reranker.model = LengthModel()
+
+    results = reranker.rerank_batch(
+        ["first", "  ", "second", "third"],
+        [["a", "ccc", "bb"], ["x", "yyy"], [], ["dddd", "e"]],
+        top_k=2,
+    )
+
+    assert results == [["ccc", "bb"], ["x", "yyy"], [], ["dddd", "e"]]
+    assert len(reranker.model.calls) == 1
+    assert [query for query, _text in reranker.model.calls[0]] == ["first"] * 3 + ["third"] * 2
+    assert reranker.rerank("first", ["a", "bb"], top_k=1) == ["bb"]
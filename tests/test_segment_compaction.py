@@ -0,0 +1,72 @@
+from dataclasses import replace
+
+import faiss
+import numpy as np
+
+from rag_system.indexing.compaction import carry_over_tombstones
+from rag_system.indexing.compaction import merge_segments
+from rag_system.indexing.compaction import plan_compaction
+from rag_system.shared.data_base import FaissDB
+from rag_system.shared.index_snapshot import IndexSnapshotStore
+
+
+class DummyConfig:
+    """Minimal configuration object for FaissDB."""
+
+    def __init__(self, tmp_path):
+        self.index_path = str(tmp_path / "index.index")
+        self.logs_dir = str(tmp_path / "logs")
+        self.hnsw_m = 8
+        self.hnsw_ef_construction = 40
+        self.hnsw_ef_search = 32
+
+
+def _store(tmp_path) -> IndexSnapshotStore:
+    """Create a snapshot store rooted in a temporary directory."""
+    return IndexSnapshotStore(
+        data_dir=str(tmp_path),
+        processed_data_path=str(tmp_path / "processed_data.json"),
+        embeddings_path=str(tmp_path / "embeddings.npy"),
+        index_path=str(tmp_path / "index.index"),
+    )
+
+
+def _write_segment(store, start, count, dim=8):
+    """Write one unpublished segment whose vectors are one-hot row markers."""
+    records = [{"text": f"t{i}", "source": f"s{i % 2}", "hash": f"h{i}"} for i in range(start, start + count)]
+    embeddings = np.eye(count, dim, k=start, dtype=np.float32)
+    index = faiss.IndexFlatIP(dim)
+    index.add(embeddings)
+    writer = store.open_segment_writer()
+    writer.write(records, embeddings)
+    return writer.finish(index)
+
+
+def test_plan_compaction_merges_small_and_dirty_segments(tmp_path):
+    """Verify small segments merge only in groups and tombstone-heavy ones are always rewritten."""
+    store = _store(tmp_path)
+    large = _write_segment(store, 0, 6)
+    small = [_write_segment(store, i, 1) for i in range(6, 8)]
+
+    assert plan_compaction([large, *small], merge_factor=3, small_max_items=2, max_deleted_ratio=0.5) == []
+    assert plan_compaction([large, *small], merge_factor=2, small_max_items=2, max_deleted_ratio=0.5) == small
+
+    dirty = replace(large, deleted=(0, 1, 2))
+    assert plan_compaction([dirty, *small], merge_factor=3, small_max_items=2, max_deleted_ratio=0.5) == [dirty]
+
+
+def test_merge_segments_keeps_live_rows_and_carries_tombstones(tmp_path):
+    """Verify merged rows and vectors follow segment order and late deletes are remapped."""
+    store = _store(tmp_path)
+    first = replace(_write_segment(store, 0, 3), deleted=(1,))
+    second = _write_segment(store, 3, 2)
+
+    merged = merge_segments(store, [first, second], FaissDB(DummyConfig(tmp_path)), 2, embed_texts=None)
+    store.publish_segments([merged])
+
+    assert [record["hash"] for record in store.load_processed_data()] == ["h0", "h2", "h3", "h4"]
+    np.testing.assert_array_equal(store.load_embeddings(), np.eye(5, 8, dtype=np.float32)[[0, 2, 3, 4]])
+
+    # Rows 2 of the first and 0 of the second segment were deleted while merging.
+    current = [replace(first, deleted=(1, 2)), replace(second, deleted=(0,))]
+    assert carry_over_tombstones([first, second], current) == [1, 2]
@@ -0,0 +1,211 @@
+import os
+import time
+
+import faiss
+import numpy as np
+import pytest
+
+from rag_system.shared.temp_storage import ACCESS_FILENAME
+from rag_system.shared.temp_storage import SESSION_TTL
+from rag_system.shared.temp_storage import DiskSessionStore
+from rag_system.shared.temp_storage import SessionIndex
+
+from rag_system.shared.temp_storage import TempIndexManager
+from rag_system.shared.temp_storage import build_session_index
+
+
+def _temp_file(name: str, count: int, seed: int, dim: int = 8) -> dict:
+    """Return a temporary file payload like ``process_file_temp`` produces."""
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((count, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return {
+        'chunks': [{'text': f"{name} chunk {i}", 'source': name} for i in range(count)],
+        'embeddings': embeddings.tolist(),
+    }
+
+
+def test_session_index_is_updated_incrementally():
+    """Verify the session index follows added and removed files without touching earlier indexes."""
+    manager = TempIndexManager()
+    first, second, third = _temp_file("a.pdf", 5, 1), _temp_file("b.pdf", 3, 2), _temp_file("c.pdf", 4, 3)
+
+    manager.add_temp_index("s", first)
+    after_first = manager.get_session_index("s")
+    manager.add_temp_index("s", second)
+    manager.add_temp_index("s", third)
+    session_index = manager.get_session_index("s")
+
+    assert after_first.ntotal == 5
+    assert session_index.ntotal == 12
+    query = np.asarray(second['embeddings'][1:2], dtype=np.float32)
+    _, ids = session_index.index.search(query, 1)
+    assert session_index.texts[ids[0][0]] == "b.pdf chunk 1"
+    assert session_index.index is session_index.index
+    assert session_index.texts is session_index.texts
+
+    assert manager.remove_temp_file("s", "b.pdf")
+    reduced = manager.get_session_index("s")
+    assert reduced.ntotal == 9
+    assert session_index.ntotal == 12
+    query = np.asarray(third['embeddings'][2:3], dtype=np.float32)
+    _, ids = reduced.index.search(query, 1)
+    assert reduced.texts[ids[0][0]] == "c.pdf chunk 2"
+    assert reduced.signature == build_session_index([first, third]).signature
+    assert reduced.signature != session_index.signature
+
+    assert manager.remove_temp_file("s", "a.pdf")
+    assert manager.remove_temp_file("s", "c.pdf")
+    assert manager.get_session_index("s") is None
+
+
+def test_add_temp_index_rejects_mismatched_embeddings():
+    """Verify a file whose embeddings do not match the session is rejected without changing it."""
+    manager = TempIndexManager()
+    manager.add_temp_index("s", _temp_file("a.pdf", 2, 1))
+    broken = _temp_file("b.pdf", 3, 2)
+    broken['embeddings'] = broken['embeddings'][:2]
+
+    with pytest.raises(ValueError):
+        manager.add_temp_index("s", broken)
+    with pytest.raises(ValueError):
+        manager.add_temp_index("s", _temp_file("c.pdf", 2, 3, dim=4))
+
+    assert manager.get_session_index("s").ntotal == 2
+    assert len(manager.get_temp_index("s")) == 1
+
+
+def test_float16_sessions_halve_vector_memory():
+    """Verify float16 storage keeps search results and takes half the vector bytes."""
+    payload = _temp_file("a.pdf", 50, 4, dim=64)
+    float32 = TempIndexManager(embedding_dtype="float32")
+    float16 = TempIndexManager(embedding_dtype="float16")
+    float32.add_temp_index("s", payload)
+    float16.add_temp_index("s", payload)
+
+    assert float32.usage()["index_bytes"] == 50 * 64 * 4
+    assert float16.usage()["index_bytes"] == 50 * 64 * 2
+    query = np.asarray(payload['embeddings'][7:8], dtype=np.float32)
+    assert float16.get_session_index("s").index.search(query, 1)[1][0][0] == 7
+    assert float16.get_temp_file_content("s", "a.pdf")['chunks'][7] == {'text': "a.pdf chunk 7", 'source': "a.pdf"}
+
+
+def test_memory_budget_evicts_least_recently_used_sessions():
+    """Verify sessions beyond the byte budget are evicted in LRU order and oversized files are rejected."""
+    session_bytes = build_session_index([_temp_file("a.pdf", 20, 1, dim=32)]).nbytes
+    manager = TempIndexManager(max_bytes=int(session_bytes * 2.5))
+    manager.add_temp_index("first", _temp_file("a.pdf", 20, 1, dim=32))
+    manager.add_temp_index("second", _temp_file("a.pdf", 20, 2, dim=32))
+    assert manager.has_session("first")
+
+    manager.add_temp_index("third", _temp_file("a.pdf", 20, 3, dim=32))
+
+    assert manager.get_all_sessions() == ["first", "third"]
+    usage = manager.usage()
+    assert usage["sessions"] == 2
+    assert usage["bytes"] <= usage["max_bytes"]
+    with pytest.raises(ValueError, match="budget"):
+        manager.add_temp_index("huge", _temp_file("b.pdf", 200, 4, dim=32))
+    assert not manager.has_session("huge")
+    assert isinstance(manager.get_session_index("third"), SessionIndex)
+
+
+def test_disk_backend_shares_sessions_between_managers(tmp_path):
+    """Verify workers sharing a session directory see each other's uploads, removals and deletions."""
+    first_worker = TempIndexManager()
+    second_worker = TempIndexManager()
+    for manager in (first_worker, second_worker):
+        manager.configure(backend="disk", storage_dir=tmp_path, embedding_dtype="float16")
+    first, second = _temp_file("a.pdf", 5, 1), _temp_file("b.pdf", 3, 2)
+
+    first_worker.add_temp_index("s", first)
+    assert second_worker.has_session("s")
+    assert second_worker.get_session_index("s").ntotal == 5
+    file_dirs = list((tmp_path / "files").iterdir())
+    assert [sorted(p.name for p in d.glob("*.faiss")) for d in file_dirs] == [["index.faiss"]]
+    assert not list(tmp_path.glob("files/*/embeddings.npy"))
+
+    second_worker.add_temp_index("s", second)
+    session_index = first_worker.get_session_index("s")
+    assert session_index.ntotal == 8
+    assert session_index.signature == build_session_index([first, second]).signature
+    query = np.asarray(second['embeddings'][1:2], dtype=np.float32)
+    _, ids = session_index.index.search(query, 1)
+    assert session_index.texts[ids[0][0]] == "b.pdf chunk 1"
+    assert first_worker.get_session_index("s") is session_index
+
+    assert first_worker.remove_temp_file("s", "a.pdf")
+    assert second_worker.get_temp_file_content("s", "a.pdf") is None
+    assert second_worker.get_temp_index("s") == [{'chunks': second['chunks']}]
+
+    assert second_worker.remove_temp_index("s")
+    assert first_worker.get_session_index("s") is None
+    assert first_worker.get_all_sessions() == []
+
+
+def test_disk_backend_expires_sessions_after_ttl(tmp_path):
+    """Verify a stored session is gone for every worker once its last access is older than the TTL."""
+    manager = TempIndexManager()
+    manager.configure(backend="disk", storage_dir=tmp_path)
+    manager.add_temp_index("old", _temp_file("a.pdf", 2, 1))
+    stale = time.time() - SESSION_TTL - 1
+    os.utime(tmp_path / "sessions" / "old" / ACCESS_FILENAME, (stale, stale))
+
+    assert not TempIndexManager(store=DiskSessionStore(tmp_path)).has_session("old")
+    manager.add_temp_index("new", _temp_file("b.pdf", 2, 2))
+    assert not (tmp_path / "sessions" / "old").exists()
+    assert len(list((tmp_path / "files").iterdir())) == 1
+    assert manager.get_all_sessions() == ["new"]
+
+    with pytest.raises(ValueError):
+        manager.add_temp_index("../escape", _temp_file("c.pdf", 2, 3))
+
+
+@pytest.mark.parametrize("backend", ["memory", "disk"])
+def test_sessions_share_files_uploaded_with_the_same_key(tmp_path, backend):
+    """Verify a file uploaded to several sessions is stored once and released with the last session."""
+    manager = TempIndexManager()
+    manager.configure(backend=backend, storage_dir=tmp_path)
+    handbook, notes = _temp_file("handbook.pdf", 20, 1, dim=16), _temp_file("notes.pdf", 4, 2, dim=16)
+    assert manager.get_processed_file("handbook") is None
+
+    shared = manager.add_temp_index("a", handbook, key="handbook")
+    manager.add_temp_index("a", notes, key="notes")
+    manager.add_temp_file("b", manager.get_processed_file("handbook"))
+    session_bytes = manager.get_session_index("a").nbytes
+
+    assert manager.get_session_index("b").files[0] is shared
+    usage = manager.usage()
+    assert (usage["files"], usage["file_references"]) == (2, 3)
+    assert usage["bytes"] == session_bytes
+    query = np.asarray(notes['embeddings'][3:4], dtype=np.float32)
+    _, ids = manager.get_session_index("a").index.search(query, 3)
+    assert manager.get_session_index("a").texts[ids[0][0]] == "notes.pdf chunk 3"
+
+    other_worker = TempIndexManager()
+    other_worker.configure(backend=backend, storage_dir=tmp_path)
+    assert (other_worker.get_processed_file("handbook") is not None) == (backend == "disk")
+
+    del shared
+    assert manager.remove_temp_index("a")
+    assert manager.get_processed_file("handbook") is not None
+    assert manager.get_processed_file("notes") is None
+    assert manager.remove_temp_index("b")
+    assert manager.get_processed_file("handbook") is None
+
+
+def test_session_search_matches_one_index_over_all_files():
+    """Verify merging per-file results returns the same neighbors as a single index over the session."""
+    payloads = [_temp_file(f"{i}.pdf", count, i, dim=16) for i, count in enumerate((7, 1, 12))]
+    session_index = build_session_index(payloads)
+    vectors = np.vstack([np.asarray(payload['embeddings'], dtype=np.float32) for payload in payloads])
+    reference = faiss.IndexFlatIP(16)
+    reference.add(vectors)
+    queries = np.random.default_rng(5).standard_normal((6, 16)).astype(np.float32)
+
+    scores, ids = session_index.index.search(queries, 10)
+    expected_scores, expected_ids = reference.search(queries, 10)
+
+    np.testing.assert_array_equal(ids, expected_ids)
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-6)
+    assert session_index.index.search(queries, 25)[1][0, -1] == -1
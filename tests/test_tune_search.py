@@ -0,0 +1,53 @@
+import numpy as np
+
+from rag_system.query.tune_search import exact_neighbors
+from rag_system.query.tune_search import sample_held_out_queries
+from rag_system.query.tune_search import segment_families
+from rag_system.query.tune_search import sweep
+from rag_system.query.tune_search import write_manifest
+from rag_system.shared.data_base import FaissDB
+from rag_system.shared.index_snapshot import IndexSnapshotStore
+
+
+class DummyConfig:
+    """Minimal configuration object for FaissDB."""
+
+    def __init__(self, tmp_path):
+        self.index_path = str(tmp_path / "index.index")
+        self.logs_dir = str(tmp_path / "logs")
+        self.index_type = "hnsw"
+        self.hnsw_m = 4
+        self.hnsw_ef_construction = 16
+        self.hnsw_ef_search = 16
+
+
+def test_sweep_picks_smallest_ef_search_and_records_it(tmp_path):
+    """Verify the tuner reaches the target recall and publishes ef_search in the manifest."""
+    store = IndexSnapshotStore(
+        data_dir=str(tmp_path),
+        processed_data_path=str(tmp_path / "processed_data.json"),
+        embeddings_path=str(tmp_path / "embeddings.npy"),
+        index_path=str(tmp_path / "index.index"),
+    )
+    db = FaissDB(DummyConfig(tmp_path))
+    embeddings = np.random.default_rng(0).standard_normal((1500, 32)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    writer = store.open_writer()
+    writer.write([{"text": f"t{i}", "hash": f"h{i}"} for i in range(1500)], embeddings)
+    artifacts = writer.commit(db.build_index(embeddings))
+
+    db.load_segments(artifacts.segments, with_vectors=True)
+    families = segment_families(db)
+    queries, exclude = sample_held_out_queries(db, 30)
+    exact = exact_neighbors(db, queries, 10, exclude)
+    chosen, rows = sweep(db, "hnsw", families["hnsw"], [1, 8, 256], queries, exact, 10, 0.95, exclude)
+
+    assert families == {"hnsw": [0]}
+    assert rows[0][1] < 0.95 <= rows[-1][1]
+    assert chosen == min(value for value, recall, _, _ in rows if recall >= 0.95)
+
+    published = write_manifest(store, artifacts, db, {"hnsw": chosen}, families)
+    assert store.current_artifacts().segments[0].index_spec["ef_search"] == chosen
+    reloaded = FaissDB(DummyConfig(tmp_path))
+    reloaded.load_segments(published.segments)
+    assert reloaded.segments[0].ef_search == chosen